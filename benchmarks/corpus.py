@@ -0,0 +1,67 @@
+# Synthetic bike-like corpora and queries for the benchmarks
+import hashlib
+import random
+from typing import Iterator, List, Optional
+import numpy as np
+
+BRANDS = ['Velorim', 'Bicyk', 'Nord', 'Eva', 'Noka Bikes', 'Breakout', 'ScramBikes', 'Peaknetic', 'nHill', 'BikeShind']
+TYPES = ['Kids bikes', 'Kids Mountain Bikes', 'Mountain Bikes', 'Road Bikes', 'eBikes', 'Commuter bikes', 'Enduro bikes']
+MATERIALS = ['aluminium', 'carbon', 'alloy', 'steel', 'titanium']
+MODEL_WORDS = ['Jigger', 'Hillcraft', 'Chook', 'Summit', 'Kahuna', 'Soothe', 'Secto', 'Thrill', 'Watt', 'Ridge', 'Drift', 'Comet']
+
+RIDERS = ['kids', 'beginners', 'commuters', 'seniors', 'college students', 'racers', 'weekend riders', 'women']
+TERRAIN = ['city streets', 'gravel roads', 'steep trails', 'bike paths', 'forest tracks', 'paved roads', 'pump tracks']
+FEATURES = ['hydraulic disc brakes', 'a lightweight frame', 'a 9-speed drivetrain', 'full suspension', 'a carbon fork',
+            'a memory foam seat', 'fat tires', 'a hub motor', 'a low step-over frame', 'fenders and a rear rack']
+QUALITIES = ['comfortable', 'affordable', 'fast', 'durable', 'lightweight', 'stable', 'agile', 'vintage-inspired']
+
+
+def synthetic_bikes(count: int, seed: int = 42) -> Iterator[dict]:
+    """Yields `count` bikes shaped like `bikes_data.json`, with templated descriptions of 3-6 sentences."""
+    rng = random.Random(seed)
+    for i in range(count):
+        bike_type = rng.choice(TYPES)
+        sentences = [
+            f"A {rng.choice(QUALITIES)} {bike_type.lower()[:-1]} built for {rng.choice(RIDERS)}.",
+            f"It comes with {rng.choice(FEATURES)} and {rng.choice(FEATURES)}.",
+            f"Equally at home on {rng.choice(TERRAIN)} and {rng.choice(TERRAIN)}.",
+        ]
+        sentences += [f"Riders love how {rng.choice(QUALITIES)} it feels with {rng.choice(FEATURES)}."
+                      for _ in range(rng.randint(0, 3))]
+        yield {
+            'id': i,
+            'model': f"{rng.choice(MODEL_WORDS)} {rng.randint(1, 999)}",
+            'brand': rng.choice(BRANDS),
+            'price': rng.randrange(150, 6000, 5),
+            'type': bike_type,
+            'specs': {'material': rng.choice(MATERIALS), 'weight': f"{rng.uniform(7, 25):.1f}"},
+            'description': ' '.join(sentences),
+        }
+
+
+def synthetic_queries(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    return [f"{rng.choice(QUALITIES)} {rng.choice(TYPES).lower()} for {rng.choice(RIDERS)} on {rng.choice(TERRAIN)}"
+            for _ in range(count)]
+
+
+class HashingEncoder:
+    """
+    Deterministic stand-in for the sentence transformer: signed feature hashing of the words, L2-normalized.
+    Texts sharing words get similar vectors, so search results stay meaningful, while encoding costs
+    almost nothing. This isolates the ingestion and search pipeline from the model.
+    """
+    def __init__(self, dimension: int = 384):
+        self.dimension = dimension
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def encode(self, sentences: List[str], batch_size: Optional[int] = None, **kwargs) -> np.ndarray:
+        vectors = np.zeros((len(sentences), self.dimension), dtype=np.float32)
+        for row, sentence in enumerate(sentences):
+            for word in sentence.lower().split():
+                digest = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'little')
+                vectors[row, digest % self.dimension] += 1.0 if digest >> 63 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
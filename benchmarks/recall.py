@@ -0,0 +1,215 @@
+# Recall-vs-latency evaluation of the Redis vector index settings against exact NumPy search
+import argparse
+import itertools
+import json
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+import numpy as np
+from benchmarks.corpus import synthetic_bikes, synthetic_queries
+from benchmarks.run import _encoder
+from src.pipelines.backends import KnnQuery, NumpyBackend, RedisBackend
+from src.pipelines.index_manager import IndexManager
+from src.pipelines.training_pipeline import RedisSearchIndex
+from src.utils.redis_client import RedisClient
+from src.utils.vectors import VECTOR_TYPES, from_bytes, to_bytes
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+logger = get_logger("Vector Index Recall Evaluation")
+config = get_config()
+
+# queries per FT.SEARCH pipeline and per ground-truth matrix product
+QUERY_BATCH = 64
+
+
+@contextmanager
+def settings(**overrides):
+    """Temporarily overrides config attributes, so RedisSearchIndex and RedisBackend build and query that variant."""
+    previous = {name: getattr(config, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(config, name, value)
+
+
+def stored_vectors(client, pattern: str, batch_size: int = 500) -> np.ndarray:
+    """Reads every stored description embedding under `pattern`, in the configured storage layout and type."""
+    vectors, keys = [], list(client.scan_iter(match=pattern, count=batch_size))
+    for start in range(0, len(keys), batch_size):
+        pipeline = client.pipeline(transaction=False)
+        for key in keys[start:start + batch_size]:
+            if config.VECTOR_STORAGE == 'HASH':
+                pipeline.hget(key, 'description_embeddings')
+            else:
+                pipeline.json().get(key, '$.description_embeddings')
+        for reply in pipeline.execute():
+            if config.VECTOR_STORAGE == 'HASH':
+                vectors.append(from_bytes(reply, config.VECTOR_TYPE))
+            else:
+                vectors.append(np.asarray(reply[0], dtype=np.float32))
+    return np.stack(vectors)
+
+
+def exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int) -> np.ndarray:
+    """Row numbers of the exact top-k (cosine) of every query, computed in batches by the NumPy backend."""
+    backend = NumpyBackend()
+    backend.write([(str(row), {}, ('', ''), vector, True) for row, vector in enumerate(vectors)])
+    truth = []
+    for start in range(0, len(queries), QUERY_BATCH):
+        hits = backend.search(KnnQuery(k, 0, k), queries[start:start + QUERY_BATCH], {})
+        truth += [[int(doc.id) for doc in query_hits.docs] for query_hits in hits]
+    return np.asarray(truth)
+
+
+def recall_at_k(truth: np.ndarray, found: List[List[int]], k: int) -> float:
+    """Mean share of each query's true top-k that the index returned."""
+    return float(np.mean([len(set(expected[:k]) & set(result[:k])) / k for expected, result in zip(truth, found)]))
+
+
+def variants(args) -> Iterator[Dict]:
+    """Index settings of the sweep; HNSW varies M and EF_CONSTRUCTION, FLAT has no build parameters."""
+    for vector_type, algorithm in itertools.product(args.vector_types, args.algorithms):
+        if algorithm == 'FLAT':
+            yield {'VECTOR_TYPE': vector_type, 'VECTOR_ALGORITHM': 'FLAT'}
+            continue
+        for m, ef_construction in itertools.product(args.m, args.ef_construction):
+            yield {'VECTOR_TYPE': vector_type, 'VECTOR_ALGORITHM': 'HNSW', 'HNSW_M': m, 'HNSW_EF_CONSTRUCTION': ef_construction}
+
+
+class IndexSweep:
+    """
+    Loads the vectors once per vector type into a scratch HASH prefix, then builds one index per variant with
+    RedisSearchIndex, times the query set through RedisBackend for every EF_RUNTIME and drops the index again.
+    """
+    def __init__(self, client, vectors: np.ndarray, queries: np.ndarray, truth: np.ndarray, k: int):
+        self.client = client
+        self.vectors = vectors
+        self.queries = queries
+        self.truth = truth
+        self.k = k
+        self.prefix = f"recall-eval:{config.DOC_PREFIX or 'bikes'}"
+        self.index_name = f"{config.INDEX_NAME or 'idx:bikes'}:recall-eval"
+
+    def load(self, vector_type: str) -> None:
+        self.unload()
+        for start in range(0, len(self.vectors), config.INGEST_BATCH_SIZE):
+            pipeline = self.client.pipeline(transaction=False)
+            for row in range(start, min(start + config.INGEST_BATCH_SIZE, len(self.vectors))):
+                pipeline.hset(f"{self.prefix}:{row}", mapping={
+                    'id': row, 'description_embeddings': to_bytes(self.vectors[row], vector_type)})
+            pipeline.execute()
+
+    def drop_index(self) -> None:
+        try:
+            self.client.ft(self.index_name).dropindex(delete_documents=False)
+        except Exception as e:
+            logger.info(f"No index {self.index_name} to drop: {e}")
+
+    def unload(self) -> None:
+        self.drop_index()
+        keys = list(self.client.scan_iter(match=f"{self.prefix}:*", count=config.INGEST_BATCH_SIZE))
+        for start in range(0, len(keys), config.INGEST_BATCH_SIZE):
+            self.client.unlink(*keys[start:start + config.INGEST_BATCH_SIZE])
+
+    def build(self) -> Tuple[float, dict]:
+        self.drop_index()  # left over by an interrupted run, possibly with other settings
+        search_index = RedisSearchIndex(self.vectors.shape[1])
+        started = time.perf_counter()
+        search_index.create_redis_search_index(self.index_name, f"{self.prefix}:")
+        while search_index.index_status(self.index_name)['percent_indexed'] < 1.0:
+            time.sleep(0.2)
+        return time.perf_counter() - started, self.client.ft(self.index_name).info()
+
+    def measure(self, ef_runtime: Optional[int]) -> Tuple[float, float]:
+        backend = RedisBackend(self.client, index_name=self.index_name)
+        query = KnnQuery(self.k, 0, self.k)
+        params = {'EF_RUNTIME': ef_runtime} if ef_runtime else {}
+        found, started = [], time.perf_counter()
+        for start in range(0, len(self.queries), QUERY_BATCH):
+            for result in backend.search(query, self.queries[start:start + QUERY_BATCH], params):
+                found.append([int(doc.id.rsplit(':', 1)[1]) for doc in result.docs])
+        elapsed = time.perf_counter() - started
+        return recall_at_k(self.truth, found, self.k), len(self.queries) / elapsed
+
+    def run(self, args) -> List[dict]:
+        results, loaded = [], None
+        for variant in variants(args):
+            with settings(VECTOR_STORAGE='HASH', **variant):
+                if variant['VECTOR_TYPE'] != loaded:
+                    self.load(variant['VECTOR_TYPE'])
+                    loaded = variant['VECTOR_TYPE']
+                build_seconds, info = self.build()
+                memory_mb = float(info.get('vector_index_sz_mb', 0) or 0)
+                for ef_runtime in (args.ef_runtime if variant['VECTOR_ALGORITHM'] == 'HNSW' else [None]):
+                    recall, qps = self.measure(ef_runtime)
+                    result = {**{name.lower(): value for name, value in variant.items()}, 'hnsw_ef_runtime': ef_runtime,
+                              f'recall_at_{self.k}': round(recall, 4), 'qps': round(qps, 1),
+                              'index_bytes_per_doc': round(memory_mb * 2 ** 20 / len(self.vectors), 1),
+                              'build_seconds': round(build_seconds, 2)}
+                    logger.info(f"Evaluated {result}")
+                    results.append(result)
+        self.unload()
+        return results
+
+
+def cheapest(results: List[dict], k: int, target: float) -> Optional[dict]:
+    """The variant with the smallest index per document that reaches `target` recall, the fastest on ties."""
+    eligible = [result for result in results if result[f'recall_at_{k}'] >= target]
+    return min(eligible, key=lambda result: (result['index_bytes_per_doc'], -result['qps']), default=None)
+
+
+def _corpus(args, encoder, client) -> np.ndarray:
+    if args.synthetic:
+        descriptions = [bike['description'] for bike in synthetic_bikes(args.synthetic)]
+        return np.asarray(encoder.encode(descriptions), dtype=np.float32)
+    if args.snapshot:
+        return np.array(NumpyBackend.load(args.snapshot).vectors())
+    active = IndexManager(client).active()
+    pattern = config.CLIENT_KEYS if active is None or active.get('legacy') else f"{active['prefix']}:*"
+    return stored_vectors(client, pattern)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Sweep vector index settings and report recall@k, QPS and memory per document")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--snapshot', help="NumPy backend snapshot directory instead of the stored Redis embeddings")
+    source.add_argument('--synthetic', type=int, help="Encode this many synthetic bikes instead of the stored embeddings")
+    parser.add_argument('--encoder', choices=['model', 'hashing'], default='model',
+                        help="Query encoder; it must match the one the corpus was embedded with")
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('-k', type=int, default=10)
+    parser.add_argument('--algorithms', nargs='+', choices=['FLAT', 'HNSW'], default=['FLAT', 'HNSW'])
+    parser.add_argument('--vector-types', nargs='+', choices=VECTOR_TYPES, default=list(VECTOR_TYPES))
+    parser.add_argument('--m', type=int, nargs='+', default=[8, 16, 32])
+    parser.add_argument('--ef-construction', type=int, nargs='+', default=[100, 200])
+    parser.add_argument('--ef-runtime', type=int, nargs='+', default=[10, 20, 50, 100, 200])
+    parser.add_argument('--target-recall', type=float, default=0.95)
+    parser.add_argument('--output', help="JSON report path, stdout by default")
+    args = parser.parse_args(argv)
+
+    client = RedisClient().connect()
+    encoder = _encoder(args.encoder)
+    vectors = _corpus(args, encoder, client)
+    queries = np.asarray(encoder.encode(synthetic_queries(args.queries)), dtype=np.float32)
+    logger.info(f"Computing the exact top-{args.k} of {len(queries)} queries over {len(vectors)} vectors")
+    truth = exact_top_k(vectors, queries, args.k)
+
+    results = IndexSweep(client, vectors, queries, truth, args.k).run(args)
+    report = json.dumps({'documents': len(vectors), 'queries': len(queries), 'k': args.k,
+                         'target_recall': args.target_recall, 'results': results,
+                         'cheapest': cheapest(results, args.k, args.target_recall)}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
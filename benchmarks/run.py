@@ -0,0 +1,285 @@
+# Benchmarks for ingestion throughput, encoding, query latency and API cold start
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import numpy as np
+from benchmarks.corpus import HashingEncoder, synthetic_bikes, synthetic_queries
+from src.data.vector_store import RedisVectorOperations
+from src.models.similarity_model import SimilarityModel
+from src.pipelines.backends import NumpyBackend, RedisBackend, VectorBackend
+from src.pipelines.inference_pipeline import SemanticSearch
+from src.pipelines.training_pipeline import RedisSearchIndex
+from src.utils.redis_client import RedisClient
+from src.utils.resources import peak_rss_mb
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+logger = get_logger("Benchmarks")
+config = get_config()
+
+SUITES = ('ingest', 'encode', 'query', 'startup')
+# every query pays for encoding and KNN alone: no caches, no micro-batching, no cross-encoder, whatever the env says
+QUERY_SETTINGS = {'EMBEDDING_CACHE_ENABLED': False, 'RESULT_CACHE_ENABLED': False, 'BATCH_ENABLED': False,
+                  'RERANK_ENABLED': False}
+
+
+def _encoder(name: str):
+    if name == 'hashing':
+        return HashingEncoder()
+    model = SimilarityModel().load_model()
+    if model is None:
+        raise RuntimeError("The sentence transformer model could not be loaded; use --encoder hashing")
+    return model
+
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    p50, p95, p99 = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    return {'p50_ms': round(float(p50), 3), 'p95_ms': round(float(p95), 3), 'p99_ms': round(float(p99), 3),
+            'mean_ms': round(float(np.mean(latencies) * 1000), 3)}
+
+
+class Target:
+    """Where the corpus is ingested and searched: a scratch prefix and index in Redis, or a NumpyBackend."""
+    def __init__(self, name: str, size: int, dimension: int):
+        self.name = name
+        self.prefix = f"bench-{size}:{config.DOC_PREFIX or 'bikes'}"
+        self.index_name = f"{config.INDEX_NAME or 'idx:bikes'}:bench-{size}"
+        self.dimension = dimension
+        self.client = RedisClient().connect() if name == 'redis' else None
+        self.backend: VectorBackend = NumpyBackend() if name == 'numpy' else \
+            RedisBackend(self.client, RedisClient().connect_async(), f"{self.prefix}:*", self.index_name)
+
+    def prepare(self) -> None:
+        if self.name == 'redis':
+            RedisSearchIndex(self.dimension).create_redis_search_index(self.index_name, f"{self.prefix}:")
+
+    def wait_until_indexed(self) -> float:
+        started = time.perf_counter()
+        if self.name == 'redis':
+            search_index = RedisSearchIndex(self.dimension)
+            while search_index.index_status(self.index_name)['percent_indexed'] < 1.0:
+                time.sleep(0.2)
+        return time.perf_counter() - started
+
+    def cleanup(self) -> None:
+        if self.name == 'redis':
+            self.client.ft(self.index_name).dropindex(delete_documents=True)
+
+
+def bench_ingest(target: Target, size: int, encoder, batch_size: int) -> dict:
+    store = RedisVectorOperations(synthetic_bikes(size), encode_workers=0, prefix=target.prefix, backend=target.backend)
+    store._embedder = encoder
+    store.embedding_store = None  # every description is encoded, whatever EMBEDDING_STORE_DIR says
+    store.batch_size = batch_size
+    started = time.perf_counter()
+    summary = store.sync(delete_missing=False)
+    elapsed = time.perf_counter() - started
+    indexing = target.wait_until_indexed()
+    return {'documents': summary['documents'], 'seconds': round(elapsed, 3), 'docs_per_sec': round(size / elapsed, 1),
+            'indexing_wait_seconds': round(indexing, 3), 'peak_rss_mb': peak_rss_mb()}
+
+
+def bench_encode(encoder, sentences: List[str], batch_sizes: List[int]) -> List[dict]:
+    results = []
+    encoder.encode(sentences[:8])  # warm-up
+    for batch_size in batch_sizes:
+        started = time.perf_counter()
+        encoder.encode(sentences, batch_size=batch_size)
+        elapsed = time.perf_counter() - started
+        results.append({'batch_size': batch_size, 'sentences': len(sentences), 'seconds': round(elapsed, 3),
+                        'sentences_per_sec': round(len(sentences) / elapsed, 1)})
+    return results
+
+
+@contextmanager
+def _settings(values: Dict[str, object]):
+    previous = {name: getattr(config, name) for name in values}
+    for name, value in values.items():
+        setattr(config, name, value)
+    try:
+        yield
+    finally:
+        for name, value in previous.items():
+            setattr(config, name, value)
+
+
+def bench_query(target: Target, encoder, queries: List[str], k: int, batch_size: int) -> dict:
+    with _settings(QUERY_SETTINGS):
+        return _bench_query(target, encoder, queries, k, batch_size)
+
+
+def _bench_query(target: Target, encoder, queries: List[str], k: int, batch_size: int) -> dict:
+    search_app = SemanticSearch(backend=target.backend, embedder=encoder)
+    search_app.search(queries[:3], k)  # warm-up
+
+    single = []
+    for query in queries:
+        started = time.perf_counter()
+        search_app.search([query], k)
+        single.append(time.perf_counter() - started)
+
+    batches = []
+    for start in range(0, len(queries), batch_size):
+        started = time.perf_counter()
+        search_app.search(queries[start:start + batch_size], k)
+        batches.append(time.perf_counter() - started)
+    return {'k': k, 'queries': len(queries), 'single': _percentiles(single),
+            'batch': {'batch_size': batch_size, **_percentiles(batches),
+                      'queries_per_sec': round(len(queries) / sum(batches), 1)}}
+
+
+def bench_startup(repeat: int, warm_model: bool) -> dict:
+    """Imports `src.app.main` in fresh interpreters: import time, and optionally the model warm-up the bootstrap runs."""
+    script = ("import time; started = time.perf_counter(); import src.app.main; imported = time.perf_counter() - started\n"
+              "warmed = 0.0\n"
+              "if WARM:\n"
+              "    from src.models.similarity_model import SimilarityModel\n"
+              "    started = time.perf_counter(); SimilarityModel().warm_up(); warmed = time.perf_counter() - started\n"
+              "print(imported, warmed)").replace('WARM', str(warm_model))
+    imports, warm_ups, wall = [], [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        process = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                                 env=os.environ | {'BOOTSTRAP_ON_STARTUP': 'false'})
+        wall.append(time.perf_counter() - started)
+        if process.returncode != 0:
+            raise RuntimeError(f"src.app.main failed to start: {process.stderr.strip().splitlines()[-1]}")
+        output = process.stdout.split()
+        imports.append(float(output[-2]))
+        warm_ups.append(float(output[-1]))
+    return {'repeat': repeat, 'process_seconds': round(float(np.median(wall)), 3),
+            'import_seconds': round(float(np.median(imports)), 3),
+            'model_warm_up_seconds': round(float(np.median(warm_ups)), 3) if warm_model else None}
+
+
+def run(args) -> dict:
+    encoder = _encoder(args.encoder)
+    dimension = encoder.get_sentence_embedding_dimension()
+    results = []
+    for size in args.sizes:
+        if {'ingest', 'query'} & set(args.suites):
+            target = Target(args.target, size, dimension)
+            try:
+                target.prepare()
+                logger.info(f"Ingesting {size} synthetic bikes into {args.target}")
+                ingest = bench_ingest(target, size, encoder, args.ingest_batch_size)
+                if 'ingest' in args.suites:
+                    results.append({'suite': 'ingest', 'size': size, **ingest})
+                if 'query' in args.suites:
+                    logger.info(f"Querying {size} bikes with {args.queries} queries")
+                    results.append({'suite': 'query', 'size': size,
+                                    **bench_query(target, encoder, synthetic_queries(args.queries), args.k, args.query_batch_size)})
+            finally:
+                if not args.keep:
+                    target.cleanup()
+        if 'encode' in args.suites:
+            sentences = [bike['description'] for bike in synthetic_bikes(min(size, args.encode_sentences))]
+            results += [{'suite': 'encode', 'size': len(sentences), **result}
+                        for result in bench_encode(encoder, sentences, args.encode_batch_sizes)]
+    if 'startup' in args.suites:
+        results.append({'suite': 'startup', **bench_startup(args.startup_repeat, args.encoder == 'model')})
+
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'target': args.target,
+            'encoder': args.encoder if args.encoder == 'hashing' else config.PRETRAINED_TRANSFORMER_MODEL,
+            'vector_storage': config.VECTOR_STORAGE,
+            'vector_algorithm': config.VECTOR_ALGORITHM,
+            'vector_type': config.VECTOR_TYPE,
+            'query_settings': QUERY_SETTINGS,
+        },
+        'results': results,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def _metrics(report: dict) -> Dict[str, float]:
+    """Flattens a report into `suite/size/.../metric` -> value, for comparing two runs."""
+    flat = {}
+
+    def walk(prefix: str, value):
+        if isinstance(value, dict):
+            for key, inner in value.items():
+                walk(f"{prefix}/{key}", inner)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[prefix] = value
+
+    for result in report['results']:
+        name = '/'.join(str(result[key]) for key in ('suite', 'size', 'batch_size') if key in result)
+        walk(name, {key: value for key, value in result.items() if key not in ('suite', 'size', 'batch_size')})
+    return flat
+
+
+def compare(baseline: dict, candidate: dict) -> List[dict]:
+    before, after = _metrics(baseline), _metrics(candidate)
+    rows = []
+    for name in sorted(before.keys() & after.keys()):
+        change = (after[name] - before[name]) / before[name] * 100 if before[name] else None
+        rows.append({'metric': name, 'baseline': before[name], 'candidate': after[name],
+                     'change_pct': round(change, 1) if change is not None else None})
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark ingestion, encoding, query latency and startup time")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help="Run the benchmarks and write a JSON report")
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 100_000, 1_000_000], help="Corpus sizes")
+    run_parser.add_argument('--suites', nargs='+', choices=SUITES, default=list(SUITES))
+    run_parser.add_argument('--target', choices=['redis', 'numpy'], default='numpy',
+                            help="A local Redis Stack, or the in-process NumPy backend")
+    run_parser.add_argument('--encoder', choices=['model', 'hashing'], default='model',
+                            help="The configured sentence transformer, or a cheap hashing encoder that isolates the pipeline")
+    run_parser.add_argument('--ingest-batch-size', type=int, default=config.INGEST_BATCH_SIZE)
+    run_parser.add_argument('--encode-batch-sizes', type=int, nargs='+', default=[1, 8, 32, 128])
+    run_parser.add_argument('--encode-sentences', type=int, default=2_000, help="Sentences encoded per batch size")
+    run_parser.add_argument('--queries', type=int, default=200)
+    run_parser.add_argument('--query-batch-size', type=int, default=16)
+    run_parser.add_argument('-k', type=int, default=config.KNN_DEFAULT_K)
+    run_parser.add_argument('--startup-repeat', type=int, default=3)
+    run_parser.add_argument('--keep', action='store_true', help="Keep the benchmark keys and index in Redis")
+    run_parser.add_argument('--output', help="Report path, stdout by default")
+
+    compare_parser = commands.add_parser('compare', help="Compare two JSON reports metric by metric")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('candidate')
+    args = parser.parse_args(argv)
+
+    if args.command == 'compare':
+        with open(args.baseline) as f, open(args.candidate) as g:
+            rows = compare(json.load(f), json.load(g))
+        for row in rows:
+            change = f"{row['change_pct']:+.1f}%" if row['change_pct'] is not None else 'n/a'
+            print(f"{row['metric']:<60} {row['baseline']:>12} {row['candidate']:>12} {change:>9}")
+        return 0
+
+    report = json.dumps(run(args), indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
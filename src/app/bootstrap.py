@@ -0,0 +1,151 @@
+# Startup lifecycle: ingestion and index setup run in the background instead of at import time
+import json
+import sys
+import threading
+from typing import Optional
+from src.app.routes import get_search_app
+from src.pipelines.inference_pipeline import PREDEFINED_QUERIES
+from src.models.similarity_model import SimilarityModel
+from src.pipelines.index_manager import IndexManager
+from src.pipelines.training_pipeline import RedisSearchIndex
+from src.utils.redis_client import LockKeeper, RedisClient
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+
+class SearchBootstrap:
+    """
+    Loads the model, ingests the bikes data and creates the search index on a background thread.
+    A Redis lock makes sure only one replica ingests; the others wait for it and then serve. The holder keeps
+    the lock alive while it ingests and leaves the outcome under `outcome_key`, so the waiters fail with the
+    holder's error instead of serving an empty index, and take over when it died without a word.
+    """
+    PENDING, RUNNING, DONE, FAILED, STOPPED = 'pending', 'running', 'done', 'failed', 'stopped'
+
+    def __init__(self):
+        self.config = get_config()
+        self.logger = get_logger("Search Application Bootstrap")
+        self.client = RedisClient().connect()
+        self.lock_name = f"{self.config.INDEX_NAME}:bootstrap-lock"
+        self.outcome_key = f"{self.config.INDEX_NAME}:bootstrap-outcome"
+        self.state = self.PENDING
+        self.error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self.logger.info("Starting the bootstrap job in the background")
+        self._thread = threading.Thread(target=self.run, name="vss-bootstrap", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run(self) -> None:
+        self.state = self.RUNNING
+        try:
+            SimilarityModel().warm_up()
+            if self.config.VECTOR_BACKEND == 'NUMPY':
+                # the snapshot is written offline (`vector_store --numpy-dir`), there is no Redis index to build
+                self.logger.info(f"Serving the NumPy snapshot in {self.config.NUMPY_INDEX_DIR}, skipping ingestion")
+            else:
+                self.sync_once()
+            if not self._stop.is_set():
+                self.wait_until_indexed()
+            if self._stop.is_set():
+                # shut down before the index was confirmed: never report ready
+                self.state = self.STOPPED
+                self.logger.info("Bootstrap stopped before the index was confirmed")
+                return
+            self.prewarm()
+            self.state = self.DONE
+            self.logger.info("Bootstrap finished")
+        except Exception as e:
+            self.state = self.FAILED
+            self.error = str(e)
+            self.logger.error(f"Bootstrap failed: {e}")
+
+    def sync_once(self) -> None:
+        """Ingests on the replica that takes the bootstrap lock; the others wait for it to finish."""
+        while not self._stop.is_set():
+            lock = self.client.lock(self.lock_name, timeout=self.config.BOOTSTRAP_LOCK_TIMEOUT, thread_local=False)
+            if lock.acquire(blocking=False):
+                self._ingest_holding(lock)
+                return
+
+            self.logger.info("Another replica holds the bootstrap lock, waiting for it to finish ingesting")
+            while self.client.exists(self.lock_name) and not self._stop.is_set():
+                self._stop.wait(self.config.BOOTSTRAP_POLL_INTERVAL)
+            raw = self.client.get(self.outcome_key)
+            if raw is not None:
+                outcome = json.loads(raw)
+                if outcome['state'] == self.FAILED:
+                    raise RuntimeError(f"The replica holding the bootstrap lock failed: {outcome['error']}")
+                return
+            if not self._stop.is_set():
+                self.logger.warning("The bootstrap lock went away without an outcome, trying to take it over")
+
+    def _ingest_holding(self, lock) -> None:
+        # the outcome is written before the lock is released, so a waiter always finds it
+        self.client.delete(self.outcome_key)
+        with LockKeeper(lock, self.config.BOOTSTRAP_LOCK_TIMEOUT / 3) as keeper:
+            try:
+                self.ingest()
+            except Exception as e:
+                self._record_outcome({'state': self.FAILED, 'error': str(e)})
+                raise
+            self._record_outcome({'state': self.DONE})
+            if keeper.lost:
+                self.logger.warning("The bootstrap lock was lost while ingesting, another replica may have ingested as well")
+
+    def _record_outcome(self, outcome: dict) -> None:
+        try:
+            self.client.set(self.outcome_key, json.dumps(outcome), ex=self.config.BOOTSTRAP_LOCK_TIMEOUT)
+        except Exception as e:
+            self.logger.error(f"Could not record the bootstrap outcome: {e}")
+
+    def ingest(self) -> None:
+        self.logger.info("Ingesting the bikes data and creating the search index")
+        IndexManager(self.client).sync()
+
+    def index_status(self) -> dict:
+        """State of the index the app searches: FT.INFO of the Redis index, or the size of the NumPy snapshot."""
+        if self.config.VECTOR_BACKEND == 'NUMPY':
+            return {'backend': 'numpy', 'num_docs': len(get_search_app().backend), 'percent_indexed': 1.0}
+        return RedisSearchIndex().index_status()
+
+    def wait_until_indexed(self) -> None:
+        while not self._stop.is_set():
+            try:
+                if self.index_status()['percent_indexed'] >= 1.0:
+                    return
+            except Exception as e:
+                self.logger.info(f"Search index not available yet: {e}")
+            self._stop.wait(self.config.BOOTSTRAP_POLL_INTERVAL)
+
+    def prewarm(self) -> None:
+        """Run the predefined queries once so their embeddings and results are cached before traffic arrives."""
+        self.logger.info("Pre-warming the caches with the predefined queries")
+        try:
+            get_search_app().search(PREDEFINED_QUERIES)
+        except Exception as e:
+            self.logger.error(f"Pre-warming the caches failed: {e}")
+
+    def readiness(self) -> dict:
+        """Ready once bootstrap is done and the index reports it is fully indexed."""
+        if self.state != self.DONE:
+            return {'ready': False, 'bootstrap': self.state, 'error': self.error}
+        try:
+            status = self.index_status()
+        except Exception as e:
+            return {'ready': False, 'bootstrap': self.state, 'error': f"Index unavailable: {e}"}
+        return {'ready': status['percent_indexed'] >= 1.0, 'bootstrap': self.state, 'index': status}
+
+
+if __name__ == "__main__":
+    # run the ingestion once as a standalone job (e.g. a Kubernetes Job before rolling out the API)
+    bootstrap = SearchBootstrap()
+    bootstrap.run()
+    sys.exit(0 if bootstrap.state == SearchBootstrap.DONE else 1)
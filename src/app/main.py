@@ -1,27 +1,71 @@
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from src.app.bootstrap import SearchBootstrap
+from src.app.metrics import MetricsMiddleware, router as metrics_router
+from src.app.profiling import ProfilingMiddleware, router as profiling_router
 from src.app.routes import router
+from src.utils.executor import shutdown_inference_executor
+from src.utils.redis_client import RedisClient
 from src.utils.logger import get_logger
 from src.utils.config import get_config
 
 logger = get_logger("Semantic Search API")
 config = get_config()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Starting the background bootstrap (ingestion and index setup)...")
+    app.state.bootstrap = SearchBootstrap()
+    if config.BOOTSTRAP_ON_STARTUP:
+        app.state.bootstrap.start()
+    else:
+        app.state.bootstrap.state = SearchBootstrap.DONE
+    yield
+    app.state.bootstrap.stop()
+    shutdown_inference_executor()
+    await RedisClient.aclose()
+
+
 app = FastAPI(
     title=config.PROJECT_NAME,
     description=config.DESCRIPTION,
-    version=config.VERSION
+    version=config.VERSION,
+    lifespan=lifespan
 )
 
 logger.info("Including routes for semantic search application...")
 app.include_router(router, prefix="/vss")
+app.include_router(metrics_router)
+app.add_middleware(MetricsMiddleware)
+if config.PROFILING_ENABLED:
+    # off by default: without it no request pays for profiling and the slow-query log is not exposed
+    app.include_router(profiling_router)
+    app.add_middleware(ProfilingMiddleware)
 
 
 @app.get("/health")
+@app.get("/health/live")
 def health_check():
     logger.info("Health check endpoint accessed")
     return {"status": "healthy"}
 
+
+@app.get("/health/ready")
+def readiness_check():
+    """
+    Ready once the bootstrap job has finished and the search index is fully indexed.
+    """
+    bootstrap = getattr(app.state, 'bootstrap', None)
+    if bootstrap is None:
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    readiness = bootstrap.readiness()
+    status_code = 200 if readiness['ready'] else 503
+    return JSONResponse(status_code=status_code, content={"status": "ready" if readiness['ready'] else "not ready", **readiness})
+
+
 def start_server():
     logger.info("Starting Semantic Search API with Uvicorn Server Programmatically...")
 
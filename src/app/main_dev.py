@@ -1,26 +1,14 @@
 import sys
 import unittest
 import argparse
-from src.pipelines.inference_pipeline import SemanticSearch
-from src.data.vector_store import RedisVectorOperations
+from src.pipelines.inference_pipeline import SemanticSearch, PREDEFINED_QUERIES
+from src.pipelines.index_manager import IndexManager
 from src.pipelines.training_pipeline import RedisSearchIndex
 
 
 class SemanticSearchApp:
     def __init__(self):
-        self.queries = [
-            'Bike for small kids',
-            'Best Mountain bikes for kids',
-            'Cheap Mountain bike for kids',
-            'Female specific mountain bike',
-            'Road bike for beginners',
-            'Commuter bike for people over 60',
-            'Comfortable commuter bike',
-            'Good bike for college students',
-            'Mountain bike for beginners',
-            'Vintage bike',
-            'Comfortable city bike'
-        ]
+        self.queries = PREDEFINED_QUERIES
         self.semantic_search = SemanticSearch()
 
     def display_query_options(self):
@@ -42,9 +30,7 @@ class SemanticSearchApp:
 
     def run(self):
 
-        RedisVectorOperations().pipeline_redis()
-        RedisVectorOperations().add_vectorized_description()
-        RedisSearchIndex().create_redis_search_index()
+        IndexManager().sync()
         print(RedisSearchIndex().check_state_index())
 
         self.display_query_options()
@@ -52,8 +38,8 @@ class SemanticSearchApp:
 
         print(f"\nYou selected: {user_query}")
         encoded_queries, query = self.semantic_search.semantic_search_vss([user_query])
-        result_table = self.semantic_search.create_query_table(query, [user_query], encoded_queries)
-        print(result_table)
+        results = self.semantic_search.create_query_table(query, [user_query], encoded_queries)
+        print(self.semantic_search.render_table(results))
 
 def main():
     parser = argparse.ArgumentParser(description="Run Semantic Search App or Tests")
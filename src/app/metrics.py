@@ -0,0 +1,73 @@
+# Prometheus /metrics endpoint, request timing middleware and the FT.INFO index gauges
+import time
+from fastapi import APIRouter
+from fastapi.responses import Response
+from src.utils.metrics import (CONTENT_TYPE, INDEX_DOCS, INDEX_FAILURES, INDEX_PERCENT, INDEX_UP, REGISTRY,
+                               REQUEST_SECONDS, REQUESTS)
+from src.utils.redis_client import RedisClient
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+logger = get_logger("Metrics Endpoint")
+config = get_config()
+
+router = APIRouter()
+
+
+class MetricsMiddleware:
+    """
+    Plain ASGI middleware timing every HTTP request into `vss_request_seconds` and counting it by status.
+    Requests are labelled with the name of the route that served them (e.g. `search_bikes`), so path
+    parameters and unknown paths cannot blow up the number of series.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        started = time.perf_counter()
+        status = 500  # unless the app got as far as starting a response
+
+        async def send_with_status(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # the router records the matched route in the (shared) scope
+            handler = getattr(scope.get('route'), 'name', 'unmatched')
+            REQUEST_SECONDS.observe(time.perf_counter() - started, handler=handler)
+            REQUESTS.inc(handler=handler, status=status)
+
+
+def index_gauges() -> None:
+    """Refreshes the index gauges from FT.INFO at scrape time, so the search path never pays for it."""
+    if config.VECTOR_BACKEND == 'NUMPY':
+        return
+    try:
+        info = RedisClient().connect().ft(config.INDEX_NAME).info()
+    except Exception as e:
+        INDEX_UP.set(0)
+        logger.error(f"FT.INFO failed, index gauges not updated: {e}")
+        return
+    INDEX_UP.set(1)
+    INDEX_DOCS.set(int(info['num_docs']))
+    INDEX_FAILURES.set(int(info['hash_indexing_failures']))
+    INDEX_PERCENT.set(float(info['percent_indexed']))
+
+
+REGISTRY.add_collector(index_gauges)
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics():
+    """
+    Prometheus scrape endpoint: per-stage and end-to-end latency histograms, batch sizes,
+    cache hits and errors, and the search index gauges.
+    """
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
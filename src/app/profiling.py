@@ -0,0 +1,98 @@
+# Opt-in request profiling middleware and the admin endpoint of the slow-query log
+import hmac
+import random
+import threading
+import time
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from src.utils.profiling import PROFILE, SLOW_QUERIES, RequestProfile, SlowQueryLog, StackSampler
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+logger = get_logger("Request Profiling")
+config = get_config()
+
+
+def authorized(value: Optional[bytes]) -> bool:
+    """Whether the raw header `value` is the configured PROFILE_TOKEN (UTF-8); never true without a token."""
+    token = get_config().PROFILE_TOKEN
+    return bool(token) and value is not None and hmac.compare_digest(value, token.encode('utf-8'))
+
+
+def require_token(request: Request) -> None:
+    # the slow-query log holds raw queries; Starlette decodes header bytes as latin-1, so this recovers them
+    value = request.headers.get(config.PROFILE_HEADER)
+    if not authorized(value.encode('latin-1') if value is not None else None):
+        raise HTTPException(status_code=403,
+                            detail=f"The slow-query log requires the {config.PROFILE_HEADER} token")
+
+
+router = APIRouter(dependencies=[Depends(require_token)])
+
+
+class ProfilingMiddleware:
+    """
+    Profiles the requests carrying PROFILE_HEADER set to PROFILE_TOKEN and a PROFILE_SAMPLE_RATE share of
+    the others; without the token, the header cannot make the server profile or sample stacks. A profiled
+    request collects the timing of every search stage it runs, answers with a `Server-Timing` header and,
+    when slower than SLOW_QUERY_MS, is appended to the slow-query log. With PROFILE_STACKS its stacks are
+    sampled as well. Only installed when PROFILING_ENABLED is set.
+    """
+    def __init__(self, app, slow_log: SlowQueryLog = SLOW_QUERIES):
+        self.app = app
+        self.config = get_config()
+        self.header = self.config.PROFILE_HEADER.lower().encode('latin-1')
+        self.slow_log = slow_log
+
+    def _selected(self, scope) -> bool:
+        for name, value in scope['headers']:
+            if name == self.header and authorized(value):
+                return True
+        return self.config.PROFILE_SAMPLE_RATE > 0 and random.random() < self.config.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self._selected(scope):
+            return await self.app(scope, receive, send)
+
+        profile = RequestProfile(scope['method'], scope['path'])
+        if self.config.PROFILE_STACKS:
+            profile.sampler = StackSampler([threading.get_ident()], self.config.PROFILE_STACK_INTERVAL_MS).start()
+        token = PROFILE.set(profile)
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                timing = profile.server_timing(time.perf_counter() - profile.started)
+                message = {**message, 'headers': [*message.get('headers', []), (b'server-timing', timing.encode('latin-1'))]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            PROFILE.reset(token)
+            total = time.perf_counter() - profile.started
+            if profile.sampler is not None:
+                profile.sampler.stop()
+            if total * 1000 >= self.config.SLOW_QUERY_MS:
+                logger.info(f"Slow request {scope['method']} {scope['path']} took {total * 1000:.1f} ms")
+                self.slow_log.add(profile.to_dict(status, total))
+
+
+@router.get("/admin/slow-queries")
+def get_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """
+    The latest profiled requests slower than SLOW_QUERY_MS, newest first: query, k, filters,
+    stage timings and, with PROFILE_STACKS, the most frequent sampled stacks.
+    """
+    return {
+        'enabled': config.PROFILING_ENABLED,
+        'threshold_ms': config.SLOW_QUERY_MS,
+        'entries': SLOW_QUERIES.entries(limit),
+    }
+
+
+@router.delete("/admin/slow-queries", status_code=204)
+def clear_slow_queries():
+    SLOW_QUERIES.clear()
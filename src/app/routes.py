@@ -1,30 +1,93 @@
-from typing import List
-from fastapi import APIRouter, HTTPException
-from src.pipelines.inference_pipeline import SemanticSearch
-from src.data.vector_store import RedisVectorOperations
-from src.pipelines.training_pipeline import RedisSearchIndex
+import base64
+import hashlib
+import json
+import threading
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query
+from src.models.core import SearchFilters, SearchResponse, PaginatedSearchResponse, BatchSearchResponse
+from src.pipelines.inference_pipeline import SemanticSearch, PREDEFINED_QUERIES
+from src.pipelines.filters import compile_filters
+from src.pipelines.index_manager import IndexManager
+from src.models.embedding_cache import EmbeddingCache
 from src.utils.logger import get_logger
+from src.utils.config import get_config
 
 log = get_logger("Semantic Search on Bikes dataset...")
+config = get_config()
 
 router = APIRouter()
 
-log.info("Initialize the search app and index setup")
-search_app = SemanticSearch()
-RedisVectorOperations().pipeline_redis()
-RedisVectorOperations().add_vectorized_description()
-RedisSearchIndex().create_redis_search_index()
 
-@router.post("/search/")
-def search_bikes(query: str):
+@lru_cache(maxsize=1)
+def get_search_app() -> SemanticSearch:
+    # ingestion and index setup happen in the app lifespan (see src/app/bootstrap.py)
+    log.info("Initialize the search app")
+    return SemanticSearch()
+
+
+def search_filters(min_price: Optional[float] = Query(None, ge=0),
+                   max_price: Optional[float] = Query(None, ge=0),
+                   types: Optional[List[str]] = Query(None, alias='type'),
+                   brand: Optional[str] = Query(None, max_length=100)) -> Optional[SearchFilters]:
+    """
+    Optional pre-filters shared by the search endpoints:
+    - `min_price` / `max_price`: inclusive price range.
+    - `type`: bike type, repeat the parameter to accept several types.
+    - `brand`: brand name.
+    """
+    if min_price is None and max_price is None and not types and not brand:
+        return None
+    filters = SearchFilters(min_price=min_price, max_price=max_price, types=types or [], brand=brand)
+    try:
+        compile_filters(filters)  # rejects an empty price range and a brand without searchable words
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return filters
+
+
+def _query_fingerprint(query: str, filters: Optional[SearchFilters] = None) -> str:
+    filters_json = filters.model_dump_json() if filters is not None else ''
+    return hashlib.sha1(f"{EmbeddingCache.normalize(query)}|{filters_json}".encode('utf-8')).hexdigest()[:16]
+
+
+def _runtime_params(ef_runtime: Optional[int]) -> dict:
+    return {'ef_runtime': ef_runtime} if ef_runtime is not None else {}
+
+
+def _encode_cursor(query: str, filters: Optional[SearchFilters], k: int, offset: int, per_page: int) -> str:
+    payload = json.dumps({'q': _query_fingerprint(query, filters), 'k': k, 'o': offset, 'n': per_page})
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str, query: str, filters: Optional[SearchFilters]) -> Tuple[int, int, int]:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        k, offset, per_page = int(payload['k']), int(payload['o']), int(payload['n'])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Malformed pagination cursor")
+    if payload.get('q') != _query_fingerprint(query, filters):
+        raise HTTPException(status_code=400, detail="Pagination cursor belongs to a different query")
+    if not (1 <= k <= config.MAX_K and 1 <= per_page <= config.MAX_PAGE_SIZE and offset >= 0):
+        raise HTTPException(status_code=400, detail="Pagination cursor is out of bounds")
+    return k, offset, per_page
+
+
+@router.post("/search/", response_model=SearchResponse)
+async def search_bikes(query: str, k: int = Query(config.KNN_DEFAULT_K, ge=1, le=config.MAX_K),
+                       ef_runtime: Optional[int] = Query(None, ge=1),
+                       filters: Optional[SearchFilters] = Depends(search_filters),
+                       search_app: SemanticSearch = Depends(get_search_app)):
     """
     Perform a semantic search on the bikes dataset.
     - `query`: Search query input from the user
+    - `k`: Number of nearest bikes to return.
+    - `ef_runtime`: HNSW candidate list size, higher trades latency for recall (ignored for FLAT).
+    - `min_price`, `max_price`, `type`, `brand`: filters applied by Redis before vector scoring.
     """
     try:
-        encoded_queries, result_query = search_app.semantic_search_vss([query])
-        result_table = search_app.create_query_table(result_query, [query], encoded_queries)
-        return {"query": query, "results": result_table}
+        results = await search_app.search_async([query], k, _runtime_params(ef_runtime), filters=filters)
+        return SearchResponse(query=query, results=results)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error performing search: {e}")
 
@@ -35,164 +98,112 @@ def get_available_queries():
     Get the list of predefined search queries
     to help users understand what kind of searches can be performed.
     """
-    queries = [
-        'Bike for small kids',
-        'Best Mountain bikes for kids',
-        'Cheap Mountain bike for kids',
-        'Female specific mountain bike',
-        'Road bike for beginners',
-        'Commuter bike for people over 60',
-        'Comfortable commuter bike',
-        'Good bike for college students',
-        'Mountain bike for beginners',
-        'Vintage bike',
-        'Comfortable city bike'
-    ]
     try:
-        return {"available_queries": queries}
+        return {"available_queries": PREDEFINED_QUERIES}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error retrieving queries: {e}")
 
 
-@router.post("/search/paginated/")
-def search_bikes_paginated(query: str, page: int = 1, per_page: int = 10):
+@router.post("/search/paginated/", response_model=PaginatedSearchResponse)
+async def search_bikes_paginated(query: str,
+                                 page: int = Query(1, ge=1),
+                                 per_page: int = Query(10, ge=1, le=config.MAX_PAGE_SIZE),
+                                 k: int = Query(config.MAX_K, ge=1, le=config.MAX_K),
+                                 cursor: Optional[str] = None,
+                                 ef_runtime: Optional[int] = Query(None, ge=1),
+                                 filters: Optional[SearchFilters] = Depends(search_filters),
+                                 search_app: SemanticSearch = Depends(get_search_app)):
     """
     Perform a paginated semantic search on the bikes dataset.
     - `query`: Search query input from the user.
     - `page`: Page number (default: 1).
     - `per_page`: Results per page (default: 10).
+    - `k`: Size of the ranked result set being paged through.
+    - `cursor`: `next_cursor` from the previous page; overrides `page`, `per_page` and `k`.
+    - `ef_runtime`: HNSW candidate list size (ignored for FLAT).
+    - `min_price`, `max_price`, `type`, `brand`: filters applied by Redis before vector scoring; a cursor only
+      continues the search it was issued for.
     """
+    if cursor is not None:
+        k, offset, per_page = _decode_cursor(cursor, query, filters)
+    else:
+        offset = (page - 1) * per_page
     try:
-        encoded_queries, result_query = search_app.semantic_search_vss([query])
-        result_table = search_app.create_query_table(result_query, [query], encoded_queries)
-
-        # pagination logic
-        start = (page - 1) * per_page
-        end = start + per_page
-        paginated_results = result_table[start:end]
-
-        return {
-            "query": query,
-            "page": page,
-            "per_page": per_page,
-            "results": paginated_results,
-            "total_results": len(result_table)
-        }
+        # Redis ranks the top-k and returns only this page (KNN k + LIMIT offset per_page)
+        [hits] = await search_app.search_hits_async([query], k, offset, per_page, _runtime_params(ef_runtime),
+                                                    filters=filters)
+        next_offset = offset + per_page
+
+        return PaginatedSearchResponse(
+            query=query,
+            k=k,
+            page=offset // per_page + 1,
+            per_page=per_page,
+            results=hits.results,
+            total_results=hits.total,
+            next_cursor=_encode_cursor(query, filters, k, next_offset, per_page) if next_offset < hits.total else None
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error performing search: {e}")
 
 
-@router.post("/refresh-index/")
+@router.get("/stats/")
+def get_search_stats(search_app: SemanticSearch = Depends(get_search_app)):
+    """
+    Runtime statistics of the search app (query embedding batch fill rate and queue wait,
+    embedding and result cache hits, misses and evictions).
+    """
+    return search_app.stats()
+
+
+@router.post("/refresh-index/", status_code=202)
 def refresh_search_index():
     """
-    Rebuild the Redis search index.
+    Rebuild the Redis search index without downtime: a new index generation is built in the background
+    and the index alias is switched to it once it is fully indexed. Follow it with GET /refresh-index/.
+    """
+    index_manager = IndexManager()
+    if index_manager.client.exists(index_manager.lock_name):
+        raise HTTPException(status_code=409, detail="An index rebuild is already running")
+
+    def rebuild():
+        try:
+            index_manager.rebuild()
+        except Exception as e:
+            log.error(f"Index rebuild failed: {e}")
+
+    threading.Thread(target=rebuild, name="vss-index-rebuild", daemon=True).start()
+    return {"message": "Index rebuild started"}
+
+
+@router.get("/refresh-index/")
+def search_index_rebuild_progress():
+    """
+    Progress of the latest index rebuild (phase, percent indexed, errors) and the generation the alias serves.
     """
     try:
-        RedisSearchIndex().create_redis_search_index()
-        return {"message": "Search index refreshed successfully"}
+        return IndexManager().progress()
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error refreshing search index: {e}")
+        raise HTTPException(status_code=500, detail=f"Error reading the index rebuild progress: {e}")
 
 
-@router.post("/batch-search/")
-def batch_search_bikes(queries: List[str]):
+@router.post("/batch-search/", response_model=BatchSearchResponse)
+async def batch_search_bikes(queries: List[str], k: int = Query(config.KNN_DEFAULT_K, ge=1, le=config.MAX_K),
+                             ef_runtime: Optional[int] = Query(None, ge=1),
+                             filters: Optional[SearchFilters] = Depends(search_filters),
+                             search_app: SemanticSearch = Depends(get_search_app)):
     """
     Perform a semantic search on a batch of queries.
     - `queries`: List of search queries from the user.
+    - `k`: Number of nearest bikes to return per query.
+    - `ef_runtime`: HNSW candidate list size (ignored for FLAT).
+    - `min_price`, `max_price`, `type`, `brand`: filters applied to every query of the batch.
     """
+    if len(queries) > config.MAX_BATCH_QUERIES:
+        raise HTTPException(status_code=422,
+                            detail=f"A batch can hold at most {config.MAX_BATCH_QUERIES} queries, got {len(queries)}")
     try:
-        encoded_queries, result_query = search_app.semantic_search_vss(queries)
-        result_table = search_app.create_query_table(result_query, queries, encoded_queries)
-        return {"batch_results": result_table}
+        results = await search_app.search_async(queries, k, _runtime_params(ef_runtime), filters=filters)
+        return BatchSearchResponse(batch_results=results)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error performing batch search: {e}")
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
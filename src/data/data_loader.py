@@ -1,9 +1,64 @@
+import ast
+import codecs
+import csv
 import requests
 import json
 import pandas as pd
+from typing import Iterable, Iterator, Optional
 from src.utils.logger import get_logger
 from src.utils.config import get_config
 
+CHUNK_SIZE = 64 * 1024
+
+
+def _iter_json_array(chunks: Iterable[str]) -> Iterator[dict]:
+    """Yields the objects of a top-level JSON array while holding at most one object plus one chunk in memory."""
+    decoder = json.JSONDecoder()
+    buffer, position, started = '', 0, False
+    chunks = iter(chunks)
+    exhausted = False
+    while True:
+        # skip whitespace, the opening bracket and separators
+        while position < len(buffer) and (buffer[position].isspace() or buffer[position] == ',' or
+                                          (not started and buffer[position] == '[')):
+            started = started or buffer[position] == '['
+            position += 1
+        if position < len(buffer) and buffer[position] == ']':
+            return
+        try:
+            if position < len(buffer):
+                item, position = decoder.raw_decode(buffer, position)
+                yield item
+                continue
+        except json.JSONDecodeError:
+            if exhausted:
+                raise
+        if exhausted:
+            return
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+        else:
+            buffer, position = buffer[position:] + chunk, 0
+
+
+def _csv_value(value: str):
+    # CSV exports carry numbers and nested dicts (the specs) as text
+    if value is None or value == '':
+        return None
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    if value[0] in '{[':
+        try:
+            return ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            pass
+    return value
+
+
 class BikeDataLoader:
     def __init__(self):
         self.config = get_config()
@@ -20,6 +75,49 @@ class BikeDataLoader:
         except Exception as e:
             self.logger.error(f"Error loading data: {e}")
 
+    def _text_chunks(self, source: str) -> Iterator[str]:
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        if source.startswith(('http://', 'https://')):
+            with requests.get(source, stream=True) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                    yield decoder.decode(chunk)
+        else:
+            with open(source, 'rb') as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    yield decoder.decode(chunk)
+        yield decoder.decode(b'', final=True)
+
+    def _lines(self, source: str) -> Iterator[str]:
+        pending = ''
+        for chunk in self._text_chunks(source):
+            lines = (pending + chunk).split('\n')
+            pending = lines.pop()
+            yield from lines
+        if pending:
+            yield pending
+
+    def stream(self, source: Optional[str] = None, fmt: Optional[str] = None) -> Iterator[dict]:
+        """
+        Yields the bikes one at a time from a JSON array, JSONL or CSV file or URL (DATAURL by default),
+        so ingestion memory does not grow with the size of the source.
+        """
+        source = source or self.url
+        fmt = (fmt or source.rsplit('?', 1)[0].rsplit('.', 1)[-1]).lower()
+        self.logger.info(f"Streaming the bikes data from {source} as {fmt}")
+        if fmt == 'jsonl':
+            for line in self._lines(source):
+                if line.strip():
+                    yield json.loads(line)
+        elif fmt == 'csv':
+            for row in csv.DictReader(self._lines(source)):
+                # drop the unnamed index column of pandas exports
+                yield {field: _csv_value(value) for field, value in row.items() if field}
+        elif fmt == 'json':
+            yield from _iter_json_array(self._text_chunks(source))
+        else:
+            raise ValueError(f"Unsupported source format {fmt}, expected json, jsonl or csv")
+
     def json_data_to_dataframe(self, bikes_json: json = None) -> pd.DataFrame:
         self.logger.info("Converting JSON bikes data to a pandas DataFrame...")
         try:
@@ -0,0 +1,245 @@
+# Persistent on-disk embedding store: memory-mapped float32 rows plus an append-only index
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+import numpy as np
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+
+class EmbeddingStore:
+    """
+    Local store of description embeddings keyed by (model name, content hash), so rebuilding Redis or a
+    new environment reads vectors from disk instead of running the transformer again.
+
+    Each model gets a directory with three files:
+    - `vectors.f32`: float32 rows appended back to back, read through `np.memmap`;
+    - `index`: one `<content hash> <row> <crc32>` line per row, append-only;
+    - `meta.json`: the model name and vector dimension.
+    Vectors are written and fsynced before their index lines, so a crash can only leave unreferenced
+    rows behind, which `compact()` drops. Every read checks the row CRC.
+    """
+    def __init__(self, directory: Optional[str] = None, model_name: Optional[str] = None):
+        self.config = get_config()
+        self.logger = get_logger("On-disk Embedding Store")
+        self.model_name = model_name or self.config.PRETRAINED_TRANSFORMER_MODEL
+        root = directory or self.config.EMBEDDING_STORE_DIR
+        self.directory = os.path.join(root, self.model_name.replace('/', '__'))
+        os.makedirs(self.directory, exist_ok=True)
+        self.vectors_path = os.path.join(self.directory, 'vectors.f32')
+        self.index_path = os.path.join(self.directory, 'index')
+        self.meta_path = os.path.join(self.directory, 'meta.json')
+        self.lock_path = os.path.join(self.directory, '.lock')
+        self._lock = threading.Lock()
+        self._load()
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        return hashlib.sha1((text or '').encode('utf-8')).hexdigest()
+
+    def _load(self) -> None:
+        self.dimension: Optional[int] = None
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            if meta['model'] != self.model_name:
+                raise ValueError(f"Embedding store {self.directory} belongs to {meta['model']}, not {self.model_name}")
+            self.dimension = int(meta['dimension'])
+        self._entries: Dict[str, Tuple[int, int]] = {}
+        self._index_inode, self._index_offset = None, 0
+        self._matrix = None
+        self._mapped_rows = 0
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Reads index lines appended since the last call; reloads everything when the index was compacted."""
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            return
+        if self._index_inode is not None and stat.st_ino != self._index_inode:
+            self._load()
+            return
+        self._index_inode = stat.st_ino
+        with open(self.index_path, 'rb') as f:
+            f.seek(self._index_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # a torn last line is ignored until it is complete
+                self._index_offset += len(line)
+                content_hash, row, crc = line.split()
+                self._entries[content_hash.decode('ascii')] = (int(row), int(crc))
+
+    @property
+    def row_bytes(self) -> int:
+        return self.dimension * 4
+
+    def rows(self) -> int:
+        if self.dimension is None or not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // self.row_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _rows_view(self, row: int) -> Optional[np.ndarray]:
+        # remap when rows were appended since the last mapping
+        if self._matrix is None or row >= self._mapped_rows:
+            rows = self.rows()
+            if row >= rows:
+                return None
+            self._matrix = np.memmap(self.vectors_path, dtype=np.float32, mode='r', shape=(rows, self.dimension))
+            self._mapped_rows = rows
+        return self._matrix
+
+    def _read(self, content_hash: str) -> Optional[np.ndarray]:
+        entry = self._entries.get(content_hash)
+        matrix = self._rows_view(entry[0]) if entry is not None else None
+        if matrix is None:
+            return None
+        vector = np.array(matrix[entry[0]])
+        if zlib.crc32(vector.tobytes()) != entry[1]:
+            self.logger.error(f"Row {entry[0]} for {content_hash} failed its integrity check, ignoring it")
+            return None
+        return vector
+
+    def get_many(self, hashes: List[str]) -> List[Optional[np.ndarray]]:
+        """Stored vectors in input order, `None` for unknown hashes and rows that fail their CRC."""
+        with self._lock:
+            return [self._read(content_hash) for content_hash in hashes]
+
+    @contextmanager
+    def _file_lock(self):
+        # serializes writers across processes sharing the directory
+        with open(self.lock_path, 'w') as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+                return
+            # msvcrt locks the first byte of the file and gives up after ten seconds: keep retrying
+            while True:
+                try:
+                    msvcrt.locking(lock.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock.seek(0)
+                msvcrt.locking(lock.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def put_many(self, hashes: Iterable[str], vectors) -> int:
+        """Appends the vectors whose hash is not stored yet and returns how many were added."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock, self._file_lock():
+            self._refresh()  # pick up rows appended by other processes
+            if self.dimension is None:
+                self.dimension = int(vectors.shape[1])
+                with open(self.meta_path, 'w') as f:
+                    json.dump({'model': self.model_name, 'dimension': self.dimension}, f)
+            elif vectors.shape[1] != self.dimension:
+                raise ValueError(f"Expected {self.dimension}-dimensional vectors, got {vectors.shape[1]}")
+
+            new, seen = [], set()
+            for content_hash, vector in zip(hashes, vectors):
+                if content_hash not in self._entries and content_hash not in seen:
+                    seen.add(content_hash)
+                    new.append((content_hash, vector))
+            if not new:
+                return 0
+
+            first_row = self.rows()
+            with open(self.vectors_path, 'ab') as f:
+                f.truncate(first_row * self.row_bytes)  # drop a torn partial row
+                f.write(np.stack([vector for _, vector in new]).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            lines = [f"{content_hash} {row} {zlib.crc32(vector.tobytes())}\n"
+                     for row, (content_hash, vector) in enumerate(new, start=first_row)]
+            with open(self.index_path, 'a') as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._refresh()
+        return len(new)
+
+    def verify(self) -> Dict[str, int]:
+        """Checks every indexed row against its CRC and counts unreferenced rows."""
+        with self._lock:
+            self._refresh()
+            rows = self.rows()
+            report = {'entries': len(self._entries), 'rows': rows, 'missing': 0, 'corrupt': 0, 'orphans': 0}
+            matrix = self._rows_view(rows - 1) if rows else None
+            referenced = set()
+            for row, crc in self._entries.values():
+                if row >= rows:
+                    report['missing'] += 1
+                    continue
+                if zlib.crc32(np.array(matrix[row]).tobytes()) != crc:
+                    report['corrupt'] += 1
+                referenced.add(row)
+            report['orphans'] = rows - len(referenced)
+        return report
+
+    def compact(self, keep: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """
+        Rewrites the store with only intact, referenced rows (restricted to `keep` when given),
+        swapping the new files in atomically.
+        """
+        keep = set(keep) if keep is not None else None
+        with self._lock, self._file_lock():
+            self._load()
+            before = self.rows()
+            kept = 0
+            # rows are streamed from the memmap, so compaction never holds the matrix in memory
+            with open(self.vectors_path + '.tmp', 'wb') as vectors_file, open(self.index_path + '.tmp', 'w') as index_file:
+                for content_hash in list(self._entries):
+                    if keep is not None and content_hash not in keep:
+                        continue
+                    vector = self._read(content_hash)
+                    if vector is None:
+                        continue
+                    vectors_file.write(vector.tobytes())
+                    index_file.write(f"{content_hash} {kept} {zlib.crc32(vector.tobytes())}\n")
+                    kept += 1
+                for f in (vectors_file, index_file):
+                    f.flush()
+                    os.fsync(f.fileno())
+            self._matrix = None
+            os.replace(self.vectors_path + '.tmp', self.vectors_path)
+            os.replace(self.index_path + '.tmp', self.index_path)
+            self._load()
+        self.logger.info(f"Compacted {self.directory}: {before} rows down to {kept}")
+        return {'rows_before': before, 'rows_after': kept}
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check or compact the on-disk embedding store")
+    parser.add_argument('action', choices=['verify', 'compact'])
+    parser.add_argument('--directory', help="Store root, EMBEDDING_STORE_DIR by default")
+    parser.add_argument('--model', help="Model name, PRETRAINED_TRANSFORMER_MODEL by default")
+    args = parser.parse_args(argv)
+
+    store = EmbeddingStore(args.directory, args.model)
+    report = store.verify() if args.action == 'verify' else store.compact()
+    print(json.dumps(report))
+    return 1 if report.get('corrupt') or report.get('missing') else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,39 +1,205 @@
 # Redis vector operations
-from typing import List, Any
+import argparse
+import hashlib
+import itertools
+import json
+import sys
+import time
+import numpy as np
+from typing import Dict, Iterable, List, Optional
 from src.utils.redis_client import RedisClient
 from src.data.data_loader import BikeDataLoader
-from src.models.embedding_model import VectorEmbedding
-from src.utils.logger import get_logger
+from src.data.embedding_store import EmbeddingStore
+from src.models.parallel_encoder import ParallelEncoder
+from src.models.similarity_model import SimilarityModel
+from src.pipelines.backends import NumpyBackend, RedisBackend, VectorBackend
+from src.utils.resources import peak_rss_mb
+from src.utils.logger import ProgressLogger, get_logger
 from src.utils.config import get_config
 
+
+def _chunks(items: Iterable, size: int) -> Iterable[List]:
+    items = iter(items)
+    while batch := list(itertools.islice(items, size)):
+        yield batch
+
+
 class RedisVectorOperations:
-    def __init__(self):
+    """
+    Incrementally syncs the bikes source into a vector backend, Redis by default. Every document has a
+    stable key and two hashes: `doc_hash` over its source fields and `embedding_hash` over the embedded
+    text and model. The source is streamed in batches: each batch reads its stored hashes in one round
+    trip, encodes only descriptions whose embedding hash changed and hands the writes to the backend's
+    writer. Documents that left the source are deleted at the end.
+    """
+    def __init__(self, bikes: Optional[Iterable[dict]] = None, encode_workers: Optional[int] = None,
+                 prefix: Optional[str] = None, backend: Optional[VectorBackend] = None):
         self.config = get_config()
         self.logger = get_logger("Handling Redis Vector Operations...")
         self.client = RedisClient().connect()
-        self.logger.info("Get the embedder model, Redis client, and the bikes data...")
-        self.embeddings = VectorEmbedding().vector_embedding()
-        self.bikes = BikeDataLoader().load_data()
-
-    def pipeline_redis(self) -> Any:
-        self.logger.info("Storing the Bikes as JSON Documents in Redis")
-        pipeline = self.client.pipeline()
-        for i, bike in enumerate(self.bikes, start=1):
-            redis_key = f'{self.config.DOC_PREFIX}:{i:03}'
-            self.logger.info("Checking if the key already exists in Redis")
-            if self.client.exists(redis_key):
-                self.logger.info(f"Bike with ID {i:03} already exists, skipping insertion.")
-                return
-            pipeline.json().set(redis_key, '$', bike)
-        self.logger.info("Stored the bikes JSON data in Redis.")
-        return pipeline.execute()
-
-    def add_vectorized_description(self) -> List:
-        self.logger.info("Adding vectorized descriptions to the JSON documents in Redis using JSON.SET")
-        pipeline = self.client.pipeline()
-        keys = sorted(self.client.keys(self.config.CLIENT_KEYS))
-        for key, embedding in zip(keys, self.embeddings):
-            self.logger.info("Checking if the key already exists in Redis")
-            pipeline.json().set(key, '$.description_embeddings', embedding)
-        self.logger.info("Stored the bike data with embeddings in Redis.")
-        return pipeline.execute()
+        self.bikes = bikes
+        # documents live under DOC_PREFIX, or under the versioned prefix of a blue/green index generation
+        self.prefix = prefix or self.config.DOC_PREFIX
+        self.key_pattern = f"{prefix}:*" if prefix else self.config.CLIENT_KEYS
+        self.backend = backend if backend is not None else RedisBackend(self.client, key_pattern=self.key_pattern)
+        self.batch_size = self.config.INGEST_BATCH_SIZE
+        self.encode_workers = self.config.ENCODE_WORKERS if encode_workers is None else encode_workers
+        self.embedding_store = EmbeddingStore() if self.config.EMBEDDING_STORE_DIR else None
+        self._embedder = None
+
+    @property
+    def embedder(self):
+        # the model is only loaded when some description actually has to be encoded
+        if self._embedder is None:
+            if self.encode_workers > 0:
+                self._embedder = ParallelEncoder(workers=self.encode_workers)
+            else:
+                self._embedder = SimilarityModel().load_model()
+        return self._embedder
+
+    def close(self) -> None:
+        if isinstance(self._embedder, ParallelEncoder):
+            self._embedder.close()
+            self._embedder = None
+
+    def doc_key(self, bike: dict) -> str:
+        """Stable key: the source `id` when there is one, otherwise derived from brand and model."""
+        doc_id = bike.get('id')
+        if doc_id is None:
+            doc_id = hashlib.sha1(f"{bike.get('brand')}|{bike.get('model')}".encode('utf-8')).hexdigest()[:16]
+        return f"{self.prefix}:{doc_id}"
+
+    def _unique_key(self, bike: dict, taken: set) -> Optional[str]:
+        """
+        `doc_key`, except for repeats within a sync: a bike without `id` whose brand and model came before gets
+        the occurrence number appended (`-2`, `-3`, ... in source order) instead of overwriting the earlier row;
+        a repeated `id` is logged and skipped (None), keeping its first row.
+        """
+        key = self.doc_key(bike)
+        if key not in taken:
+            return key
+        if bike.get('id') is not None:
+            self.logger.warning(f"Duplicate id {bike['id']!r} in the source, keeping its first row")
+            return None
+        occurrence = 2
+        while f"{key}-{occurrence}" in taken:
+            occurrence += 1
+        return f"{key}-{occurrence}"
+
+    @staticmethod
+    def doc_hash(bike: dict) -> str:
+        return hashlib.sha1(json.dumps(bike, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+    def embedding_hash(self, bike: dict) -> str:
+        # a new model or vector type invalidates every stored vector
+        payload = f"{self.config.PRETRAINED_TRANSFORMER_MODEL}|{self.config.VECTOR_TYPE}|{bike.get('description') or ''}"
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _vectors(self, descriptions: List[str], keys: List[str], summary: Dict[str, int]) -> Dict[str, np.ndarray]:
+        """Vectors for the descriptions, read from the on-disk store where possible and encoded otherwise."""
+        if not keys:
+            return {}
+        if self.embedding_store is None:
+            summary['encoded'] += len(keys)
+            return dict(zip(keys, self.embedder.encode(descriptions)))
+
+        hashes = [EmbeddingStore.content_hash(description) for description in descriptions]
+        vectors = self.embedding_store.get_many(hashes)
+        misses = [i for i, vector in enumerate(vectors) if vector is None]
+        if misses:
+            encoded = self.embedder.encode([descriptions[i] for i in misses])
+            self.embedding_store.put_many([hashes[i] for i in misses], encoded)
+            for i, vector in zip(misses, encoded):
+                vectors[i] = vector
+        summary['encoded'] += len(misses)
+        summary['from_store'] += len(keys) - len(misses)
+        return dict(zip(keys, vectors))
+
+    def _sync_batch(self, bikes: List[dict], write, summary: Dict[str, int], seen: set) -> None:
+        documents = {}
+        for bike in bikes:
+            key = self._unique_key(bike, seen)
+            if key is not None:
+                seen.add(key)
+                documents[key] = (bike, (self.doc_hash(bike), self.embedding_hash(bike)))
+        stored = self.backend.stored_hashes(list(documents))
+
+        changed = [key for key, (_, hashes) in documents.items() if stored[key] != hashes]
+        to_encode = [key for key in changed if stored[key][1] != documents[key][1][1]]
+        # vectors are joined to their documents by key, never by position in Redis
+        vectors = self._vectors([documents[key][0].get('description') or '' for key in to_encode], to_encode, summary)
+
+        if changed:
+            write([(key, *documents[key], vectors.get(key), stored[key] == (None, None)) for key in changed])
+        summary['documents'] += len(documents)
+        summary['written'] += len(changed)
+
+    def delete_missing(self, seen: set) -> int:
+        deleted = 0
+        for batch in _chunks((key for key in self.backend.keys() if key not in seen), self.batch_size):
+            deleted += self.backend.delete(batch)
+        return deleted
+
+    def sync(self, bikes: Optional[Iterable[dict]] = None, delete_missing: bool = True) -> Dict[str, int]:
+        """
+        Streams the source into Redis and returns how many documents were read, written, encoded and deleted.
+        Memory is bounded by the batch size and the writer queue; only the set of seen keys grows with the corpus.
+        """
+        bikes = bikes if bikes is not None else self.bikes
+        if bikes is None:
+            bikes = BikeDataLoader().stream()
+
+        summary = {'documents': 0, 'written': 0, 'encoded': 0, 'from_store': 0, 'deleted': 0}
+        seen = set()
+        progress = ProgressLogger(self.logger, "Ingestion", unit='documents')
+        try:
+            with self.backend.writer() as write:
+                for batch in _chunks(bikes, self.batch_size):
+                    self._sync_batch(batch, write, summary, seen)
+                    progress.update(len(batch), written=summary['written'], encoded=summary['encoded'],
+                                    from_the_embedding_store=summary['from_store'])
+            progress.done()
+        finally:
+            # worker processes hold a model each; do not keep them around between syncs
+            self.close()
+
+        if delete_missing:
+            summary['deleted'] = self.delete_missing(seen)
+        if summary['written'] or summary['deleted']:
+            self.backend.invalidate()
+        self.logger.info(f"Ingestion finished: {summary}")
+        return summary
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Stream a bikes source (JSON, JSONL or CSV) into Redis")
+    parser.add_argument('--source', help="File path or URL, DATAURL by default")
+    parser.add_argument('--format', choices=['json', 'jsonl', 'csv'], help="Source format, inferred from the extension by default")
+    parser.add_argument('--batch-size', type=int, help="Documents encoded and written per batch")
+    parser.add_argument('--keep-missing', action='store_true', help="Do not delete documents missing from the source")
+    parser.add_argument('--workers', type=int, help="Encoder processes (0 encodes in-process), ENCODE_WORKERS by default")
+    parser.add_argument('--numpy-dir', help="Write a NumPy backend snapshot (see NUMPY_INDEX_DIR) instead of syncing Redis")
+    args = parser.parse_args(argv)
+
+    # a snapshot is rebuilt from scratch, reusing vectors from the embedding store when one is configured
+    backend = NumpyBackend() if args.numpy_dir else None
+    store = RedisVectorOperations(BikeDataLoader().stream(args.source, args.format), encode_workers=args.workers,
+                                  backend=backend)
+    if args.batch_size:
+        store.batch_size = args.batch_size
+    started = time.perf_counter()
+    summary = store.sync(delete_missing=not args.keep_missing)
+    elapsed = time.perf_counter() - started
+    if backend is not None:
+        backend.save(args.numpy_dir)
+
+    print(f"documents: {summary['documents']}  written: {summary['written']}  "
+          f"encoded: {summary['encoded']}  from store: {summary['from_store']}  deleted: {summary['deleted']}")
+    print(f"elapsed: {elapsed:.2f}s  throughput: {summary['documents'] / elapsed:.0f} docs/s  "
+          f"encode: {summary['encoded'] / elapsed:.0f} docs/s  "
+          f"peak RSS: {peak_rss_mb() or 'n/a'} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+# Request-coalescing micro-batcher in front of the sentence transformer
+import asyncio
+import time
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from src.utils.executor import get_inference_executor
+from src.utils.metrics import ENCODE_BATCH_SIZE
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+
+class EmbeddingBatcher:
+    """
+    Gathers queries from concurrent requests for up to `max_wait_ms` (or until `max_batch_size`
+    queries are waiting) and embeds them with a single `encode()` call on the inference executor.
+    Each caller gets back only the vectors for its own queries.
+    """
+    def __init__(self, embedder, max_batch_size: Optional[int] = None, max_wait_ms: Optional[float] = None, executor=None):
+        self.config = get_config()
+        self.logger = get_logger("Query Embedding Micro-Batcher")
+        self.embedder = embedder
+        self.max_batch_size = max_batch_size or self.config.BATCH_MAX_SIZE
+        self.max_wait_ms = self.config.BATCH_MAX_WAIT_MS if max_wait_ms is None else max_wait_ms
+        self.executor = executor
+        self._loop = None
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._timer = None
+        self._tasks = set()
+
+        self._batches = 0
+        self._queries = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    async def encode(self, queries: List[str]) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # the batcher lives on one event loop; start clean if it is reused on a new one
+            self._loop, self._pending, self._timer = loop, [], None
+        futures = [self._submit(loop, query) for query in queries]
+        return np.stack(await asyncio.gather(*futures))
+
+    def _submit(self, loop, query: str) -> asyncio.Future:
+        future = loop.create_future()
+        self._pending.append((query, future, time.perf_counter()))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_ms / 1000, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._pending:
+            batch = self._pending[:self.max_batch_size]
+            self._pending = self._pending[self.max_batch_size:]
+            task = self._loop.create_task(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        executor = self.executor or get_inference_executor()
+        try:
+            vectors = await self._loop.run_in_executor(executor, self.embedder.encode, [query for query, _, _ in batch])
+        except Exception as e:
+            self.logger.error(f"Batched encode of {len(batch)} queries failed: {e}")
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future, _), vector in zip(batch, vectors):
+            if not future.done():
+                future.set_result(vector)
+
+        waits = [started - enqueued for _, _, enqueued in batch]
+        self._batches += 1
+        self._queries += len(batch)
+        ENCODE_BATCH_SIZE.observe(len(batch))
+        self._total_wait += sum(waits)
+        self._max_wait = max(self._max_wait, max(waits))
+
+    def stats(self) -> Dict[str, Any]:
+        avg_batch_size = self._queries / self._batches if self._batches else 0.0
+        return {
+            'batches': self._batches,
+            'queries': self._queries,
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': self.max_wait_ms,
+            'avg_batch_size': round(avg_batch_size, 2),
+            'fill_rate': round(avg_batch_size / self.max_batch_size, 4),
+            'avg_queue_wait_ms': round(self._total_wait / self._queries * 1000, 3) if self._queries else 0.0,
+            'max_queue_wait_ms': round(self._max_wait * 1000, 3),
+            'pending': len(self._pending),
+        }
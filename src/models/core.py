@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 
 
@@ -11,4 +11,48 @@ class CoreModel(BaseModel):
 
 # Model for the input query
 class QueryModel(BaseModel):
-    query: Optional[str]
\ No newline at end of file
+    query: Optional[str]
+
+
+# One KNN hit, built straight from the Redis search document
+class SearchResult(CoreModel):
+    query: str
+    score: float
+    id: str
+    brand: str
+    model: str
+    description: str
+
+
+# The ranked hits of one query; `total` counts every KNN hit, not only the returned page
+class QueryResults(CoreModel):
+    query: str
+    total: int
+    results: List[SearchResult]
+
+
+# Pre-filters applied by Redis before vector scoring; every set field narrows the candidates
+class SearchFilters(CoreModel):
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    types: List[str] = []
+    brand: Optional[str] = None
+
+
+class SearchResponse(CoreModel):
+    query: str
+    results: List[SearchResult]
+
+
+class PaginatedSearchResponse(CoreModel):
+    query: str
+    k: int
+    page: int
+    per_page: int
+    results: List[SearchResult]
+    total_results: int
+    next_cursor: Optional[str] = None
+
+
+class BatchSearchResponse(CoreModel):
+    batch_results: List[SearchResult]
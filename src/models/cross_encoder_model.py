@@ -8,7 +8,45 @@ Characteristics of Cross Encoder (a.k.a reranker) models:
 """
 import numpy as np
 from typing import Optional, List, Any
-from sentence_transformers.cross_encoder import (CrossEncoder)
+from src.models.core import QueryResults
+from src.models.similarity_model import ModelRegistry
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+
+class CrossEncoderReranker:
+    """
+    Re-scores the KNN candidates of one or more queries with a cross-encoder. All (query, description)
+    pairs of a call go through a single batched `predict`; the model is shared through the ModelRegistry.
+    """
+    def __init__(self, model_name: Optional[str] = None, device: Optional[str] = None, batch_size: Optional[int] = None):
+        self.config = get_config()
+        self.logger = get_logger("Cross-Encoder Re-ranker")
+        self.model_name = model_name or self.config.RERANK_MODEL
+        self.device = device or self.config.MODEL_DEVICE
+        self.batch_size = batch_size or self.config.RERANK_BATCH_SIZE
+
+    def model(self):
+        return ModelRegistry.get(self.model_name, self.device, cross_encoder=True)
+
+    def score(self, hits: List[QueryResults]) -> np.ndarray:
+        pairs = [[query_hits.query, row.description] for query_hits in hits for row in query_hits.results]
+        if not pairs:
+            return np.empty(0, dtype=np.float32)
+        return np.asarray(self.model().predict(pairs, batch_size=self.batch_size, show_progress_bar=False), dtype=np.float32)
+
+    @staticmethod
+    def reorder(hits: List[QueryResults], scores: np.ndarray) -> List[QueryResults]:
+        """Sorts every query's candidates by their cross-encoder score, which replaces the vector score."""
+        reranked, start = [], 0
+        for query_hits in hits:
+            query_scores = scores[start:start + len(query_hits.results)]
+            start += len(query_hits.results)
+            order = np.argsort(-query_scores, kind='stable')
+            reranked.append(query_hits.model_copy(update={'results': [
+                query_hits.results[i].model_copy(update={'score': round(float(query_scores[i]), 2)}) for i in order
+            ]}))
+        return reranked
 
 
 class CrossEncoderEmbeddingSimilarities:
@@ -17,9 +55,8 @@ class CrossEncoderEmbeddingSimilarities:
         self._corpus = corpus
 
     def model(self):
-        # Load a pretrained CrossEncoder model
-        model = CrossEncoder("cross-encoder/stsb-distilroberta-base")
-        return model
+        # the pretrained CrossEncoder is loaded once and shared through the model registry
+        return CrossEncoderReranker("cross-encoder/stsb-distilroberta-base").model()
 
     def rank_corpus(self) -> int:
         # We rank all sentences in the corpus for the query
@@ -65,4 +102,4 @@ if __name__ == "__main__":
 
     similarities = CrossEncoderEmbeddingSimilarities(query, corpus)
     similarities.get_scores()
-    similarities.get_scores_two_corpus()
\ No newline at end of file
+    similarities.get_scores_two_corpus()
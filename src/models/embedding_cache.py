@@ -0,0 +1,155 @@
+# Query embedding cache: bounded in-process LRU with TTL, plus an optional shared Redis tier
+import hashlib
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+
+class EmbeddingCache:
+    """
+    Caches query embeddings keyed by normalized query text and model name.
+    The local tier is an LRU bounded by `max_entries` with a per-entry TTL; the optional Redis tier
+    stores the raw float32 bytes so every replica can reuse a vector once any of them encoded it.
+    """
+    def __init__(self, model_name: Optional[str] = None, max_entries: Optional[int] = None,
+                 ttl: Optional[float] = None, redis_client=None, async_redis_client=None):
+        self.config = get_config()
+        self.logger = get_logger("Query Embedding Cache")
+        self.model_name = model_name or self.config.PRETRAINED_TRANSFORMER_MODEL
+        self.max_entries = max_entries or self.config.EMBEDDING_CACHE_MAX_ENTRIES
+        self.ttl = self.config.EMBEDDING_CACHE_TTL if ttl is None else ttl
+        self.redis_client = redis_client
+        self.async_redis_client = async_redis_client
+        self._entries: "OrderedDict[str, Tuple[np.ndarray, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'redis_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        return ' '.join(query.lower().split())
+
+    def _key(self, query: str) -> str:
+        return hashlib.sha1(self.normalize(query).encode('utf-8')).hexdigest()
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.config.EMBEDDING_CACHE_PREFIX}:{self.model_name}:{key}"
+
+    def _check_model(self) -> None:
+        # entries are only valid for the model that produced them
+        if self.model_name != self.config.PRETRAINED_TRANSFORMER_MODEL:
+            self.logger.info(f"Model changed from {self.model_name} to {self.config.PRETRAINED_TRANSFORMER_MODEL}, invalidating the cache")
+            self.model_name = self.config.PRETRAINED_TRANSFORMER_MODEL
+            self.clear()
+
+    def _get_local(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            vector, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._counters['expirations'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters['hits'] += 1
+            return vector
+
+    def _put_local(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = (vector, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters['evictions'] += 1
+
+    def _local_lookup(self, queries: List[str]) -> Tuple[List[str], List[Optional[np.ndarray]]]:
+        self._check_model()
+        keys = [self._key(query) for query in queries]
+        return keys, [self._get_local(key) for key in keys]
+
+    def _merge_redis_hits(self, keys: List[str], vectors: List[Optional[np.ndarray]], missing: List[int], blobs: List) -> None:
+        redis_hits = 0
+        for i, blob in zip(missing, blobs):
+            if blob is not None:
+                vectors[i] = np.frombuffer(blob, dtype=np.float32)
+                self._put_local(keys[i], vectors[i])
+                redis_hits += 1
+        with self._lock:
+            self._counters['redis_hits'] += redis_hits
+            self._counters['misses'] += len(missing) - redis_hits
+
+    def get_many(self, queries: List[str]) -> List[Optional[np.ndarray]]:
+        """Cached vectors in query order, `None` where the query still has to be encoded."""
+        keys, vectors = self._local_lookup(queries)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        blobs = []
+        if missing and self.redis_client is not None:
+            try:
+                blobs = self.redis_client.mget([self._redis_key(keys[i]) for i in missing])
+            except Exception as e:
+                self.logger.error(f"Redis embedding cache lookup failed: {e}")
+        self._merge_redis_hits(keys, vectors, missing, blobs)
+        return vectors
+
+    async def aget_many(self, queries: List[str]) -> List[Optional[np.ndarray]]:
+        keys, vectors = self._local_lookup(queries)
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        blobs = []
+        if missing and self.async_redis_client is not None:
+            try:
+                blobs = await self.async_redis_client.mget([self._redis_key(keys[i]) for i in missing])
+            except Exception as e:
+                self.logger.error(f"Redis embedding cache lookup failed: {e}")
+        self._merge_redis_hits(keys, vectors, missing, blobs)
+        return vectors
+
+    def _prepare(self, queries: List[str], vectors) -> Dict[str, bytes]:
+        blobs = {}
+        for query, vector in zip(queries, vectors):
+            key = self._key(query)
+            vector = np.asarray(vector, dtype=np.float32)
+            self._put_local(key, vector)
+            blobs[self._redis_key(key)] = vector.tobytes()
+        return blobs
+
+    def put_many(self, queries: List[str], vectors) -> None:
+        blobs = self._prepare(queries, vectors)
+        if self.redis_client is not None and blobs:
+            try:
+                pipeline = self.redis_client.pipeline(transaction=False)
+                for redis_key, blob in blobs.items():
+                    pipeline.set(redis_key, blob, ex=self.config.EMBEDDING_CACHE_REDIS_TTL)
+                pipeline.execute()
+            except Exception as e:
+                self.logger.error(f"Redis embedding cache write failed: {e}")
+
+    async def aput_many(self, queries: List[str], vectors) -> None:
+        blobs = self._prepare(queries, vectors)
+        if self.async_redis_client is not None and blobs:
+            try:
+                pipeline = self.async_redis_client.pipeline(transaction=False)
+                for redis_key, blob in blobs.items():
+                    pipeline.set(redis_key, blob, ex=self.config.EMBEDDING_CACHE_REDIS_TTL)
+                await pipeline.execute()
+            except Exception as e:
+                self.logger.error(f"Redis embedding cache write failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters['hits'] + self._counters['redis_hits'] + self._counters['misses']
+        return {
+            **self._counters,
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hit_rate': round((lookups - self._counters['misses']) / lookups, 4) if lookups else 0.0,
+            'model': self.model_name,
+            'redis_tier': self.redis_client is not None,
+        }
@@ -0,0 +1,82 @@
+# Multi-process sentence encoding for corpus ingestion
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import List, Optional
+import numpy as np
+from src.models.similarity_model import SimilarityModel
+from src.utils.executor import cpu_quota
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+# the model owned by this worker process, loaded once by `_init_worker`
+_worker_model = None
+
+
+def _init_worker(model_name: str, device: Optional[str], torch_threads: int) -> None:
+    global _worker_model
+    # cap the intra-op pools before torch is imported, so workers do not oversubscribe the cores
+    for variable in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[variable] = str(torch_threads)
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except ImportError:
+        pass
+    _worker_model = SimilarityModel(model_name, device).load_model()
+
+
+def _encode_chunk(sentences: List[str]) -> np.ndarray:
+    return np.asarray(_worker_model.encode(sentences), dtype=np.float32)
+
+
+class ParallelEncoder:
+    """
+    Encodes large sentence lists on a pool of worker processes, each holding its own copy of the model.
+    The input is split into chunks of `chunk_size`; results come back in input order, so `encode()` is a
+    drop-in replacement for `SentenceTransformer.encode` in the ingestion path.
+    """
+    def __init__(self, workers: Optional[int] = None, chunk_size: Optional[int] = None,
+                 torch_threads: Optional[int] = None, model_name: Optional[str] = None,
+                 device: Optional[str] = None, executor: Optional[Executor] = None):
+        self.config = get_config()
+        self.logger = get_logger("Multi-process Sentence Encoder")
+        self.workers = workers or self.config.ENCODE_WORKERS or cpu_quota()
+        self.chunk_size = chunk_size or self.config.ENCODE_CHUNK_SIZE
+        self.torch_threads = torch_threads or self.config.ENCODE_TORCH_THREADS
+        self.model_name = model_name or self.config.PRETRAINED_TRANSFORMER_MODEL
+        self.device = device or self.config.MODEL_DEVICE
+        self._executor = executor
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            self.logger.info(f"Starting {self.workers} encoder processes with {self.torch_threads} torch threads each")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                # spawn rather than fork: forking a process that already started torch threads can deadlock
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(self.model_name, self.device, self.torch_threads),
+            )
+        return self._executor
+
+    def encode(self, sentences: List[str]) -> np.ndarray:
+        if not sentences:
+            return np.empty((0, 0), dtype=np.float32)
+        # smaller chunks for small inputs, so every worker gets a share
+        chunk_size = max(1, min(self.chunk_size, -(-len(sentences) // self.workers)))
+        chunks = [sentences[start:start + chunk_size] for start in range(0, len(sentences), chunk_size)]
+        # map() yields in submission order, whichever worker finishes first
+        return np.concatenate(list(self.executor.map(_encode_chunk, chunks)))
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -1,18 +1,92 @@
 # The Similarity search model abstraction
-from sentence_transformers import SentenceTransformer
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 from src.utils.logger import get_logger
 from src.utils.config import get_config
 
+
+class ModelRegistry:
+    """
+    Process-wide registry of loaded SentenceTransformer and CrossEncoder models keyed by (model name, device),
+    so every component in a worker shares a single copy of the weights.
+    """
+    _models: Dict[Tuple[str, str], Any] = {}
+    _lock = threading.Lock()
+    logger = get_logger("Sentence Transformer Model Registry")
+
+    @staticmethod
+    def _key(model_name: str, device: Optional[str]) -> Tuple[str, str]:
+        return model_name, device or 'auto'
+
+    @classmethod
+    def get(cls, model_name: str, device: Optional[str] = None, cross_encoder: bool = False) -> Any:
+        """The shared SentenceTransformer (or CrossEncoder, for rerankers) for `model_name` on `device`."""
+        key = cls._key(model_name, device)
+        model = cls._models.get(key)
+        if model is not None:
+            return model
+
+        with cls._lock:
+            # another thread may have finished loading while we waited for the lock
+            model = cls._models.get(key)
+            if model is None:
+                if cross_encoder:
+                    from sentence_transformers import CrossEncoder
+                    cls.logger.info(f"Loading cross-encoder model {model_name} on device {key[1]}")
+                    model = CrossEncoder(model_name, device=device)
+                else:
+                    from sentence_transformers import SentenceTransformer
+                    cls.logger.info(f"Loading sentence transformer model {model_name} on device {key[1]}")
+                    model = SentenceTransformer(model_name, device=device)
+                cls._models[key] = model
+        return model
+
+    @classmethod
+    def release(cls, model_name: Optional[str] = None, device: Optional[str] = None) -> int:
+        """Drop cached models; with no arguments every model is released. Returns the number released."""
+        with cls._lock:
+            if model_name is None:
+                keys = list(cls._models)
+            else:
+                keys = [key for key in [cls._key(model_name, device)] if key in cls._models]
+            for key in keys:
+                cls.logger.info(f"Releasing sentence transformer model {key[0]} on device {key[1]}")
+                del cls._models[key]
+        return len(keys)
+
+    @classmethod
+    def loaded(cls) -> List[Tuple[str, str]]:
+        return list(cls._models)
+
+
 class SimilarityModel:
-    def __init__(self):
+    def __init__(self, model_name: Optional[str] = None, device: Optional[str] = None):
         self.config = get_config()
         self.logger = get_logger("Pre-trained Sentence Transformer Model")
+        self.model_name = model_name or self.config.PRETRAINED_TRANSFORMER_MODEL
+        self.device = device or self.config.MODEL_DEVICE
         self.embedder = None
 
     def load_model(self):
         try:
-            self.embedder = SentenceTransformer(self.config.PRETRAINED_TRANSFORMER_MODEL)
+            self.embedder = ModelRegistry.get(self.model_name, self.device)
             self.logger.info("Embedding using sentence transformers model")
         except Exception as e:
             self.logger.error(f"Failed to load the sentence transformer model: {e}")
         return self.embedder
+
+    def warm_up(self, sentences: Optional[List[str]] = None):
+        """Load the shared model and run one forward pass so the first request does not pay for lazy init."""
+        embedder = self.load_model()
+        if embedder is not None:
+            embedder.encode(sentences or ["warm up"])
+            self.logger.info("Sentence transformer model warmed up")
+        return embedder
+
+    def release(self) -> int:
+        self.embedder = None
+        return ModelRegistry.release(self.model_name, self.device)
+
+    def vector_dimension(self) -> int:
+        """Embedding size read from the model metadata, no encoding required."""
+        return self.load_model().get_sentence_embedding_dimension()
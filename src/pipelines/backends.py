@@ -0,0 +1,481 @@
+# Vector store backends: Redis Stack, and an in-process NumPy engine for exact search
+import asyncio
+import json
+import os
+import queue
+import re
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import numpy as np
+from redis.commands.search.query import Query
+from redis.commands.search.result import Result
+from src.models.core import SearchFilters
+from src.pipelines.filters import compile_filters
+from src.pipelines.result_cache import ResultCache
+from src.utils.executor import get_inference_executor
+from src.utils.vectors import to_bytes
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+# fields returned with every hit, besides the vector score
+RETURN_FIELDS = ('id', 'brand', 'model', 'description')
+
+
+@dataclass
+class KnnQuery:
+    """Backend-neutral KNN request: the top `k` bikes matching `filters`, of which `limit` are returned from `offset`."""
+    k: int
+    offset: int
+    limit: int
+    filters: Optional[SearchFilters] = None
+
+    def redis_query(self) -> Tuple[Query, dict]:
+        """The FT.SEARCH query and the filter parameters it references."""
+        filter_expression, filter_params = compile_filters(self.filters)
+        # HNSW takes the candidate list size per query; FLAT is exact and has no runtime knob
+        ef_runtime = ' EF_RUNTIME $EF_RUNTIME' if get_config().VECTOR_ALGORITHM == 'HNSW' else ''
+        query = (
+            Query(f'({filter_expression})=>[KNN {int(self.k)} @vector $query_vector{ef_runtime} AS vector_score]')
+            .sort_by('vector_score')
+            .return_fields('vector_score', *RETURN_FIELDS)
+            .paging(self.offset, self.limit)
+            .dialect(2)
+        )
+        return query, filter_params
+
+    def query_string(self) -> str:
+        return self.redis_query()[0].query_string()
+
+    def get_args(self) -> List[str]:
+        """Everything that identifies the result set, e.g. for result cache keys."""
+        query, filter_params = self.redis_query()
+        return [str(arg) for arg in query.get_args()] + [f"{name}={value}" for name, value in sorted(filter_params.items())]
+
+
+class Hits(NamedTuple):
+    # same shape as a redis-py search Result: `total` KNN hits, `docs` the requested page
+    total: int
+    docs: List
+
+
+# (key, bike, (doc_hash, embedding_hash), vector or None when unchanged, is_new)
+WriteRecord = Tuple[str, dict, Tuple[str, str], Optional[np.ndarray], bool]
+
+
+class VectorBackend(ABC):
+    """
+    Storage and KNN search of the bike documents. `SemanticSearch` queries a backend and
+    `RedisVectorOperations` syncs the source into one; both default to Redis.
+    """
+    @abstractmethod
+    def search(self, query: KnnQuery, encoded_queries, params: dict) -> List[Hits]:
+        """Runs `query` once per encoded query; `params` carries runtime parameters such as EF_RUNTIME."""
+
+    async def search_async(self, query: KnnQuery, encoded_queries, params: dict) -> List[Hits]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_inference_executor(), self.search, query, encoded_queries, params)
+
+    @abstractmethod
+    def stored_hashes(self, keys: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """(doc_hash, embedding_hash) of each document; (None, None) when it is not stored yet."""
+
+    @abstractmethod
+    def write(self, records: List[WriteRecord]) -> None:
+        pass
+
+    @contextmanager
+    def writer(self):
+        """Yields the function that ingestion hands its batches of write records to."""
+        yield self.write
+
+    @abstractmethod
+    def keys(self) -> Iterable[str]:
+        pass
+
+    @abstractmethod
+    def delete(self, keys: List[str]) -> int:
+        pass
+
+    def invalidate(self) -> None:
+        """Called after a sync changed the stored documents."""
+
+
+class BulkWriter:
+    """
+    Executes batches of writes as non-transactional pipelines on a background thread, so encoding the
+    next batch overlaps with writing the previous one. At most `max_pending` batches wait in the queue;
+    `submit` blocks beyond that, which keeps memory bounded when Redis is slower than the encoder.
+    """
+    _DONE = object()
+
+    def __init__(self, client, max_pending: Optional[int] = None):
+        self.config = get_config()
+        self.logger = get_logger("Redis Bulk Writer")
+        self.client = client
+        self._queue = queue.Queue(maxsize=max_pending or self.config.INGEST_MAX_PENDING_BATCHES)
+        self._error: Optional[Exception] = None
+        self._thread = threading.Thread(target=self._run, name="vss-bulk-writer", daemon=True)
+        self.batches = 0
+        self._thread.start()
+
+    def _run(self) -> None:
+        while (fill := self._queue.get()) is not self._DONE:
+            if self._error is not None:
+                continue
+            try:
+                pipeline = self.client.pipeline(transaction=False)
+                fill(pipeline)
+                pipeline.execute()
+                self.batches += 1
+            except Exception as e:
+                self.logger.error(f"Bulk write failed: {e}")
+                self._error = e
+
+    def submit(self, fill: Callable) -> None:
+        """Queues `fill(pipeline)`, waiting while `max_pending` batches are already queued."""
+        if self._error is not None:
+            raise self._error
+        self._queue.put(fill)
+
+    def close(self) -> None:
+        self._queue.put(self._DONE)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RedisBackend(VectorBackend):
+    """
+    Documents in Redis (JSON or HASH, see VECTOR_STORAGE) searched with FT.SEARCH, through the INDEX_NAME alias
+    unless another `index_name` is given.
+    """
+    def __init__(self, client, async_client=None, key_pattern: Optional[str] = None, index_name: Optional[str] = None):
+        self.config = get_config()
+        self.logger = get_logger("Redis Vector Backend")
+        self.client = client
+        self.async_client = async_client
+        self.key_pattern = key_pattern or self.config.CLIENT_KEYS
+        self.index_name = index_name or self.config.INDEX_NAME
+
+    def _query_params(self, encoded_query, params: dict) -> dict:
+        # the query blob must use the element type of the indexed vectors
+        return {'query_vector': to_bytes(encoded_query, self.config.VECTOR_TYPE)} | params
+
+    @staticmethod
+    def _parse_search_response(query: Query, response) -> Result:
+        # pipelined FT.SEARCH replies come back raw; parse them the way redis-py does for a single search
+        return Result(
+            response,
+            not query._no_content,
+            has_payload=query._with_payloads,
+            with_scores=query._with_scores,
+            field_encodings=query._return_fields_decode_as,
+        )
+
+    def search(self, query: KnnQuery, encoded_queries, params: dict) -> List[Result]:
+        """Send every FT.SEARCH of a batch in one pipeline, i.e. one network round trip."""
+        redis_query, filter_params = query.redis_query()
+        pipeline = self.client.ft(self.index_name).pipeline(transaction=False)
+        for encoded_query in encoded_queries:
+            pipeline.search(redis_query, self._query_params(encoded_query, params | filter_params))
+        return [self._parse_search_response(redis_query, response) for response in pipeline.execute()]
+
+    async def search_async(self, query: KnnQuery, encoded_queries, params: dict) -> List[Result]:
+        redis_query, filter_params = query.redis_query()
+        pipeline = self.async_client.ft(self.index_name).pipeline(transaction=False)
+        for encoded_query in encoded_queries:
+            await pipeline.search(redis_query, self._query_params(encoded_query, params | filter_params))
+        return [self._parse_search_response(redis_query, response) for response in await pipeline.execute()]
+
+    def stored_hashes(self, keys: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        # one pipeline for the whole batch
+        pipeline = self.client.pipeline(transaction=False)
+        for key in keys:
+            if self.config.VECTOR_STORAGE == 'HASH':
+                pipeline.hmget(key, 'doc_hash', 'embedding_hash')
+            else:
+                pipeline.json().get(key, '$.doc_hash', '$.embedding_hash')
+        stored = {}
+        for key, reply in zip(keys, pipeline.execute()):
+            if self.config.VECTOR_STORAGE == 'HASH':
+                stored[key] = tuple(value.decode('utf-8') if isinstance(value, bytes) else value for value in reply)
+            else:
+                reply = reply or {}
+                stored[key] = tuple((reply.get(path) or [None])[0] for path in ('$.doc_hash', '$.embedding_hash'))
+        return stored
+
+    @staticmethod
+    def hash_mapping(bike: dict) -> dict:
+        # HASH fields are flat strings; nested values such as the specs are kept as JSON text
+        return {field: json.dumps(value) if isinstance(value, (dict, list)) else value
+                for field, value in bike.items() if value is not None}
+
+    def _write(self, pipeline, key: str, bike: dict, hashes: Tuple[str, str], vector, is_new: bool) -> None:
+        doc_hash, embedding_hash = hashes
+        if self.config.VECTOR_STORAGE == 'HASH':
+            mapping = self.hash_mapping(bike) | {'doc_hash': doc_hash, 'embedding_hash': embedding_hash}
+            if vector is not None:
+                # packed little-endian blob in the index type, 2-4 bytes per dimension
+                mapping['description_embeddings'] = to_bytes(vector, self.config.VECTOR_TYPE)
+            pipeline.hset(key, mapping=mapping)
+            return
+        document = bike | {'doc_hash': doc_hash, 'embedding_hash': embedding_hash}
+        if vector is not None:
+            pipeline.json().set(key, '$', document | {'description_embeddings': vector.tolist()})
+        elif is_new:
+            pipeline.json().set(key, '$', document)
+        else:
+            # only the plain fields changed, keep the stored vector
+            pipeline.json().merge(key, '$', document)
+
+    def _fill(self, pipeline, records: List[WriteRecord]) -> None:
+        for record in records:
+            self._write(pipeline, *record)
+
+    def write(self, records: List[WriteRecord]) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        self._fill(pipeline, records)
+        pipeline.execute()
+
+    @contextmanager
+    def writer(self):
+        # batches are written by a BulkWriter thread while the next batch is encoded
+        with BulkWriter(self.client) as bulk:
+            yield lambda records: bulk.submit(lambda pipeline: self._fill(pipeline, records))
+
+    def keys(self) -> Iterable[str]:
+        for key in self.client.scan_iter(match=self.key_pattern, count=self.config.INGEST_BATCH_SIZE):
+            yield key.decode('utf-8') if isinstance(key, bytes) else key
+
+    def delete(self, keys: List[str]) -> int:
+        self.client.unlink(*keys)
+        return len(keys)
+
+    def invalidate(self) -> None:
+        ResultCache(self.client).bump_generation()
+
+
+def _words(text) -> List[str]:
+    return re.findall(r'\w+', str(text or '').lower())
+
+
+def _price(document: dict) -> float:
+    try:
+        return float(document['price'])
+    except (KeyError, TypeError, ValueError):
+        return np.nan
+
+
+class NumpyBackend(VectorBackend):
+    """
+    In-process exact KNN over a dense float32 matrix of L2-normalized vectors, with the filter semantics of
+    the Redis index (inclusive price range, case-insensitive type tags, brand phrase). A batch of queries is
+    scored with one matrix product and the top-k of each row is selected with `argpartition`.
+
+    Scores match Redis COSINE distances, so it serves as a local engine, a stand-in for Redis in tests and
+    the ground truth for approximate indexes. `save()` writes a snapshot that `load()` can memory-map.
+    """
+    def __init__(self, dimension: Optional[int] = None):
+        self.config = get_config()
+        self.logger = get_logger("NumPy Exact Search Backend")
+        self._lock = threading.RLock()
+        self.dimension = dimension
+        self._matrix = np.empty((0, dimension or 0), dtype=np.float32)
+        self._keys: List[str] = []
+        self._rows: Dict[str, int] = {}
+        self._documents: List[dict] = []
+        self._prices = np.empty(0, dtype=np.float64)
+        self._hashes: Dict[str, Tuple[str, str]] = {}
+        self._shared = False  # a search may be reading the current arrays and lists
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def vectors(self) -> np.ndarray:
+        """The stored (normalized) vectors, one row per document in `keys()` order."""
+        return self._matrix[:len(self._keys)]
+
+    @staticmethod
+    def normalize(vectors) -> np.ndarray:
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    # --- search -------------------------------------------------------------
+
+    def _snapshot(self) -> Tuple[np.ndarray, np.ndarray, List[str], List[dict]]:
+        # searches read these outside the lock; writers copy them (`_own`) before changing a row in place
+        with self._lock:
+            self._shared = True
+            rows = len(self._keys)
+            return self._matrix[:rows], self._prices[:rows], self._keys, self._documents
+
+    def _own(self) -> None:
+        # copy-on-write: changing a row a search may still be reading happens on private copies
+        if self._shared:
+            self._matrix = np.array(self._matrix)
+            self._prices = self._prices.copy()
+            self._keys = list(self._keys)
+            self._documents = list(self._documents)
+            self._shared = False
+
+    @staticmethod
+    def _filter_mask(filters: Optional[SearchFilters], prices: np.ndarray,
+                     documents: List[dict]) -> Optional[np.ndarray]:
+        compile_filters(filters)  # same validation as the Redis query
+        if filters is None:
+            return None
+        rows = len(prices)
+        mask = np.ones(rows, dtype=bool)
+        if filters.min_price is not None:
+            mask &= prices >= filters.min_price  # NaN (no price) never matches, as in Redis
+        if filters.max_price is not None:
+            mask &= prices <= filters.max_price
+        types = {value.strip().lower() for value in filters.types if value and value.strip()}
+        if types:
+            mask &= np.fromiter((not types.isdisjoint(document['_tags']) for document in islice(documents, rows)),
+                                dtype=bool, count=rows)
+        if filters.brand:
+            phrase = ' '.join(_words(filters.brand))
+            mask &= np.fromiter((f" {phrase} " in f" {document['_brand']} " for document in islice(documents, rows)),
+                                dtype=bool, count=rows)
+        return mask
+
+    def search(self, query: KnnQuery, encoded_queries, params: dict) -> List[Hits]:
+        # only the snapshot takes the lock, so concurrent searches run their matrix products in parallel
+        matrix, prices, keys, documents = self._snapshot()
+        mask = self._filter_mask(query.filters, prices, documents)
+        candidates = np.flatnonzero(mask) if mask is not None else None
+        if candidates is not None:
+            matrix = matrix[candidates]
+        if len(encoded_queries) == 0:
+            return []
+        if matrix.shape[0] == 0:
+            return [Hits(0, []) for _ in encoded_queries]
+
+        # cosine distance, as Redis reports it for COSINE vector fields
+        distances = 1 - self.normalize(encoded_queries) @ matrix.T
+        k = min(query.k, matrix.shape[0])
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k] if k < matrix.shape[0] else \
+            np.broadcast_to(np.arange(k), (distances.shape[0], k))
+        hits = []
+        for row_distances, row_top in zip(distances, top):
+            ranked = row_top[np.argsort(row_distances[row_top], kind='stable')]
+            page = ranked[query.offset:query.offset + query.limit]
+            rows = candidates[page] if candidates is not None else page
+            hits.append(Hits(k, [self._doc(keys[row], documents[row], row_distances[i]) for row, i in zip(rows, page)]))
+        return hits
+
+    @staticmethod
+    def _doc(key: str, document: dict, distance: float) -> SimpleNamespace:
+        return SimpleNamespace(vector_score=float(distance), id=key,
+                               **{field: document.get(field, '') for field in RETURN_FIELDS if field != 'id'})
+
+    # --- ingestion ----------------------------------------------------------
+
+    def stored_hashes(self, keys: List[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        with self._lock:
+            return {key: self._hashes.get(key, (None, None)) for key in keys}
+
+    def _writable(self, rows: int) -> None:
+        # grows the matrix and the prices geometrically, copying a read-only (memory-mapped) snapshot on the
+        # first write; rows past len(self._keys) are spare capacity
+        capacity = self._matrix.shape[0]
+        if rows <= capacity and self._matrix.flags.writeable:
+            return
+        used = len(self._keys)
+        grown = np.empty((max(rows, capacity * 2, 64), self.dimension), dtype=np.float32)
+        grown[:used] = self._matrix[:used]
+        prices = np.full(grown.shape[0], np.nan, dtype=np.float64)
+        prices[:used] = self._prices[:used]
+        self._matrix, self._prices = grown, prices
+
+    def write(self, records: List[WriteRecord]) -> None:
+        with self._lock:
+            for key, bike, hashes, vector, is_new in records:
+                document = {field: value for field, value in bike.items() if value is not None}
+                document['_tags'] = [tag.strip().lower() for tag in str(document.get('type', '')).split(',') if tag.strip()]
+                document['_brand'] = ' '.join(_words(document.get('brand')))
+                row = self._rows.get(key)
+                if row is None:
+                    if vector is None:
+                        continue  # without a vector the document cannot be searched
+                    if self.dimension is None:
+                        self.dimension = len(vector)
+                        self._matrix = np.empty((0, self.dimension), dtype=np.float32)
+                    row = len(self._keys)
+                    self._writable(row + 1)
+                    self._rows[key] = row
+                    self._keys.append(key)
+                    self._documents.append(document)
+                else:
+                    self._writable(len(self._keys))
+                    self._own()
+                    self._documents[row] = document
+                if vector is not None:
+                    self._matrix[row] = self.normalize(vector)[0]
+                self._prices[row] = _price(document)
+                self._hashes[key] = hashes
+
+    def keys(self) -> Iterable[str]:
+        with self._lock:
+            return list(self._keys)
+
+    def delete(self, keys: List[str]) -> int:
+        deleted = 0
+        with self._lock:
+            for key in keys:
+                row = self._rows.pop(key, None)
+                if row is None:
+                    continue
+                self._writable(len(self._keys))
+                self._own()
+                # the last row moves into the gap, so the matrix stays dense
+                last = len(self._keys) - 1
+                if row != last:
+                    self._matrix[row] = self._matrix[last]
+                    self._keys[row], self._documents[row], self._prices[row] = self._keys[last], self._documents[last], self._prices[last]
+                    self._rows[self._keys[row]] = row
+                self._keys.pop()
+                self._documents.pop()
+                self._hashes.pop(key, None)
+                deleted += 1
+        return deleted
+
+    # --- snapshots ----------------------------------------------------------
+
+    def save(self, directory: str) -> None:
+        """Writes `vectors.npy` and `documents.json` to `directory`."""
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            np.save(os.path.join(directory, 'vectors.npy'), self._matrix[:len(self._keys)])
+            with open(os.path.join(directory, 'documents.json'), 'w') as f:
+                json.dump({'dimension': self.dimension, 'keys': self._keys, 'documents': self._documents,
+                           'hashes': [self._hashes[key] for key in self._keys]}, f)
+        self.logger.info(f"Saved {len(self._keys)} vectors to {directory}")
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'NumpyBackend':
+        """Loads a snapshot; with `mmap` the vectors stay on disk and are paged in by the OS."""
+        with open(os.path.join(directory, 'documents.json')) as f:
+            snapshot = json.load(f)
+        backend = cls(snapshot['dimension'])
+        backend._matrix = np.load(os.path.join(directory, 'vectors.npy'), mmap_mode='r' if mmap else None)
+        backend._keys = snapshot['keys']
+        backend._rows = {key: row for row, key in enumerate(backend._keys)}
+        backend._documents = snapshot['documents']
+        backend._hashes = {key: tuple(hashes) for key, hashes in zip(backend._keys, snapshot['hashes'])}
+        backend._prices = np.array([_price(document) for document in backend._documents], dtype=np.float64)
+        backend.logger.info(f"Loaded {len(backend._keys)} vectors from {directory}")
+        return backend
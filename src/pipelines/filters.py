@@ -0,0 +1,47 @@
+# Compiles search filters into the pre-filter expression of a hybrid KNN query
+import re
+from typing import Optional, Tuple
+from src.models.core import SearchFilters
+
+# characters with a meaning in the RediSearch query syntax; a backslash makes them literal
+_SPECIAL_CHARACTERS = re.compile(r'([,.<>{}\[\]"\':;!@#$%^&*()\-+=~|/\\? ])')
+
+
+def escape(value: str) -> str:
+    return _SPECIAL_CHARACTERS.sub(r'\\\1', value)
+
+
+def compile_filters(filters: Optional[SearchFilters]) -> Tuple[str, dict]:
+    """
+    Pre-filter expression and query parameters for `filters`, `('*', {})` when nothing is filtered.
+    Price bounds are passed as query parameters. Tag values are escaped, and the brand is matched as
+    a phrase of its word tokens, so user input can never change the structure of the query.
+    """
+    if filters is None:
+        return '*', {}
+    clauses, params = [], {}
+
+    if filters.min_price is not None or filters.max_price is not None:
+        if filters.min_price is not None and filters.max_price is not None and filters.min_price > filters.max_price:
+            raise ValueError(f"min_price {filters.min_price} is above max_price {filters.max_price}")
+        low, high = '-inf', '+inf'
+        if filters.min_price is not None:
+            low, params['min_price'] = '$min_price', filters.min_price
+        if filters.max_price is not None:
+            high, params['max_price'] = '$max_price', filters.max_price
+        clauses.append(f'@price:[{low} {high}]')
+
+    types = [escape(value.strip()) for value in filters.types if value and value.strip()]
+    if types:
+        clauses.append(f"@type:{{{' | '.join(types)}}}")
+
+    if filters.brand:
+        # brand is a TEXT field, so match the tokens the indexer produced from it
+        tokens = re.findall(r'\w+', filters.brand)
+        if not tokens:
+            raise ValueError(f"Brand filter {filters.brand!r} has no searchable words")
+        clauses.append(f'@brand:"{" ".join(tokens)}"')
+
+    if not clauses:
+        return '*', {}
+    return ' '.join(clauses), params
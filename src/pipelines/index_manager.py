@@ -0,0 +1,204 @@
+# Blue/green index generations behind an FT alias
+import json
+import re
+import time
+from typing import Optional
+from src.pipelines.result_cache import ResultCache
+from src.pipelines.training_pipeline import RedisSearchIndex
+from src.utils.redis_client import LockKeeper, RedisClient
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+
+class IndexRebuildInProgress(RuntimeError):
+    pass
+
+
+class IndexManager:
+    """
+    Rebuilds the search index without downtime. Each generation `n` gets its own key prefix
+    (`v<n>:<DOC_PREFIX>`) and index (`<INDEX_NAME>:v<n>`); INDEX_NAME itself is an FT alias that
+    queries keep using. A rebuild ingests and indexes the new generation next to the live one,
+    repoints the alias once `percent_indexed` reaches 100% and then unlinks the previous generation
+    in batches. Progress is kept in Redis so every replica can report it.
+
+    A deployment that predates aliases has a plain index named INDEX_NAME over DOC_PREFIX; it is
+    treated as generation 0 and dropped (without its documents) right before the alias is added.
+    """
+    def __init__(self, client=None):
+        self.config = get_config()
+        self.logger = get_logger("Blue/Green Search Index Manager")
+        self.client = client or RedisClient().connect()
+        tag = self.config.INDEX_NAME
+        self.active_key = f"{tag}:active-generation"
+        self.version_key = f"{tag}:generation-counter"
+        self.progress_key = f"{tag}:rebuild"
+        self.lock_name = f"{tag}:rebuild-lock"
+
+    def generation(self, version: int) -> dict:
+        return {
+            'version': version,
+            'index': f"{self.config.INDEX_NAME}:v{version}",
+            # not under DOC_PREFIX, so neither the legacy index nor CLIENT_KEYS scans pick these keys up
+            'prefix': f"v{version}:{self.config.DOC_PREFIX}",
+        }
+
+    def active(self) -> Optional[dict]:
+        """The generation the alias serves, the legacy index as generation 0, or None when nothing is indexed."""
+        raw = self.client.get(self.active_key)
+        if raw is not None:
+            return json.loads(raw)
+        try:
+            info = self.client.ft(self.config.INDEX_NAME).info()
+        except Exception:
+            return None
+        # FT.INFO on an alias reports the index behind it
+        served = info.get('index_name', self.config.INDEX_NAME)
+        served = served.decode('utf-8') if isinstance(served, bytes) else served
+        if served == self.config.INDEX_NAME:
+            return {'version': 0, 'index': self.config.INDEX_NAME, 'prefix': self.config.DOC_PREFIX, 'legacy': True}
+        return self._restore_record(served)
+
+    def _restore_record(self, served: str) -> dict:
+        # the alias serves a generation whose record is gone (expired, flushed or never recorded)
+        match = re.fullmatch(rf"{re.escape(self.config.INDEX_NAME)}:v(\d+)", served)
+        if match is None:
+            raise RuntimeError(f"Alias {self.config.INDEX_NAME} serves {served}, which is not one of its generations")
+        generation = self.generation(int(match.group(1)))
+        self.logger.warning(f"No record of the generation behind {self.config.INDEX_NAME}, restored it from {served}")
+        try:
+            self.client.set(self.active_key, json.dumps(generation))
+            # the next generation must not reuse the live one's name and prefix
+            if int(self.client.get(self.version_key) or 0) < generation['version']:
+                self.client.set(self.version_key, generation['version'])
+        except Exception as e:
+            self.logger.error(f"Could not record the restored generation {served}: {e}")
+        return generation
+
+    def progress(self) -> dict:
+        progress = {key.decode('utf-8') if isinstance(key, bytes) else key: value.decode('utf-8') if isinstance(value, bytes) else value
+                    for key, value in (self.client.hgetall(self.progress_key) or {}).items()}
+        progress['active'] = self.active()
+        return progress
+
+    def _report(self, **fields) -> None:
+        self.client.hset(self.progress_key, mapping={key: str(value) for key, value in fields.items()})
+        self.logger.info(f"Index rebuild: {fields}")
+
+    def sync(self) -> dict:
+        """Incremental sync into the live generation, or a full build when nothing is indexed yet."""
+        active = self.active()
+        if active is None:
+            return self.rebuild()
+        from src.data.vector_store import RedisVectorOperations
+
+        RedisVectorOperations(prefix=None if active.get('legacy') else active['prefix']).sync()
+        return active
+
+    def rebuild(self) -> dict:
+        """Builds a new generation, switches the alias to it and collects the previous one."""
+        lock = self.client.lock(self.lock_name, timeout=self.config.INDEX_REBUILD_TIMEOUT, thread_local=False)
+        if not lock.acquire(blocking=False):
+            raise IndexRebuildInProgress("An index rebuild is already running")
+        # ingestion plus the indexing wait can outlast the lock timeout, so it is renewed while the rebuild runs
+        with LockKeeper(lock, self.config.INDEX_REBUILD_TIMEOUT / 3) as keeper:
+            previous = self.active()
+            target = self.generation(int(self.client.incr(self.version_key)))
+            self.client.delete(self.progress_key)
+            self._report(state='running', phase='ingesting', version=target['version'], started_at=time.time())
+            try:
+                self._build(target, keeper)
+                self.switch(target, previous)
+            except Exception as e:
+                # the alias still serves the previous generation; throw the half-built one away
+                self._discard(target)
+                self._report(state='failed', error=e, finished_at=time.time())
+                raise
+            # from here on the alias serves the new generation: failures are recorded, nothing is rolled back
+            self._record_switch(target)
+            deleted = self._retire(previous) if previous is not None else 0
+            self._report(state='done', phase='done', deleted=deleted, finished_at=time.time())
+            return target
+
+    def _build(self, target: dict, keeper: LockKeeper) -> None:
+        # imported here so the ingestion stack stays out of the API workers' import graph
+        from src.data.vector_store import RedisVectorOperations
+
+        summary = RedisVectorOperations(prefix=target['prefix']).sync()
+        self._report(phase='indexing', documents=summary['documents'])
+
+        search_index = RedisSearchIndex()
+        search_index.create_redis_search_index(target['index'], f"{target['prefix']}:")
+        deadline = time.monotonic() + self.config.INDEX_REBUILD_TIMEOUT
+        while True:
+            if keeper.lost:
+                raise IndexRebuildInProgress("The rebuild lock expired, another rebuild may be running")
+            status = search_index.index_status(target['index'])
+            self._report(percent_indexed=status['percent_indexed'], num_docs=status['num_docs'])
+            if status['percent_indexed'] >= 1.0:
+                break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{target['index']} was not fully indexed within {self.config.INDEX_REBUILD_TIMEOUT} seconds")
+            time.sleep(self.config.BOOTSTRAP_POLL_INTERVAL)
+        if keeper.lost:
+            raise IndexRebuildInProgress("The rebuild lock expired, another rebuild may be running")
+
+    def switch(self, target: dict, previous: Optional[dict]) -> None:
+        """Points the alias at `target`; when this raises, the alias still serves `previous`."""
+        self._report(phase='switching')
+        if previous is not None and previous.get('legacy'):
+            # the alias cannot share its name with an index, so the legacy index goes first (its keys stay)
+            self.client.ft(self.config.INDEX_NAME).dropindex(delete_documents=False)
+            try:
+                self.client.ft(target['index']).aliasadd(self.config.INDEX_NAME)
+            except Exception:
+                # put the legacy index back over its documents rather than leave nothing serving INDEX_NAME
+                RedisSearchIndex().create_redis_search_index(self.config.INDEX_NAME, f"{self.config.DOC_PREFIX}:")
+                raise
+        elif previous is None:
+            self.client.ft(target['index']).aliasadd(self.config.INDEX_NAME)
+        else:
+            self.client.ft(target['index']).aliasupdate(self.config.INDEX_NAME)
+        self.logger.info(f"Alias {self.config.INDEX_NAME} now serves {target['index']}")
+
+    def _record_switch(self, target: dict) -> None:
+        try:
+            self.client.set(self.active_key, json.dumps(target))
+            ResultCache(self.client).bump_generation()
+        except Exception as e:
+            self.logger.error(f"Alias switched to {target['index']} but recording it failed: {e}")
+            self._report(record_error=e)
+
+    def _discard(self, target: dict) -> None:
+        try:
+            self.collect(target)
+        except Exception as e:
+            self.logger.error(f"Could not collect the failed generation {target['index']}: {e}")
+
+    def _retire(self, previous: dict) -> int:
+        """Collects the generation the alias no longer serves; a failure leaves its keys behind, nothing more."""
+        try:
+            return self.collect(previous)
+        except Exception as e:
+            self.logger.error(f"Could not collect the previous generation {previous['index']}: {e}")
+            self._report(cleanup_error=e)
+            return 0
+
+    def collect(self, generation: dict) -> int:
+        """Drops a retired generation's index and UNLINKs its documents in batches; returns how many were deleted."""
+        self._report(phase='collecting')
+        if not generation.get('legacy'):
+            try:
+                self.client.ft(generation['index']).dropindex(delete_documents=False)
+            except Exception as e:
+                self.logger.info(f"Index {generation['index']} already gone: {e}")
+        pattern = self.config.CLIENT_KEYS if generation.get('legacy') else f"{generation['prefix']}:*"
+        deleted, batch = 0, []
+        for key in self.client.scan_iter(match=pattern, count=self.config.INGEST_BATCH_SIZE):
+            batch.append(key)
+            if len(batch) >= self.config.INGEST_BATCH_SIZE:
+                deleted += self.client.unlink(*batch)
+                batch = []
+        if batch:
+            deleted += self.client.unlink(*batch)
+        return deleted
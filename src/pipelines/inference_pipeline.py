@@ -1,51 +1,189 @@
+import asyncio
+import concurrent.futures
+import threading
 import numpy as np
-import pandas as pd
-from typing import List
-from redis.commands.search.query import Query
+from typing import List, Optional, Tuple
 from src.utils.redis_client import RedisClient
+from src.utils.executor import get_inference_executor, get_rerank_executor
+from src.models.batcher import EmbeddingBatcher
+from src.models.cross_encoder_model import CrossEncoderReranker
+from src.models.core import QueryResults, SearchFilters, SearchResult
+from src.models.embedding_cache import EmbeddingCache
+from src.pipelines.backends import Hits, KnnQuery, NumpyBackend, RedisBackend, VectorBackend
+from src.pipelines.filters import compile_filters
+from src.pipelines.result_cache import ResultCache
 from src.models.similarity_model import SimilarityModel
+from src.utils.metrics import CACHE_LOOKUPS, SEARCH_BATCH_SIZE, STAGE_ERRORS, stage
+from src.utils.profiling import PROFILE, annotate
 from src.utils.logger import get_logger
 from src.utils.config import get_config
 
 
+# predefined queries offered by /vss/queries/ and main_dev.py, pre-warmed in the result cache at startup
+PREDEFINED_QUERIES = [
+    'Bike for small kids',
+    'Best Mountain bikes for kids',
+    'Cheap Mountain bike for kids',
+    'Female specific mountain bike',
+    'Road bike for beginners',
+    'Commuter bike for people over 60',
+    'Comfortable commuter bike',
+    'Good bike for college students',
+    'Mountain bike for beginners',
+    'Vintage bike',
+    'Comfortable city bike'
+]
+
+
 class SemanticSearch:
-    def __init__(self):
+    def __init__(self, backend: Optional[VectorBackend] = None, embedder=None):
         self.config = get_config()
         self.logger = get_logger("Embedding and Pure KNN VSS Similarity Search")
         self.client = RedisClient().connect()
-        self.embedder = SimilarityModel().load_model()
-
-    def semantic_search_vss(self, queries: List = None):
-        encoded_queries = self.embedder.encode(queries)
-
-        query = (
-            Query('(*)=>[KNN 3 @vector $query_vector AS vector_score]')
-            .sort_by('vector_score')
-            .return_fields('vector_score', 'id', 'brand', 'model', 'description')
-            .dialect(2)
-        )
-        return encoded_queries, query
-
-    def create_query_table(self, query, queries, encoded_queries, extra_params={}):
-        results_list = []
-        for i, encoded_query in enumerate(encoded_queries):
-            result_docs = self.client.ft(self.config.INDEX_NAME).search(
-                query, {'query_vector': np.array(encoded_query, dtype=np.float32).tobytes()} | extra_params
-            ).docs
-
-            for doc in result_docs:
-                vector_score = round(1 - float(doc.vector_score), 2)
-                results_list.append({
-                    'query': queries[i],
-                    'score': vector_score,
-                    'id': doc.id,
-                    'brand': doc.brand,
-                    'model': doc.model,
-                    'description': doc.description
-                })
-
-        self.logger.info("Pretty-printing the table")
-        queries_table = pd.DataFrame(results_list)
+        self.async_client = RedisClient().connect_async()
+        self.embedder = embedder if embedder is not None else SimilarityModel().load_model()
+        self.batcher = EmbeddingBatcher(self.embedder) if self.config.BATCH_ENABLED else None
+        self.embedding_cache = None
+        if self.config.EMBEDDING_CACHE_ENABLED:
+            self.embedding_cache = EmbeddingCache(
+                redis_client=self.client if self.config.EMBEDDING_CACHE_REDIS else None,
+                async_redis_client=self.async_client if self.config.EMBEDDING_CACHE_REDIS else None
+            )
+        self.result_cache = ResultCache(self.client, self.async_client) if self.config.RESULT_CACHE_ENABLED else None
+        self._reranker = None
+        self._rerank_lock = threading.Lock()
+        self._reranks_running = 0
+        self._rerank_counters = {'reranked': 0, 'fallbacks': 0, 'skipped': 0, 'errors': 0}
+        self._backend = backend
+
+    @property
+    def backend(self) -> VectorBackend:
+        # built on first use, from the clients in place at that time
+        if self._backend is None:
+            if self.config.VECTOR_BACKEND == 'NUMPY':
+                if not self.config.NUMPY_INDEX_DIR:
+                    raise ValueError("VECTOR_BACKEND=NUMPY requires NUMPY_INDEX_DIR, the directory of a snapshot "
+                                     "written by `python -m src.data.vector_store --numpy-dir`")
+                self._backend = NumpyBackend.load(self.config.NUMPY_INDEX_DIR)
+            else:
+                self._backend = RedisBackend(self.client, self.async_client)
+        return self._backend
+
+    def knn_query(self, k: Optional[int] = None, offset: int = 0, limit: Optional[int] = None,
+                  filters: Optional[SearchFilters] = None) -> KnnQuery:
+        """
+        KNN query for the `k` nearest bikes, returning the `limit` hits starting at `offset` (the whole top-k by default).
+        The backend ranks the top-k among the bikes matching `filters` and only ships the requested page back.
+        """
+        k = k or self.config.KNN_DEFAULT_K
+        if not 1 <= k <= self.config.MAX_K:
+            raise ValueError(f"k must be between 1 and {self.config.MAX_K}, got {k}")
+        if offset < 0:
+            raise ValueError(f"offset must not be negative, got {offset}")
+        if limit is None:
+            limit = k
+        elif not 1 <= limit <= self.config.MAX_PAGE_SIZE:
+            raise ValueError(f"Page size must be between 1 and {self.config.MAX_PAGE_SIZE}, got {limit}")
+        compile_filters(filters)  # rejects invalid filters before anything is encoded
+        return KnnQuery(k, offset, limit, filters)
+
+    @staticmethod
+    def _fill_misses(cached: List, misses: List[int], vectors) -> np.ndarray:
+        for i, vector in zip(misses, vectors):
+            cached[i] = vector
+        return np.stack(cached)
+
+    @staticmethod
+    def _count_lookups(cache: str, lookups: int, misses: int) -> None:
+        CACHE_LOOKUPS.inc(lookups - misses, cache=cache, result='hit')
+        CACHE_LOOKUPS.inc(misses, cache=cache, result='miss')
+
+    def semantic_search_vss(self, queries: List = None, k: Optional[int] = None):
+        if self.embedding_cache is None:
+            with stage('encode'):
+                return self.embedder.encode(queries), self.knn_query(k)
+
+        with stage('embedding_cache'):
+            cached = self.embedding_cache.get_many(queries)
+        misses = [i for i, vector in enumerate(cached) if vector is None]
+        self._count_lookups('embedding', len(queries), len(misses))
+        vectors = []
+        if misses:
+            with stage('encode'):
+                vectors = self.embedder.encode([queries[i] for i in misses])
+            with stage('embedding_cache'):
+                self.embedding_cache.put_many([queries[i] for i in misses], vectors)
+        return self._fill_misses(cached, misses, vectors), self.knn_query(k)
+
+    async def _encode_async(self, queries: List):
+        # the forward pass runs on the bounded inference executor so the event loop stays free,
+        # coalesced with queries from concurrent requests when batching is enabled
+        if self.batcher is not None:
+            return await self.batcher.encode(queries)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_inference_executor(), self.embedder.encode, queries)
+
+    async def semantic_search_vss_async(self, queries: List = None, k: Optional[int] = None):
+        if self.embedding_cache is None:
+            with stage('encode'):
+                return await self._encode_async(queries), self.knn_query(k)
+
+        with stage('embedding_cache'):
+            cached = await self.embedding_cache.aget_many(queries)
+        misses = [i for i, vector in enumerate(cached) if vector is None]
+        self._count_lookups('embedding', len(queries), len(misses))
+        vectors = []
+        if misses:
+            with stage('encode'):
+                vectors = await self._encode_async([queries[i] for i in misses])
+            with stage('embedding_cache'):
+                await self.embedding_cache.aput_many([queries[i] for i in misses], vectors)
+        return self._fill_misses(cached, misses, vectors), self.knn_query(k)
+
+    def stats(self) -> dict:
+        return {
+            'batcher': self.batcher.stats() if self.batcher is not None else None,
+            'embedding_cache': self.embedding_cache.stats() if self.embedding_cache is not None else None,
+            'result_cache': self.result_cache.stats() if self.result_cache is not None else None,
+            'reranker': self._rerank_stats(),
+        }
+
+    def _runtime_params(self, extra_params: dict) -> dict:
+        """
+        Resolves the `ef_runtime` override of `extra_params` into the `EF_RUNTIME` query parameter,
+        defaulting to HNSW_EF_RUNTIME. The override is dropped for FLAT indexes.
+        """
+        params = dict(extra_params)
+        ef_runtime = params.pop('ef_runtime', None)
+        if self.config.VECTOR_ALGORITHM != 'HNSW':
+            params.pop('EF_RUNTIME', None)
+            return params
+        ef_runtime = int(ef_runtime or params.get('EF_RUNTIME') or self.config.HNSW_EF_RUNTIME)
+        if ef_runtime < 1:
+            raise ValueError(f"ef_runtime must be positive, got {ef_runtime}")
+        params['EF_RUNTIME'] = ef_runtime
+        return params
+
+    @staticmethod
+    def _result_rows(query_text: str, result_docs) -> List[SearchResult]:
+        return [
+            SearchResult(
+                query=query_text,
+                score=round(1 - float(doc.vector_score), 2),
+                id=doc.id,
+                brand=doc.brand,
+                model=doc.model,
+                description=doc.description
+            )
+            for doc in result_docs
+        ]
+
+    @staticmethod
+    def render_table(results_list: List[SearchResult]) -> str:
+        """Markdown presentation of the results (used by main_dev.py); pandas stays off the request path."""
+        import pandas as pd
+
+        queries_table = pd.DataFrame([result.model_dump() for result in results_list])
         queries_table.sort_values(by=['query', 'score'], ascending=[True, False], inplace=True)
         queries_table['query'] = queries_table.groupby('query')['query'].transform(
             lambda x: [x.iloc[0]] + [''] * (len(x) - 1))
@@ -53,3 +191,232 @@ class SemanticSearch:
             lambda x: (x[:497] + '...') if len(x) > 500 else x)
         return queries_table.to_markdown(index=False)
 
+    def _cached_hits(self, query, queries: List[str], extra_params: dict):
+        if self.result_cache is None:
+            return [None] * len(queries), None, []
+        keys = [self.result_cache.key(query_text, query, extra_params) for query_text in queries]
+        with stage('result_cache'):
+            cached, generation = self.result_cache.get_many(keys)
+        self._count_lookups('result', len(keys), cached.count(None))
+        return self._from_cache(cached, queries), generation, keys
+
+    async def _cached_hits_async(self, query, queries: List[str], extra_params: dict):
+        if self.result_cache is None:
+            return [None] * len(queries), None, []
+        keys = [self.result_cache.key(query_text, query, extra_params) for query_text in queries]
+        with stage('result_cache'):
+            cached, generation = await self.result_cache.aget_many(keys)
+        self._count_lookups('result', len(keys), cached.count(None))
+        return self._from_cache(cached, queries), generation, keys
+
+    @staticmethod
+    def _from_cache(cached: List, queries: List[str]) -> List[Optional[QueryResults]]:
+        # entries are shared by queries that normalize to the same text; show each caller its own wording
+        return [
+            QueryResults(
+                query=query_text,
+                total=entry['total'],
+                results=[SearchResult(**row, query=query_text) for row in entry['results']]
+            ) if entry is not None else None
+            for entry, query_text in zip(cached, queries)
+        ]
+
+    @staticmethod
+    def _to_cache(hits: QueryResults) -> dict:
+        return {'total': hits.total, 'results': [row.model_dump(exclude={'query'}) for row in hits.results]}
+
+    @staticmethod
+    def _unique_misses(queries: List[str], cached: List) -> Tuple[List[int], List[int]]:
+        """Indices of the cache misses, and one representative index per distinct (normalized) query among them."""
+        misses = [i for i, hits in enumerate(cached) if hits is None]
+        leaders = {}
+        for i in misses:
+            leaders.setdefault(EmbeddingCache.normalize(queries[i]), i)
+        return misses, list(leaders.values())
+
+    def _fill_hits(self, queries: List[str], cached: List, misses: List[int], leaders: List[int], results: List[Hits]) -> None:
+        fresh = {EmbeddingCache.normalize(queries[i]): (result.total, self._result_rows(queries[i], result.docs))
+                 for i, result in zip(leaders, results)}
+        for i in misses:
+            total, rows = fresh[EmbeddingCache.normalize(queries[i])]
+            cached[i] = QueryResults(query=queries[i], total=total,
+                                     results=[row.model_copy(update={'query': queries[i]}) for row in rows])
+
+    def _collect_hits(self, query, queries: List[str], extra_params: dict, encode_misses) -> List[QueryResults]:
+        extra_params = self._runtime_params(extra_params)
+        cached, generation, keys = self._cached_hits(query, queries, extra_params)
+        misses, leaders = self._unique_misses(queries, cached)
+        if leaders:
+            encoded = encode_misses(leaders)
+            SEARCH_BATCH_SIZE.observe(len(leaders))
+            with stage('search'):
+                results = self.backend.search(query, encoded, extra_params)
+            with stage('format'):
+                self._fill_hits(queries, cached, misses, leaders, results)
+            if generation is not None:
+                with stage('result_cache'):
+                    self.result_cache.put_many({keys[i]: self._to_cache(cached[i]) for i in leaders}, generation)
+        return cached
+
+    async def _collect_hits_async(self, query, queries: List[str], extra_params: dict, encode_misses) -> List[QueryResults]:
+        extra_params = self._runtime_params(extra_params)
+        cached, generation, keys = await self._cached_hits_async(query, queries, extra_params)
+        misses, leaders = self._unique_misses(queries, cached)
+        if leaders:
+            encoded = await encode_misses(leaders)
+            SEARCH_BATCH_SIZE.observe(len(leaders))
+            with stage('search'):
+                results = await self.backend.search_async(query, encoded, extra_params)
+            with stage('format'):
+                self._fill_hits(queries, cached, misses, leaders, results)
+            if generation is not None:
+                with stage('result_cache'):
+                    await self.result_cache.aput_many({keys[i]: self._to_cache(cached[i]) for i in leaders}, generation)
+        return cached
+
+    @staticmethod
+    def _flatten(hits: List[QueryResults]) -> List[SearchResult]:
+        return [row for query_hits in hits for row in query_hits.results]
+
+    def create_query_table(self, query, queries, encoded_queries, extra_params={}) -> List[SearchResult]:
+        return self._flatten(self._collect_hits(
+            query, queries, extra_params, lambda misses: [encoded_queries[i] for i in misses]
+        ))
+
+    async def create_query_table_async(self, query, queries, encoded_queries, extra_params={}) -> List[SearchResult]:
+        async def encode_misses(misses):
+            return [encoded_queries[i] for i in misses]
+
+        return self._flatten(await self._collect_hits_async(query, queries, extra_params, encode_misses))
+
+    @property
+    def reranker(self) -> CrossEncoderReranker:
+        if self._reranker is None:
+            self._reranker = CrossEncoderReranker()
+        return self._reranker
+
+    def _rerank_query(self, k: int, filters: Optional[SearchFilters]) -> KnnQuery:
+        # the candidate pool is at least k and never larger than MAX_K
+        return self.knn_query(min(max(k, self.config.RERANK_TOP_N), self.config.MAX_K), filters=filters)
+
+    @staticmethod
+    def _page(hits: List[QueryResults], k: int, offset: int, limit: Optional[int]) -> List[QueryResults]:
+        limit = limit or k
+        return [query_hits.model_copy(update={'total': min(k, query_hits.total),
+                                              'results': query_hits.results[:k][offset:offset + limit]})
+                for query_hits in hits]
+
+    def _count_rerank(self, outcome: str) -> None:
+        with self._rerank_lock:
+            self._rerank_counters[outcome] += 1
+
+    def _rerank_stats(self) -> dict:
+        with self._rerank_lock:
+            return dict(self._rerank_counters)
+
+    def _submit_rerank(self, hits: List[QueryResults]) -> Optional[concurrent.futures.Future]:
+        """
+        Scores `hits` on the re-rank executor, or returns None when RERANK_WORKERS re-ranks are still running:
+        one past its budget cannot be stopped, and waiting behind it would blow this request's budget as well.
+        """
+        with self._rerank_lock:
+            if self._reranks_running >= self.config.RERANK_WORKERS:
+                self._rerank_counters['skipped'] += 1
+                return None
+            self._reranks_running += 1
+        try:
+            future = get_rerank_executor().submit(self.reranker.score, hits)
+        except Exception:
+            self._rerank_done()
+            raise
+        future.add_done_callback(self._rerank_done)
+        return future
+
+    def _rerank_done(self, future=None) -> None:
+        with self._rerank_lock:
+            self._reranks_running -= 1
+
+    def _reranked(self, hits: List[QueryResults], scores) -> List[QueryResults]:
+        self._count_rerank('reranked')
+        return CrossEncoderReranker.reorder(hits, scores)
+
+    def _rerank_fallback(self, hits: List[QueryResults], error: Exception) -> List[QueryResults]:
+        if isinstance(error, (concurrent.futures.TimeoutError, asyncio.TimeoutError)):
+            self._count_rerank('fallbacks')
+            self.logger.info(f"Re-ranking exceeded {self.config.RERANK_BUDGET_MS} ms, keeping the bi-encoder order")
+        else:
+            self._count_rerank('errors')
+            STAGE_ERRORS.inc(stage='rerank')
+            self.logger.error(f"Re-ranking failed, keeping the bi-encoder order: {error}")
+        return hits
+
+    def _rerank(self, hits: List[QueryResults]) -> List[QueryResults]:
+        with stage('rerank'):
+            try:
+                future = self._submit_rerank(hits)
+                if future is None:
+                    return hits
+                return self._reranked(hits, future.result(timeout=self.config.RERANK_BUDGET_MS / 1000))
+            except Exception as e:
+                return self._rerank_fallback(hits, e)
+
+    async def _rerank_async(self, hits: List[QueryResults]) -> List[QueryResults]:
+        with stage('rerank'):
+            try:
+                future = self._submit_rerank(hits)
+                if future is None:
+                    return hits
+                return self._reranked(hits, await asyncio.wait_for(asyncio.wrap_future(future),
+                                                                   self.config.RERANK_BUDGET_MS / 1000))
+            except Exception as e:
+                return self._rerank_fallback(hits, e)
+
+    def _annotate(self, queries: List[str], query: KnnQuery, extra_params: dict, rerank: Optional[bool]) -> None:
+        # search details for the slow-query log, only gathered when the request is profiled
+        if PROFILE.get() is None:
+            return
+        annotate(queries=queries, k=query.k, offset=query.offset, limit=query.limit, extra_params=extra_params,
+                 filters=query.filters.model_dump() if query.filters is not None else None,
+                 rerank=self.config.RERANK_ENABLED if rerank is None else rerank)
+
+    def search_hits(self, queries: List[str], k: Optional[int] = None, offset: int = 0,
+                    limit: Optional[int] = None, extra_params={}, rerank: Optional[bool] = None,
+                    filters: Optional[SearchFilters] = None) -> List[QueryResults]:
+        """
+        Cached end-to-end search: queries with a current cached result cost one cache lookup,
+        only the misses are encoded and sent to FT.SEARCH.
+        `filters` are applied by the backend before vector scoring, so the top-k only holds matching bikes.
+        With re-ranking, the top RERANK_TOP_N candidates are re-scored by the cross-encoder before paging.
+        """
+        def encode_misses(misses):
+            return self.semantic_search_vss([queries[i] for i in misses])[0]
+
+        query = self.knn_query(k, offset, limit, filters)
+        self._annotate(queries, query, extra_params, rerank)
+        if not (self.config.RERANK_ENABLED if rerank is None else rerank):
+            return self._collect_hits(query, queries, extra_params, encode_misses)
+        k = k or self.config.KNN_DEFAULT_K
+        candidates = self._collect_hits(self._rerank_query(k, filters), queries, extra_params, encode_misses)
+        return self._page(self._rerank(candidates), k, offset, limit)
+
+    async def search_hits_async(self, queries: List[str], k: Optional[int] = None, offset: int = 0,
+                                limit: Optional[int] = None, extra_params={}, rerank: Optional[bool] = None,
+                                filters: Optional[SearchFilters] = None) -> List[QueryResults]:
+        async def encode_misses(misses):
+            return (await self.semantic_search_vss_async([queries[i] for i in misses]))[0]
+
+        query = self.knn_query(k, offset, limit, filters)
+        self._annotate(queries, query, extra_params, rerank)
+        if not (self.config.RERANK_ENABLED if rerank is None else rerank):
+            return await self._collect_hits_async(query, queries, extra_params, encode_misses)
+        k = k or self.config.KNN_DEFAULT_K
+        candidates = await self._collect_hits_async(self._rerank_query(k, filters), queries, extra_params, encode_misses)
+        return self._page(await self._rerank_async(candidates), k, offset, limit)
+
+    def search(self, queries: List[str], k: Optional[int] = None, extra_params={}, rerank: Optional[bool] = None,
+               filters: Optional[SearchFilters] = None) -> List[SearchResult]:
+        return self._flatten(self.search_hits(queries, k, extra_params=extra_params, rerank=rerank, filters=filters))
+
+    async def search_async(self, queries: List[str], k: Optional[int] = None, extra_params={},
+                           rerank: Optional[bool] = None, filters: Optional[SearchFilters] = None) -> List[SearchResult]:
+        return self._flatten(await self.search_hits_async(queries, k, extra_params=extra_params, rerank=rerank, filters=filters))
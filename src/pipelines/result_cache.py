@@ -0,0 +1,111 @@
+# Versioned cache of final KNN results, invalidated by bumping the index generation
+import hashlib
+import json
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from src.models.embedding_cache import EmbeddingCache
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+
+class ResultCache:
+    """
+    Caches the results of a KNN query per (query text, FT.SEARCH arguments, query params) in Redis.
+    Every entry records the index generation it was computed against. Ingestion and index refreshes
+    bump the generation, so older entries are never served. A lookup is one MGET of the generation
+    counter together with the entries.
+    """
+    def __init__(self, client=None, async_client=None):
+        self.config = get_config()
+        self.logger = get_logger("KNN Result Cache")
+        self.client = client
+        self.async_client = async_client
+        # hash tag keeps the counter and the entries in one cluster slot so they can share an MGET
+        tag = f"{{{self.config.INDEX_NAME}}}"
+        self.generation_key = f"{tag}:generation"
+        self.prefix = f"{tag}:results"
+        # updated from executor threads and the event loop alike
+        self._lock = threading.Lock()
+        self._counters = {'hits': 0, 'misses': 0, 'stale': 0, 'errors': 0}
+
+    def key(self, query_text: str, query, params: dict) -> str:
+        payload = json.dumps({
+            'query': EmbeddingCache.normalize(query_text),
+            'args': [str(arg) for arg in query.get_args()],
+            'params': {name: value for name, value in params.items() if not isinstance(value, bytes)},
+        }, sort_keys=True, default=str)
+        return f"{self.prefix}:{hashlib.sha1(payload.encode('utf-8')).hexdigest()}"
+
+    def _decode(self, values: List) -> Tuple[List[Optional[Any]], int]:
+        generation = int(values[0] or 0)
+        results, counts = [], {'hits': 0, 'misses': 0, 'stale': 0}
+        for raw in values[1:]:
+            entry = json.loads(raw) if raw is not None else None
+            if entry is None:
+                counts['misses'] += 1
+                results.append(None)
+            elif entry['generation'] != generation:
+                counts['stale'] += 1
+                results.append(None)
+            else:
+                counts['hits'] += 1
+                results.append(entry['results'])
+        self._count(**counts)
+        return results, generation
+
+    def _count(self, **counts: int) -> None:
+        with self._lock:
+            for name, count in counts.items():
+                self._counters[name] += count
+
+    def get_many(self, keys: List[str]) -> Tuple[List[Optional[Any]], Optional[int]]:
+        """Cached results per key (`None` on a miss) and the current generation to tag new entries with."""
+        try:
+            return self._decode(self.client.mget([self.generation_key] + keys))
+        except Exception as e:
+            self._count(errors=1)
+            self.logger.error(f"Result cache lookup failed: {e}")
+            return [None] * len(keys), None
+
+    async def aget_many(self, keys: List[str]) -> Tuple[List[Optional[Any]], Optional[int]]:
+        try:
+            return self._decode(await self.async_client.mget([self.generation_key] + keys))
+        except Exception as e:
+            self._count(errors=1)
+            self.logger.error(f"Result cache lookup failed: {e}")
+            return [None] * len(keys), None
+
+    @staticmethod
+    def _entry(results: Any, generation: int) -> str:
+        return json.dumps({'generation': generation, 'results': results})
+
+    def put_many(self, entries: Dict[str, Any], generation: int) -> None:
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for key, results in entries.items():
+                pipeline.set(key, self._entry(results, generation), ex=self.config.RESULT_CACHE_TTL)
+            pipeline.execute()
+        except Exception as e:
+            self._count(errors=1)
+            self.logger.error(f"Result cache write failed: {e}")
+
+    async def aput_many(self, entries: Dict[str, Any], generation: int) -> None:
+        try:
+            pipeline = self.async_client.pipeline(transaction=False)
+            for key, results in entries.items():
+                pipeline.set(key, self._entry(results, generation), ex=self.config.RESULT_CACHE_TTL)
+            await pipeline.execute()
+        except Exception as e:
+            self._count(errors=1)
+            self.logger.error(f"Result cache write failed: {e}")
+
+    def bump_generation(self) -> int:
+        generation = self.client.incr(self.generation_key)
+        self.logger.info(f"Index generation bumped to {generation}, cached results invalidated")
+        return generation
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counters = dict(self._counters)
+        lookups = counters['hits'] + counters['misses'] + counters['stale']
+        return {**counters, 'hit_rate': round(counters['hits'] / lookups, 4) if lookups else 0.0}
@@ -1,65 +1,100 @@
 # If needed, for training new embeddings
+from typing import Optional
 from redis.commands.search.field import TagField, TextField, NumericField, VectorField
 from redis.commands.search.indexDefinition import IndexDefinition, IndexType
 from src.utils.config import get_config
 from src.utils.logger import get_logger
 from src.utils.redis_client import RedisClient
-from src.models.embedding_model import VectorEmbedding
+from src.models.similarity_model import SimilarityModel
+from src.pipelines.result_cache import ResultCache
+from src.utils.vectors import VECTOR_TYPES
 
 class RedisSearchIndex:
-    def __init__(self):
+    def __init__(self, vector_dimension: Optional[int] = None):
         self.config = get_config()
         self.logger = get_logger("Redis Search Index for the bikes collection")
-        self.vector_dimension = VectorEmbedding().vector_dimension()
+        # read from the model metadata unless the caller already knows it
+        self.vector_dimension = vector_dimension or SimilarityModel().vector_dimension()
         self.client = RedisClient().connect()
 
-    def create_redis_search_index(self):
-        self.logger.info("Creating the Redis Search Index for the bikes collection")
+    def vector_attributes(self) -> dict:
+        """Vector field attributes for the configured algorithm (FLAT or HNSW)."""
+        algorithm = self.config.VECTOR_ALGORITHM
+        if algorithm not in ('FLAT', 'HNSW'):
+            raise ValueError(f"Unsupported vector algorithm {algorithm}, expected FLAT or HNSW")
+        if self.config.VECTOR_TYPE not in VECTOR_TYPES:
+            raise ValueError(f"Unsupported vector type {self.config.VECTOR_TYPE}, expected one of {', '.join(VECTOR_TYPES)}")
+        attributes = {
+            'TYPE': self.config.VECTOR_TYPE,
+            'DIM': self.vector_dimension,
+            'DISTANCE_METRIC': 'COSINE',
+        }
+        if self.config.VECTOR_INITIAL_CAP:
+            attributes['INITIAL_CAP'] = self.config.VECTOR_INITIAL_CAP
+        if algorithm == 'HNSW':
+            attributes.update({
+                'M': self.config.HNSW_M,
+                'EF_CONSTRUCTION': self.config.HNSW_EF_CONSTRUCTION,
+                'EF_RUNTIME': self.config.HNSW_EF_RUNTIME,
+                'EPSILON': self.config.HNSW_EPSILON,
+            })
+        return attributes
+
+    def schema(self) -> tuple:
+        """Index schema for the configured storage: JSONPath fields for JSON, plain field names for HASH."""
+        if self.config.VECTOR_STORAGE not in ('JSON', 'HASH'):
+            raise ValueError(f"Unsupported vector storage {self.config.VECTOR_STORAGE}, expected JSON or HASH")
+        path = '$.' if self.config.VECTOR_STORAGE == 'JSON' else ''
+        return (
+            TextField(f'{path}model', no_stem=True, as_name='model'),
+            TextField(f'{path}brand', no_stem=True, as_name='brand'),
+            NumericField(f'{path}price', as_name='price'),
+            TagField(f'{path}type', as_name='type'),
+            TextField(f'{path}description', as_name='description'),
+            VectorField(f'{path}description_embeddings',
+                        self.config.VECTOR_ALGORITHM, self.vector_attributes(), as_name='vector'
+                        ),
+        )
+
+    def create_redis_search_index(self, index_name: Optional[str] = None, prefix: Optional[str] = None):
+        """Creates `index_name` (INDEX_NAME by default) over the documents under `prefix` (DOC_PREFIX by default)."""
+        index_name = index_name or self.config.INDEX_NAME
+        prefix = prefix or self.config.DOC_PREFIX
+        self.logger.info(f"Creating the Redis Search Index {index_name} for the bikes collection")
 
         try:
             self.logger.info("Checking if the index already exists...")
-            self.client.ft(self.config.INDEX_NAME).info()
+            self.client.ft(index_name).info()
             self.logger.info('Index already exists!')
         except:
-            self.logger.info("Defining the schema...")
-            schema = (
-                TextField('$.model', no_stem=True, as_name='model'),
-                TextField('$.brand', no_stem=True, as_name='brand'),
-                NumericField('$.price', as_name='price'),
-                TagField('$.type', as_name='type'),
-                TextField('$.description', as_name='description'),
-                VectorField('$.description_embeddings',
-                            'FLAT', {
-                                'TYPE': 'FLOAT32',
-                                'DIM': self.vector_dimension,
-                                'DISTANCE_METRIC': 'COSINE',
-                            }, as_name='vector'
-                            ),
-            )
+            self.logger.info(f"Defining the schema with a {self.config.VECTOR_ALGORITHM} {self.config.VECTOR_TYPE} vector field "
+                             f"over {self.config.VECTOR_STORAGE} documents...")
+            schema = self.schema()
 
             self.logger.info("Setting up the index definition...")
-            definition = IndexDefinition(prefix=[self.config.DOC_PREFIX], index_type=IndexType.JSON)
+            index_type = IndexType.HASH if self.config.VECTOR_STORAGE == 'HASH' else IndexType.JSON
+            definition = IndexDefinition(prefix=[prefix], index_type=index_type)
             try:
-                res = self.client.ft(self.config.INDEX_NAME).create_index(fields=schema, definition=definition)
+                res = self.client.ft(index_name).create_index(fields=schema, definition=definition)
+                ResultCache(self.client).bump_generation()
                 self.logger.info("Index created successfully.")
                 return res
             except Exception as e:
                 self.logger.error(f"Failed to create index: {e}, continuing with the rest of the program.")
 
+    def index_status(self, index_name: Optional[str] = None) -> dict:
+        self.logger.debug("Reading the Redis index state from FT.INFO")
+        info = self.client.ft(index_name or self.config.INDEX_NAME).info()
+        return {
+            'num_docs': int(info['num_docs']),
+            'indexing_failures': int(info['hash_indexing_failures']),
+            'total_indexing_time': float(info['total_indexing_time']),
+            'percent_indexed': float(info['percent_indexed']),
+        }
+
     def check_state_index(self):
         self.logger.info("Checking the state of the Redis index")
-        info = self.client.ft(self.config.INDEX_NAME).info()
-
-        num_docs = info['num_docs']
-        indexing_failures = info['hash_indexing_failures']
-        total_indexing_time = info['total_indexing_time']
-        percent_indexed = int(info['percent_indexed']) * 100
-
-        return f"{num_docs} documents ({percent_indexed} percent) indexed with {indexing_failures} failures in {float(total_indexing_time):.2f} milliseconds"
-
-
-
-
-
-
+        status = self.index_status()
+        percent_indexed = int(status['percent_indexed'] * 100)
 
+        return f"{status['num_docs']} documents ({percent_indexed} percent) indexed with {status['indexing_failures']} failures in {status['total_indexing_time']:.2f} milliseconds"
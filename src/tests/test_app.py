@@ -0,0 +1,117 @@
+# Unit tests for the FastAPI application (health checks and search routes)
+import os
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+os.environ.setdefault('PROJECT_NAME', 'Semantic Search API')
+os.environ.setdefault('VERSION', '0.1.0')
+os.environ.setdefault('INDEX_NAME', 'idx:bikes_vss')
+os.environ.setdefault('DOC_PREFIX', 'bikes')
+
+from src.app.main import app
+from src.app.routes import get_search_app
+from src.models.core import QueryResults, SearchFilters, SearchResult
+from src.utils.logger import get_logger
+
+
+class TestApp(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the FastAPI application...")
+
+    def setUp(self):
+        self.logger.info("Serve requests with a mocked search app, without running the lifespan bootstrap")
+        self.search_app = MagicMock()
+        app.dependency_overrides[get_search_app] = lambda: self.search_app
+        self.client = TestClient(app)
+
+    def tearDown(self):
+        app.dependency_overrides.clear()
+        if hasattr(app.state, 'bootstrap'):
+            del app.state.bootstrap
+
+    def test_liveness_does_not_depend_on_bootstrap(self):
+        self.assertEqual(self.client.get("/health/live").status_code, 200)
+        self.assertEqual(self.client.get("/health").status_code, 200)
+
+    def test_readiness_waits_for_bootstrap_and_index(self):
+        self.logger.info("Not ready before the lifespan created the bootstrap job")
+        self.assertEqual(self.client.get("/health/ready").status_code, 503)
+
+        app.state.bootstrap = MagicMock()
+        app.state.bootstrap.readiness.return_value = {'ready': False, 'bootstrap': 'running', 'error': None}
+        self.assertEqual(self.client.get("/health/ready").status_code, 503)
+
+        app.state.bootstrap.readiness.return_value = {'ready': True, 'bootstrap': 'done', 'index': {'percent_indexed': 1.0}}
+        response = self.client.get("/health/ready")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['status'], 'ready')
+
+    def test_search_uses_the_shared_search_app(self):
+        result = SearchResult(query='Vintage bike', score=0.83, id='bikes:010', brand='nHill', model='Summit',
+                              description='A vintage frame')
+        self.search_app.search_async = AsyncMock(return_value=[result])
+
+        response = self.client.post("/vss/search/", params={'query': 'Vintage bike'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'query': 'Vintage bike', 'results': [result.model_dump()]})
+        self.search_app.search_async.assert_awaited_once_with(['Vintage bike'], 3, {}, filters=None)
+
+    @patch('src.app.routes.config.MAX_BATCH_QUERIES', 2)
+    def test_batch_search_enforces_the_batch_cap(self):
+        response = self.client.post("/vss/batch-search/", json=['a', 'b', 'c'])
+
+        self.assertEqual(response.status_code, 422)
+        self.search_app.search_async.assert_not_called()
+
+    def test_pagination_is_pushed_to_redis_with_a_cursor(self):
+        result = SearchResult(query='Vintage bike', score=0.5, id='bikes:003', brand='Nord', model='Chook air 5',
+                              description='A commuter')
+        self.search_app.search_hits_async = AsyncMock(
+            return_value=[QueryResults(query='Vintage bike', total=11, results=[result] * 5)])
+
+        first = self.client.post("/vss/search/paginated/", params={'query': 'Vintage bike', 'per_page': 5, 'k': 11}).json()
+        self.search_app.search_hits_async.assert_awaited_with(['Vintage bike'], 11, 0, 5, {}, filters=None)
+        self.assertEqual((first['total_results'], first['page']), (11, 1))
+
+        second = self.client.post("/vss/search/paginated/", params={'query': 'Vintage bike', 'cursor': first['next_cursor']}).json()
+        self.search_app.search_hits_async.assert_awaited_with(['Vintage bike'], 11, 5, 5, {}, filters=None)
+        self.assertEqual(second['page'], 2)
+
+        third = self.client.post("/vss/search/paginated/", params={'query': 'Vintage bike', 'cursor': second['next_cursor']}).json()
+        self.search_app.search_hits_async.assert_awaited_with(['Vintage bike'], 11, 10, 5, {}, filters=None)
+        self.assertIsNone(third['next_cursor'])
+
+        self.logger.info("A cursor cannot be replayed against another query")
+        response = self.client.post("/vss/search/paginated/", params={'query': 'Road bike', 'cursor': first['next_cursor']})
+        self.assertEqual(response.status_code, 400)
+
+    def test_filters_are_passed_to_the_search_app(self):
+        self.search_app.search_async = AsyncMock(return_value=[])
+
+        response = self.client.post("/vss/search/", params={'query': 'Kids bike', 'max_price': 900,
+                                                            'type': ['Kids bikes', 'Kids Mountain Bikes']})
+
+        self.assertEqual(response.status_code, 200)
+        self.search_app.search_async.assert_awaited_once_with(['Kids bike'], 3, {}, filters=SearchFilters(
+            max_price=900, types=['Kids bikes', 'Kids Mountain Bikes']))
+
+        self.logger.info("An empty price range is rejected before searching")
+        response = self.client.post("/vss/search/", params={'query': 'Kids bike', 'min_price': 900, 'max_price': 100})
+        self.assertEqual(response.status_code, 422)
+
+        self.logger.info("So is a brand without a single word to match")
+        response = self.client.post("/vss/search/", params={'query': 'Kids bike', 'brand': '!!!'})
+        self.assertEqual(response.status_code, 422)
+        self.search_app.search_async.assert_awaited_once()
+
+    def test_k_is_bounded(self):
+        response = self.client.post("/vss/search/", params={'query': 'Vintage bike', 'k': 10_000})
+
+        self.assertEqual(response.status_code, 422)
+
+
+if __name__ == '__main__':
+    unittest.main()
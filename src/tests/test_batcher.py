@@ -0,0 +1,60 @@
+# Unit tests for the query embedding micro-batcher
+import asyncio
+import unittest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock
+from src.models.batcher import EmbeddingBatcher
+from src.utils.logger import get_logger
+
+
+class TestEmbeddingBatcher(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the embedding micro-batcher...")
+
+    def setUp(self):
+        self.logger.info("Embedder that encodes each query as a vector filled with its length")
+        self.embedder = MagicMock()
+        self.embedder.encode.side_effect = lambda queries: np.array([[len(q)] * 3 for q in queries], dtype=np.float32)
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(self.executor.shutdown)
+
+    def test_concurrent_requests_share_one_encode(self):
+        batcher = EmbeddingBatcher(self.embedder, max_batch_size=8, max_wait_ms=20, executor=self.executor)
+
+        async def concurrent_requests():
+            return await asyncio.gather(
+                batcher.encode(['Vintage bike']),
+                batcher.encode(['Road bike for beginners', 'Comfortable city bike']),
+                batcher.encode(['Bike for small kids']),
+            )
+
+        first, second, third = asyncio.run(concurrent_requests())
+
+        self.embedder.encode.assert_called_once()
+        np.testing.assert_array_equal(first, [[12, 12, 12]])
+        np.testing.assert_array_equal(second, [[23, 23, 23], [21, 21, 21]])
+        np.testing.assert_array_equal(third, [[19, 19, 19]])
+        self.assertEqual(batcher.stats()['batches'], 1)
+        self.assertEqual(batcher.stats()['avg_batch_size'], 4)
+
+    def test_full_batches_are_flushed_without_waiting(self):
+        batcher = EmbeddingBatcher(self.embedder, max_batch_size=2, max_wait_ms=10_000, executor=self.executor)
+
+        vectors = asyncio.run(asyncio.wait_for(batcher.encode(['a', 'bb', 'ccc', 'dddd']), timeout=5))
+
+        self.assertEqual(self.embedder.encode.call_count, 2)
+        self.assertEqual(vectors.shape, (4, 3))
+        self.assertEqual(batcher.stats()['fill_rate'], 1.0)
+
+    def test_encode_errors_reach_every_caller(self):
+        self.embedder.encode.side_effect = RuntimeError("model unavailable")
+        batcher = EmbeddingBatcher(self.embedder, max_batch_size=8, max_wait_ms=1, executor=self.executor)
+
+        with self.assertRaises(RuntimeError):
+            asyncio.run(batcher.encode(['Vintage bike']))
+
+
+if __name__ == '__main__':
+    unittest.main()
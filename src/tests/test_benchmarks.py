@@ -0,0 +1,71 @@
+# Smoke tests for the benchmark suite
+import json
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+import numpy as np
+from benchmarks.recall import cheapest, exact_top_k, recall_at_k, variants
+from benchmarks.run import compare, main
+from src.utils.logger import get_logger
+
+
+class TestBenchmarks(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the benchmark suite...")
+
+    @patch('src.pipelines.inference_pipeline.SimilarityModel')
+    def test_in_process_run_writes_a_comparable_report(self, similarity_model):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        output = f"{directory.name}/report.json"
+
+        self.logger.info("A tiny corpus through the NumPy backend with the hashing encoder")
+        main(['run', '--sizes', '300', '--suites', 'ingest', 'query', 'encode', '--target', 'numpy',
+              '--encoder', 'hashing', '--queries', '20', '--encode-sentences', '50', '--encode-batch-sizes', '1', '16',
+              '--output', output])
+
+        with open(output) as f:
+            report = json.load(f)
+        suites = [result['suite'] for result in report['results']]
+        self.assertEqual(suites, ['ingest', 'query', 'encode', 'encode'])
+        self.assertEqual(report['results'][0]['documents'], 300)
+        self.assertLessEqual(report['results'][1]['single']['p50_ms'], report['results'][1]['single']['p99_ms'])
+
+        rows = {row['metric']: row for row in compare(report, report)}
+        self.assertEqual(rows['ingest/300/docs_per_sec']['change_pct'], 0.0)
+        self.assertIn('encode/50/16/sentences_per_sec', rows)
+
+        self.logger.info("The hashing encoder never loads the sentence transformer")
+        similarity_model.assert_not_called()
+        self.assertFalse(report['meta']['query_settings']['RERANK_ENABLED'])
+
+    def test_recall_is_measured_against_exact_search(self):
+        rng = np.random.default_rng(3)
+        vectors = rng.normal(size=(500, 8)).astype(np.float32)
+        queries = rng.normal(size=(20, 8)).astype(np.float32)
+
+        truth = exact_top_k(vectors, queries, 5)
+
+        normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+        np.testing.assert_array_equal(truth, np.argsort(-(queries @ normalized.T), axis=1)[:, :5])
+        self.assertEqual(recall_at_k(truth, truth.tolist(), 5), 1.0)
+        self.assertAlmostEqual(recall_at_k(truth, [row[:4] + [-1] for row in truth.tolist()], 5), 0.8)
+
+        self.logger.info("The cheapest variant is the smallest index that still reaches the target recall")
+        results = [
+            {'vector_type': 'FLOAT32', 'recall_at_5': 1.0, 'qps': 800, 'index_bytes_per_doc': 1600},
+            {'vector_type': 'FLOAT16', 'recall_at_5': 0.97, 'qps': 900, 'index_bytes_per_doc': 900},
+            {'vector_type': 'FLOAT16', 'recall_at_5': 0.97, 'qps': 1200, 'index_bytes_per_doc': 900},
+            {'vector_type': 'BFLOAT16', 'recall_at_5': 0.91, 'qps': 1500, 'index_bytes_per_doc': 850},
+        ]
+        self.assertEqual(cheapest(results, 5, 0.95), results[2])
+        self.assertIsNone(cheapest(results, 5, 1.01))
+
+        grid = list(variants(SimpleNamespace(vector_types=['FLOAT32'], algorithms=['FLAT', 'HNSW'], m=[8, 16], ef_construction=[200])))
+        self.assertEqual([variant['VECTOR_ALGORITHM'] for variant in grid], ['FLAT', 'HNSW', 'HNSW'])
+
+
+if __name__ == '__main__':
+    unittest.main()
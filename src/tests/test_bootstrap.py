@@ -0,0 +1,83 @@
+# Unit tests for the background bootstrap job (ingestion lock, index wait, readiness)
+import json
+import unittest
+from unittest.mock import patch
+from redis.exceptions import LockNotOwnedError
+from src.app.bootstrap import SearchBootstrap
+from src.utils.config import get_config
+from src.utils.logger import get_logger
+
+
+class TestSearchBootstrap(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the search bootstrap...")
+
+    def setUp(self):
+        self.logger.info("Bootstrap against a mocked Redis client, model and search app")
+        for target in ('RedisClient', 'SimilarityModel', 'get_search_app', 'RedisSearchIndex', 'IndexManager'):
+            patcher = patch(f'src.app.bootstrap.{target}')
+            setattr(self, target, patcher.start())
+            self.addCleanup(patcher.stop)
+        self.client = self.RedisClient.return_value.connect.return_value
+        self.get_search_app.return_value.backend.__len__.return_value = 42
+
+    def test_numpy_backend_is_ready_without_a_redis_index(self):
+        with patch.object(get_config(), 'VECTOR_BACKEND', 'NUMPY'):
+            bootstrap = SearchBootstrap()
+            bootstrap.run()
+            readiness = bootstrap.readiness()
+
+        self.logger.info("Nothing is ingested into Redis and FT.INFO is never read")
+        self.assertEqual(bootstrap.state, SearchBootstrap.DONE)
+        self.assertEqual(readiness, {'ready': True, 'bootstrap': 'done',
+                                     'index': {'backend': 'numpy', 'num_docs': 42, 'percent_indexed': 1.0}})
+        self.client.lock.assert_not_called()
+        self.IndexManager.assert_not_called()
+        self.RedisSearchIndex.assert_not_called()
+
+    def test_lock_lost_before_release_does_not_fail_the_holder(self):
+        lock = self.client.lock.return_value
+        lock.acquire.return_value = True
+        lock.release.side_effect = LockNotOwnedError("Cannot release a lock that's no longer owned")
+        self.RedisSearchIndex.return_value.index_status.return_value = {'percent_indexed': 1.0}
+
+        bootstrap = SearchBootstrap()
+        bootstrap.run()
+
+        self.logger.info("Ingestion finished, so the replica serves and records the outcome for the waiters")
+        self.assertEqual(bootstrap.state, SearchBootstrap.DONE)
+        self.assertEqual(self.client.lock.call_args.kwargs['thread_local'], False)
+        self.IndexManager.return_value.sync.assert_called_once()
+        self.assertEqual(json.loads(self.client.set.call_args.args[1]), {'state': 'done'})
+
+    def test_waiting_replica_fails_with_the_holders_error(self):
+        self.client.lock.return_value.acquire.return_value = False
+        self.client.exists.side_effect = [True, False]
+        self.client.get.return_value = json.dumps({'state': 'failed', 'error': "bikes.json not found"}).encode()
+
+        with patch.object(get_config(), 'BOOTSTRAP_POLL_INTERVAL', 0):
+            bootstrap = SearchBootstrap()
+            bootstrap.run()
+
+        self.logger.info("The waiter does not go on to serve an index nobody built")
+        self.assertEqual(bootstrap.state, SearchBootstrap.FAILED)
+        self.assertIn("bikes.json not found", bootstrap.error)
+        self.IndexManager.assert_not_called()
+
+    def test_stopped_bootstrap_is_not_reported_done(self):
+        self.client.lock.return_value.acquire.return_value = False
+        self.client.exists.return_value = True
+
+        bootstrap = SearchBootstrap()
+        bootstrap.stop()
+        bootstrap.run()
+
+        self.logger.info("Shutdown while waiting for the holder: no index confirmed, no pre-warm, not ready")
+        self.assertEqual(bootstrap.state, SearchBootstrap.STOPPED)
+        self.assertFalse(bootstrap.readiness()['ready'])
+        self.get_search_app.return_value.search.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -53,6 +53,23 @@ class TestDataLoader(unittest.TestCase):
         self.logger.info("Compare the result with the expected DataFrame")
         pd.testing.assert_frame_equal(result, self.expected_dataframe)
 
+    def test_stream_reads_json_jsonl_and_csv_incrementally(self):
+        data_dir = Path(__file__).parent.parent / 'data'
+        loader = BikeDataLoader()
+
+        self.logger.info("JSON and CSV sources yield the same bikes, one at a time")
+        self.assertEqual(list(loader.stream(str(data_dir / 'bikes_data.json'))), self.expected_json_data)
+        self.assertEqual(list(loader.stream(str(data_dir / 'bikes_data.csv'))), self.expected_json_data)
+
+        self.logger.info("JSON arrays split across arbitrary chunk boundaries decode the same")
+        text = json.dumps(self.expected_json_data)
+        with patch.object(BikeDataLoader, '_text_chunks', return_value=[text[i:i + 7] for i in range(0, len(text), 7)]):
+            self.assertEqual(list(loader.stream('bikes.json')), self.expected_json_data)
+
+        lines = [json.dumps(bike) for bike in self.expected_json_data]
+        with patch.object(BikeDataLoader, '_lines', return_value=lines):
+            self.assertEqual(list(loader.stream('bikes.jsonl')), self.expected_json_data)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,69 @@
+# Unit tests for the query embedding cache
+import unittest
+import numpy as np
+from unittest.mock import MagicMock, patch
+from src.models.embedding_cache import EmbeddingCache
+from src.utils.logger import get_logger
+
+
+class TestEmbeddingCache(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the embedding cache...")
+
+    def setUp(self):
+        self.vector = np.array([0.1, 0.2, 0.3], dtype=np.float32)
+        self.model = patch('src.utils.config.DevelopmentConfig.PRETRAINED_TRANSFORMER_MODEL', 'msmarco-distilbert-base-v4')
+        self.model.start()
+        self.addCleanup(self.model.stop)
+
+    def test_normalized_queries_share_an_entry(self):
+        cache = EmbeddingCache(max_entries=10, ttl=60)
+        cache.put_many(['Vintage bike'], [self.vector])
+
+        cached = cache.get_many(['  vintage   BIKE ', 'Road bike'])
+
+        np.testing.assert_array_equal(cached[0], self.vector)
+        self.assertIsNone(cached[1])
+        self.assertEqual((cache.stats()['hits'], cache.stats()['misses']), (1, 1))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = EmbeddingCache(max_entries=2, ttl=60)
+        cache.put_many(['a', 'b'], [self.vector, self.vector])
+        cache.get_many(['a'])
+        cache.put_many(['c'], [self.vector])
+
+        self.assertEqual([vector is None for vector in cache.get_many(['a', 'b', 'c'])], [False, True, False])
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_expired_entries_are_misses(self):
+        cache = EmbeddingCache(max_entries=10, ttl=-1)
+        cache.put_many(['Vintage bike'], [self.vector])
+
+        self.assertEqual(cache.get_many(['Vintage bike']), [None])
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_redis_tier_stores_float32_bytes(self):
+        redis_client = MagicMock()
+        redis_client.mget.return_value = [self.vector.tobytes()]
+        cache = EmbeddingCache(max_entries=10, ttl=60, redis_client=redis_client)
+
+        cached = cache.get_many(['Vintage bike'])
+
+        np.testing.assert_array_equal(cached[0], self.vector)
+        self.assertEqual(cache.stats()['redis_hits'], 1)
+        self.logger.info("The Redis hit is promoted to the local tier")
+        cache.get_many(['Vintage bike'])
+        redis_client.mget.assert_called_once()
+
+    def test_model_change_invalidates_entries(self):
+        cache = EmbeddingCache(max_entries=10, ttl=60)
+        cache.put_many(['Vintage bike'], [self.vector])
+
+        with patch('src.utils.config.DevelopmentConfig.PRETRAINED_TRANSFORMER_MODEL', 'all-MiniLM-L6-v2'):
+            self.assertEqual(cache.get_many(['Vintage bike']), [None])
+            self.assertEqual(cache.stats()['model'], 'all-MiniLM-L6-v2')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+# Unit tests for the on-disk embedding store
+import tempfile
+import unittest
+import numpy as np
+from src.data.embedding_store import EmbeddingStore
+from src.utils.logger import get_logger
+
+
+class TestEmbeddingStore(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the on-disk embedding store...")
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.vectors = np.arange(12, dtype=np.float32).reshape(3, 4)
+        self.hashes = [EmbeddingStore.content_hash(text) for text in ('small bike', 'road bike', 'city bike')]
+
+    def test_vectors_survive_a_restart(self):
+        store = EmbeddingStore(self.directory.name, 'test-model')
+        self.assertEqual(store.put_many(self.hashes, self.vectors), 3)
+        self.assertEqual(store.put_many(self.hashes[:1], self.vectors[:1]), 0)
+
+        self.logger.info("A new instance maps the same files")
+        reopened = EmbeddingStore(self.directory.name, 'test-model')
+        vectors = reopened.get_many([self.hashes[2], 'unknown'])
+        np.testing.assert_array_equal(vectors[0], self.vectors[2])
+        self.assertIsNone(vectors[1])
+        self.assertEqual(reopened.verify(), {'entries': 3, 'rows': 3, 'missing': 0, 'corrupt': 0, 'orphans': 0})
+
+        with self.assertRaises(ValueError):
+            EmbeddingStore(self.directory.name, 'test-model').put_many(['x'], np.ones((1, 8)))
+
+    def test_corrupt_rows_are_detected_and_compacted_away(self):
+        store = EmbeddingStore(self.directory.name, 'test-model')
+        store.put_many(self.hashes, self.vectors)
+
+        self.logger.info("Flip a byte of the second row")
+        with open(store.vectors_path, 'r+b') as f:
+            f.seek(store.row_bytes + 1)
+            f.write(b'\xff')
+
+        store = EmbeddingStore(self.directory.name, 'test-model')
+        self.assertIsNone(store.get_many([self.hashes[1]])[0])
+        self.assertEqual(store.verify()['corrupt'], 1)
+
+        self.logger.info("Compaction keeps the intact rows that are still wanted")
+        self.assertEqual(store.compact(keep=[self.hashes[2], self.hashes[1]]), {'rows_before': 3, 'rows_after': 1})
+        np.testing.assert_array_equal(store.get_many([self.hashes[2]])[0], self.vectors[2])
+        self.assertEqual(store.verify(), {'entries': 1, 'rows': 1, 'missing': 0, 'corrupt': 0, 'orphans': 0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+# Unit tests for blue/green index rebuilds
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+from redis.exceptions import LockNotOwnedError
+from src.pipelines.index_manager import IndexManager, IndexRebuildInProgress
+from src.utils.config import get_config
+from src.utils.logger import get_logger
+
+
+class TestIndexManager(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the blue/green index manager...")
+
+    def setUp(self):
+        patchers = [
+            patch.object(get_config(), 'INDEX_NAME', 'idx:bikes'),
+            patch.object(get_config(), 'DOC_PREFIX', 'bikes'),
+            patch.object(get_config(), 'INGEST_BATCH_SIZE', 2),
+            patch('src.pipelines.index_manager.RedisSearchIndex'),
+            patch('src.data.vector_store.RedisVectorOperations'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.search_index = patchers[3].target.RedisSearchIndex.return_value
+        self.search_index.index_status.return_value = {'percent_indexed': 1.0, 'num_docs': 3}
+        self.store = patchers[4].target.RedisVectorOperations
+        self.store.return_value.sync.return_value = {'documents': 3}
+
+        self.client = MagicMock()
+        self.state = {'idx:bikes:active-generation': json.dumps({'version': 1, 'index': 'idx:bikes:v1', 'prefix': 'v1:bikes'})}
+        self.client.get.side_effect = self.state.get
+        self.client.set.side_effect = self.state.__setitem__
+        self.client.incr.return_value = 2
+        self.client.scan_iter.return_value = iter([b'v1:bikes:a', b'v1:bikes:b', b'v1:bikes:c'])
+        self.client.unlink.side_effect = lambda *keys: len(keys)
+        self.manager = IndexManager(self.client)
+
+    def test_rebuild_switches_the_alias_then_collects_the_old_generation(self):
+        target = self.manager.rebuild()
+
+        self.logger.info("Generation 2 is ingested under its own prefix and indexed before the switch")
+        self.store.assert_called_once_with(prefix='v2:bikes')
+        self.search_index.create_redis_search_index.assert_called_once_with('idx:bikes:v2', 'v2:bikes:')
+        self.client.ft.assert_any_call('idx:bikes:v2')
+        self.client.ft.return_value.aliasupdate.assert_called_once_with('idx:bikes')
+        self.assertEqual(json.loads(self.state['idx:bikes:active-generation']), target)
+
+        self.logger.info("The old generation is dropped and unlinked in batches")
+        self.client.ft.return_value.dropindex.assert_called_once_with(delete_documents=False)
+        self.client.scan_iter.assert_called_once_with(match='v1:bikes:*', count=2)
+        self.assertEqual([len(call.args) for call in self.client.unlink.call_args_list], [2, 1])
+        self.client.lock.return_value.release.assert_called_once()
+
+    def test_failed_rebuild_keeps_the_live_generation(self):
+        self.search_index.index_status.side_effect = RuntimeError("Unknown index name")
+
+        with self.assertRaises(RuntimeError):
+            self.manager.rebuild()
+
+        self.client.ft.return_value.aliasupdate.assert_not_called()
+        self.assertEqual(json.loads(self.state['idx:bikes:active-generation'])['version'], 1)
+        self.client.scan_iter.assert_called_once_with(match='v2:bikes:*', count=2)
+
+    def test_failed_cleanup_after_the_switch_keeps_the_new_generation(self):
+        self.client.unlink.side_effect = ConnectionError("Connection reset by peer")
+
+        target = self.manager.rebuild()
+
+        self.logger.info("The alias serves v2; only v1 was touched by the failed cleanup")
+        self.assertEqual(json.loads(self.state['idx:bikes:active-generation']), target)
+        self.client.scan_iter.assert_called_once_with(match='v1:bikes:*', count=2)
+        self.assertIn('cleanup_error', self.client.hset.call_args_list[-2].kwargs['mapping'])
+
+    def test_legacy_index_is_restored_when_the_alias_cannot_be_added(self):
+        self.state.clear()
+        self.client.ft.return_value.info.return_value = {'index_name': b'idx:bikes'}
+        self.client.ft.return_value.aliasadd.side_effect = RuntimeError("Alias already exists")
+
+        with self.assertRaises(RuntimeError):
+            self.manager.rebuild()
+
+        self.logger.info("The legacy index is dropped for the alias, then recreated over its documents")
+        self.client.ft.return_value.dropindex.assert_any_call(delete_documents=False)
+        self.search_index.create_redis_search_index.assert_called_with('idx:bikes', 'bikes:')
+        self.client.scan_iter.assert_called_once_with(match='v2:bikes:*', count=2)
+        self.assertNotIn('idx:bikes:active-generation', self.state)
+
+    def test_missing_record_is_restored_from_the_alias(self):
+        self.state.clear()
+        self.client.ft.return_value.info.return_value = {'index_name': b'idx:bikes:v1'}
+
+        target = self.manager.rebuild()
+
+        self.logger.info("FT.INFO names the generation behind the alias, so it is not taken for the legacy index")
+        self.assertEqual(self.state['idx:bikes:generation-counter'], 1)
+        self.client.ft.return_value.aliasadd.assert_not_called()
+        self.client.ft.return_value.aliasupdate.assert_called_once_with('idx:bikes')
+        self.client.scan_iter.assert_called_once_with(match='v1:bikes:*', count=2)
+        self.assertEqual(json.loads(self.state['idx:bikes:active-generation']), target)
+
+    def test_lost_lock_does_not_hide_the_result(self):
+        self.client.lock.return_value.release.side_effect = LockNotOwnedError("Cannot release a lock that's no longer owned")
+
+        target = self.manager.rebuild()
+
+        self.assertEqual(target['version'], 2)
+        self.client.lock.assert_called_once_with('idx:bikes:rebuild-lock', timeout=get_config().INDEX_REBUILD_TIMEOUT,
+                                                 thread_local=False)
+
+    def test_only_one_rebuild_runs_at_a_time(self):
+        self.client.lock.return_value.acquire.return_value = False
+
+        with self.assertRaises(IndexRebuildInProgress):
+            self.manager.rebuild()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,234 @@
+# Unit tests for the KNN inference pipeline
+import asyncio
+import time
+import unittest
+import numpy as np
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+from src.models.core import SearchFilters
+from src.pipelines.backends import NumpyBackend
+from src.pipelines.inference_pipeline import SemanticSearch
+from src.pipelines.result_cache import ResultCache
+from src.utils.executor import get_rerank_executor
+from src.utils.logger import get_logger
+
+
+def make_response(*docs) -> list:
+    """Raw RESP2 FT.SEARCH reply for (id, distance, brand, model) tuples, as a pipeline returns it."""
+    response = [len(docs)]
+    for doc_id, distance, brand, model in docs:
+        response += [doc_id.encode(), [b'vector_score', str(distance).encode(), b'id', doc_id.encode(),
+                                       b'brand', brand.encode(), b'model', model.encode(),
+                                       b'description', f"{brand} {model} description".encode()]]
+    return response
+
+
+class TestSemanticSearch(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the inference pipeline...")
+
+    def setUp(self):
+        self.logger.info("Build the search app with a mocked embedder and Redis clients")
+        self.embedder = MagicMock()
+        self.embedder.encode.side_effect = lambda queries: np.ones((len(queries), 4), dtype=np.float32)
+        patcher = patch('src.pipelines.inference_pipeline.SimilarityModel')
+        self.addCleanup(patcher.stop)
+        patcher.start().return_value.load_model.return_value = self.embedder
+
+        self.search_app = SemanticSearch()
+        self.search_app.client = MagicMock()
+        self.search_app.async_client = MagicMock()
+        self.search_app.result_cache = None
+
+    def test_async_search_encodes_off_loop_and_queries_redis(self):
+        pipeline = self.search_app.async_client.ft.return_value.pipeline.return_value
+        pipeline.search = AsyncMock()
+        pipeline.execute = AsyncMock(return_value=[
+            make_response(('bikes:001', 0.1, 'Velorim', 'Jigger'), ('bikes:002', 0.3, 'Bicyk', 'Hillcraft'))
+        ])
+
+        async def search():
+            encoded, query = await self.search_app.semantic_search_vss_async(['Vintage bike'])
+            return await self.search_app.create_query_table_async(query, ['Vintage bike'], encoded)
+
+        results = asyncio.run(search())
+
+        self.embedder.encode.assert_called_once_with(['Vintage bike'])
+        pipeline.search.assert_awaited_once()
+        self.assertEqual([result.id for result in results], ['bikes:001', 'bikes:002'])
+        self.assertEqual([result.score for result in results], [0.9, 0.7])
+        self.assertEqual(results[1].brand, 'Bicyk')
+
+    def test_repeated_queries_skip_the_transformer(self):
+        self.search_app.semantic_search_vss(['Vintage bike'])
+        encoded, _ = self.search_app.semantic_search_vss(['vintage bike', 'Road bike for beginners'])
+
+        self.assertEqual(self.embedder.encode.call_count, 2)
+        self.embedder.encode.assert_called_with(['Road bike for beginners'])
+        self.assertEqual(encoded.shape, (2, 4))
+
+    def test_cached_results_skip_encode_and_search(self):
+        self.logger.info("Back the result cache with an in-memory stand-in for Redis")
+        store = {}
+        self.search_app.client.mget.side_effect = lambda keys: [store.get(key) for key in keys]
+        self.search_app.client.pipeline.return_value.set.side_effect = lambda key, value, ex=None: store.__setitem__(key, value)
+        self.search_app.client.incr.side_effect = lambda key: store.__setitem__(key, int(store.get(key, 0)) + 1) or store[key]
+        search_pipeline = self.search_app.client.ft.return_value.pipeline.return_value
+        search_pipeline.execute.return_value = [make_response(('bikes:001', 0.1, 'Velorim', 'Jigger'))]
+        self.search_app.result_cache = ResultCache(self.search_app.client)
+
+        first = self.search_app.search(['Vintage bike'])
+        second = self.search_app.search(['Vintage bike'])
+
+        self.assertEqual(first, second)
+        self.embedder.encode.assert_called_once()
+        search_pipeline.search.assert_called_once()
+
+        self.logger.info("Bumping the index generation makes the cached entry stale")
+        self.search_app.result_cache.bump_generation()
+        self.search_app.search(['Vintage bike'])
+        self.assertEqual(search_pipeline.search.call_count, 2)
+        self.assertEqual(self.search_app.result_cache.stats()['stale'], 1)
+
+    def test_batch_is_deduplicated_and_pipelined(self):
+        search_pipeline = self.search_app.client.ft.return_value.pipeline.return_value
+        search_pipeline.execute.return_value = [
+            make_response(('bikes:001', 0.1, 'Velorim', 'Jigger')),
+            make_response(('bikes:002', 0.2, 'Bicyk', 'Hillcraft')),
+        ]
+
+        results = self.search_app.search(['Vintage bike', 'Road bike', 'vintage bike'])
+
+        self.logger.info("Two distinct queries: one encode, two FT.SEARCH commands, one pipeline round trip")
+        self.embedder.encode.assert_called_once_with(['Vintage bike', 'Road bike'])
+        self.assertEqual(search_pipeline.search.call_count, 2)
+        search_pipeline.execute.assert_called_once()
+        self.assertEqual([(result.query, result.id) for result in results],
+                         [('Vintage bike', 'bikes:001'), ('Road bike', 'bikes:002'), ('vintage bike', 'bikes:001')])
+
+    def test_knn_query_pushes_k_and_paging_to_redis(self):
+        args = [str(arg) for arg in self.search_app.knn_query(k=20, offset=10, limit=5).get_args()]
+
+        self.assertIn('(*)=>[KNN 20 @vector $query_vector AS vector_score]', args)
+        self.assertEqual(args[args.index('LIMIT') + 1:args.index('LIMIT') + 3], ['10', '5'])
+
+        self.logger.info("k is bounded by MAX_K")
+        with self.assertRaises(ValueError):
+            self.search_app.knn_query(k=self.search_app.config.MAX_K + 1)
+
+    def test_hnsw_queries_carry_ef_runtime(self):
+        search_pipeline = self.search_app.client.ft.return_value.pipeline.return_value
+        search_pipeline.execute.return_value = [make_response(('bikes:001', 0.1, 'Velorim', 'Jigger'))]
+
+        with patch.object(self.search_app.config, 'VECTOR_ALGORITHM', 'HNSW'), \
+                patch.object(self.search_app.config, 'HNSW_EF_RUNTIME', 10):
+            self.assertIn('EF_RUNTIME $EF_RUNTIME', self.search_app.knn_query().query_string())
+            self.search_app.search(['Vintage bike'])
+            self.search_app.search(['Vintage bike'], extra_params={'ef_runtime': 64})
+
+        self.logger.info("The config default applies unless the request overrides it")
+        params = [call.args[1] for call in search_pipeline.search.call_args_list]
+        self.assertEqual([p['EF_RUNTIME'] for p in params], [10, 64])
+
+        self.logger.info("FLAT indexes are exact, the override is dropped")
+        self.search_app.search(['Vintage bike'], extra_params={'ef_runtime': 64})
+        self.assertNotIn('EF_RUNTIME', search_pipeline.search.call_args.args[1])
+        self.assertNotIn('EF_RUNTIME', self.search_app.knn_query().query_string())
+
+    def test_filters_become_the_knn_pre_filter(self):
+        search_pipeline = self.search_app.client.ft.return_value.pipeline.return_value
+        search_pipeline.execute.return_value = [make_response(('bikes:003', 0.1, 'Nord', 'Chook air 5'))]
+        filters = SearchFilters(max_price=1000, types=['Kids Mountain Bikes', 'BMX|*'], brand='Nord (EU)')
+
+        self.search_app.search(['Cheap mountain bike for kids'], filters=filters)
+
+        query, params = search_pipeline.search.call_args.args
+        self.logger.info("Tag values are escaped, the brand is reduced to its words, prices travel as parameters")
+        self.assertEqual(
+            query.query_string().split('=>')[0],
+            r'(@price:[-inf $max_price] @type:{Kids\ Mountain\ Bikes | BMX\|\*} @brand:"Nord EU")'
+        )
+        self.assertEqual(params['max_price'], 1000)
+        self.assertNotIn('min_price', params)
+
+        with self.assertRaises(ValueError):
+            self.search_app.search(['Cheap bike'], filters=SearchFilters(min_price=500, max_price=100))
+
+    def test_numpy_backend_stands_in_for_redis(self):
+        backend = NumpyBackend()
+        backend.write([
+            ('bikes:001', {'brand': 'Velorim', 'model': 'Jigger', 'price': 270, 'type': 'Kids bikes', 'description': 'Small'},
+             ('a', 'a'), np.array([1, 1, 1, 1], dtype=np.float32), True),
+            ('bikes:002', {'brand': 'Bicyk', 'model': 'Hillcraft', 'price': 1200, 'type': 'Kids Mountain Bikes', 'description': 'Big'},
+             ('b', 'b'), np.array([1, 0, 0, 0], dtype=np.float32), True),
+        ])
+        self.search_app._backend = backend
+
+        results = self.search_app.search(['Vintage bike'], k=2)
+        filtered = self.search_app.search(['Vintage bike'], k=2, filters=SearchFilters(min_price=1000))
+
+        self.assertEqual([(result.id, result.score) for result in results], [('bikes:001', 1.0), ('bikes:002', 0.5)])
+        self.assertEqual([result.id for result in filtered], ['bikes:002'])
+        self.search_app.client.ft.assert_not_called()
+
+        self.logger.info("Without a snapshot directory the error names the missing setting")
+        with patch.object(self.search_app.config, 'VECTOR_BACKEND', 'NUMPY'), \
+                patch.object(self.search_app.config, 'NUMPY_INDEX_DIR', None):
+            with self.assertRaisesRegex(ValueError, 'NUMPY_INDEX_DIR'):
+                SemanticSearch().backend
+
+    def test_cross_encoder_reorders_the_top_candidates(self):
+        search_pipeline = self.search_app.client.ft.return_value.pipeline.return_value
+        search_pipeline.execute.return_value = [make_response(
+            ('bikes:001', 0.1, 'Velorim', 'Jigger'), ('bikes:002', 0.2, 'Bicyk', 'Hillcraft'), ('bikes:003', 0.3, 'Nord', 'Ariel')
+        )]
+        cross_encoder = MagicMock()
+        cross_encoder.predict.return_value = np.array([0.1, 0.2, 0.9])
+
+        with patch('src.models.cross_encoder_model.ModelRegistry.get', return_value=cross_encoder), \
+                patch.object(self.search_app.config, 'RERANK_TOP_N', 3):
+            results = self.search_app.search(['Vintage bike'], k=2, rerank=True)
+
+        self.logger.info("All candidates are scored in one predict call and the best two are returned")
+        cross_encoder.predict.assert_called_once()
+        self.assertEqual(len(cross_encoder.predict.call_args.args[0]), 3)
+        self.assertIn('KNN 3 @vector', str(search_pipeline.search.call_args.args[0].query_string()))
+        self.assertEqual([result.id for result in results], ['bikes:003', 'bikes:002'])
+        self.assertEqual(self.search_app.stats()['reranker']['reranked'], 1)
+
+    def test_slow_rerank_falls_back_to_the_bi_encoder_order(self):
+        search_pipeline = self.search_app.client.ft.return_value.pipeline.return_value
+        search_pipeline.execute.return_value = [make_response(
+            ('bikes:001', 0.1, 'Velorim', 'Jigger'), ('bikes:002', 0.2, 'Bicyk', 'Hillcraft')
+        )]
+        cross_encoder = MagicMock()
+        cross_encoder.predict.side_effect = lambda pairs, **kwargs: time.sleep(0.2) or np.array([0.1, 0.9])
+
+        with patch('src.models.cross_encoder_model.ModelRegistry.get', return_value=cross_encoder), \
+                patch.object(self.search_app.config, 'RERANK_BUDGET_MS', 20), \
+                patch.object(self.search_app.config, 'RERANK_WORKERS', 1):
+            results = self.search_app.search(['Vintage bike'], k=2, rerank=True)
+            again = self.search_app.search(['Vintage bike'], k=2, rerank=True)
+            get_rerank_executor().submit(lambda: None).result()  # let the first predict finish
+
+        self.assertEqual([result.id for result in results], ['bikes:001', 'bikes:002'])
+        self.assertEqual(self.search_app.stats()['reranker']['fallbacks'], 1)
+
+        self.logger.info("While the late predict still runs, the next request skips re-ranking instead of queueing")
+        self.assertEqual([result.id for result in again], ['bikes:001', 'bikes:002'])
+        self.assertEqual(self.search_app.stats()['reranker']['skipped'], 1)
+        cross_encoder.predict.assert_called_once()
+
+    def test_markdown_is_an_optional_presentation(self):
+        results = self.search_app._result_rows('Vintage bike', [SimpleNamespace(
+            vector_score='0.2', id='bikes:010', brand='nHill', model='Summit', description='x' * 600)])
+
+        table = SemanticSearch.render_table(results)
+
+        self.assertIn('| Vintage bike', table)
+        self.assertIn('x' * 497 + '...', table)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# Unit tests for the queue-based logging setup and the progress logger
+import logging
+import logging.handlers
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock, patch
+from src.utils.logger import ProgressLogger, configured_level, flush_logs, get_logger
+from src.utils.config import get_config
+
+
+class TestLogger(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the logging setup...")
+
+    def test_handlers_are_attached_once_and_shared(self):
+        first = get_logger("Logger test: first")
+        get_logger("Logger test: first")
+        second = get_logger("Logger test: second")
+
+        self.logger.info("Every logger only enqueues; one listener per log file does the writing")
+        self.assertEqual(len(first.handlers), 1)
+        self.assertIsInstance(first.handlers[0], logging.handlers.QueueHandler)
+        self.assertIs(first.handlers[0], second.handlers[0])
+
+    def _log_file(self) -> str:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        return os.path.join(directory.name, 'test.log')
+
+    def test_records_after_the_flush_are_written_directly(self):
+        log_file = self._log_file()
+        logger = get_logger("Logger test: flushed", log_file)
+        self.addCleanup(lambda: [handler.close() for handler in logger.handlers])
+        logger.info("queued")
+        flush_logs(log_file)
+        logger.info("after the flush")
+
+        self.logger.info("The listener is gone, the logger now holds the file handler itself")
+        self.assertIsInstance(logger.handlers[0], logging.FileHandler)
+        with open(log_file) as f:
+            lines = f.read().splitlines()
+        self.assertEqual([line.rsplit(' | ', 1)[1] for line in lines], ["queued", "after the flush"])
+
+        self.logger.info("Flushing again, or a log file nobody wrote to, is a no-op")
+        flush_logs(log_file)
+        flush_logs(self._log_file())
+
+    @unittest.skipUnless(hasattr(os, 'fork'), "fork is POSIX only")
+    def test_forked_child_gets_its_own_listener(self):
+        log_file = self._log_file()
+        logger = get_logger("Logger test: forked", log_file)
+        parent_handler = logger.handlers[0]
+
+        pid = os.fork()
+        if pid == 0:
+            # child: a fresh queue handler, drained by a listener thread of its own
+            ok = logger.handlers[0] is not parent_handler
+            logger.info("from the child")
+            flush_logs(log_file)
+            os._exit(0 if ok else 1)
+        _, status = os.waitpid(pid, 0)
+        flush_logs(log_file)
+
+        self.assertEqual(os.waitstatus_to_exitcode(status), 0)
+        with open(log_file) as f:
+            self.assertIn("from the child", f.read())
+
+    def test_levels_per_logger_and_per_module(self):
+        with patch.object(get_config(), 'LOG_LEVELS', 'src.pipelines=DEBUG, src.pipelines.backends=ERROR, KNN Result Cache=WARNING'), \
+                patch.object(get_config(), 'LOG_LEVEL', 'INFO'):
+            self.assertEqual(configured_level("Redis Vector Backend", 'src.pipelines.backends'), logging.ERROR)
+            self.assertEqual(configured_level("Blue/Green Search Index Manager", 'src.pipelines.index_manager'), logging.DEBUG)
+            self.assertEqual(configured_level("KNN Result Cache", 'src.pipelines.result_cache'), logging.WARNING)
+            self.assertEqual(configured_level("Semantic Search API", 'src.app.main'), logging.INFO)
+
+    def test_progress_is_reported_per_interval_not_per_update(self):
+        logger = MagicMock()
+        progress = ProgressLogger(logger, "Ingestion", unit='documents', interval=3600)
+
+        for _ in range(2000):
+            progress.update(500, written=7)
+        progress.done()
+
+        self.logger.info("A million documents, one record")
+        logger.info.assert_called_once()
+        self.assertIn("Ingestion finished: 1000000 documents, 7 written in", logger.info.call_args.args[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+# Unit tests for the Prometheus metrics registry and the /metrics endpoint
+import os
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi.testclient import TestClient
+
+os.environ.setdefault('PROJECT_NAME', 'Semantic Search API')
+os.environ.setdefault('VERSION', '0.1.0')
+os.environ.setdefault('INDEX_NAME', 'idx:bikes_vss')
+
+from src.app.main import app
+from src.app.routes import get_search_app
+from src.utils.metrics import CONTENT_TYPE, REQUESTS, STAGE_ERRORS, STAGE_SECONDS, Counter, Histogram, Registry, stage
+from src.utils.logger import get_logger
+
+
+class TestMetrics(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the Prometheus metrics...")
+
+    def test_histograms_render_cumulative_buckets(self):
+        registry = Registry()
+        latency = registry.register(Histogram('test_seconds', "Test latency", ['stage'], buckets=(0.1, 1.0)))
+        errors = registry.register(Counter('test_errors_total', "Test errors", ['stage']))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            latency.observe(value, stage='encode')
+        errors.inc(stage='say "hi"')
+
+        lines = registry.render().splitlines()
+
+        self.logger.info("Each bucket counts the observations at or below its bound")
+        self.assertIn('# TYPE test_seconds histogram', lines)
+        self.assertIn('test_seconds_bucket{stage="encode",le="0.1"} 1', lines)
+        self.assertIn('test_seconds_bucket{stage="encode",le="1.0"} 3', lines)
+        self.assertIn('test_seconds_bucket{stage="encode",le="+Inf"} 4', lines)
+        self.assertIn('test_seconds_sum{stage="encode"} 4.05', lines)
+        self.assertIn('test_seconds_count{stage="encode"} 4', lines)
+        self.assertIn(r'test_errors_total{stage="say \"hi\""} 1', lines)
+        with self.assertRaises(ValueError):
+            registry.register(Counter('test_errors_total', "Registered twice"))
+
+    def test_stage_times_successes_and_counts_errors(self):
+        timed, failed = STAGE_SECONDS.count(stage='test'), STAGE_ERRORS.value(stage='test')
+        with stage('test'):
+            pass
+        with self.assertRaises(RuntimeError), stage('test'):
+            raise RuntimeError("Redis is down")
+
+        self.assertEqual(STAGE_SECONDS.count(stage='test'), timed + 1)
+        self.assertEqual(STAGE_ERRORS.value(stage='test'), failed + 1)
+
+    def test_metrics_endpoint_exposes_requests_and_index_gauges(self):
+        search_app = MagicMock()
+        search_app.search_async = AsyncMock(return_value=[])
+        app.dependency_overrides[get_search_app] = lambda: search_app
+        self.addCleanup(app.dependency_overrides.clear)
+        client = TestClient(app)
+        served = REQUESTS.value(handler='search_bikes', status=200)
+
+        client.post("/vss/search/", params={'query': 'Vintage bike'})
+        with patch('src.app.metrics.RedisClient') as redis_client:
+            redis_client.return_value.connect.return_value.ft.return_value.info.return_value = {
+                'num_docs': '111', 'hash_indexing_failures': '2', 'percent_indexed': '1'}
+            response = client.get("/metrics")
+
+        self.logger.info("Requests are labelled with their route handler, FT.INFO is read at scrape time")
+        self.assertEqual(response.headers['content-type'], CONTENT_TYPE)
+        self.assertEqual(REQUESTS.value(handler='search_bikes', status=200), served + 1)
+        self.assertIn('vss_request_seconds_count{handler="search_bikes"}', response.text)
+        self.assertIn('vss_index_num_docs 111', response.text)
+        self.assertIn('vss_index_indexing_failures 2', response.text)
+        self.assertIn('vss_index_percent_indexed 1.0', response.text)
+        self.assertIn('vss_index_up 1', response.text)
+
+
+if __name__ == '__main__':
+    unittest.main()
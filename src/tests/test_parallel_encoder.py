@@ -0,0 +1,73 @@
+# Unit tests for the multi-process ingestion encoder
+import os
+import time
+import unittest
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from src.models import parallel_encoder
+from src.models.parallel_encoder import ParallelEncoder
+from src.models.similarity_model import ModelRegistry
+from src.utils.logger import get_logger
+
+
+def slow_first_chunks(sentences):
+    # earlier chunks finish last, so reassembly cannot rely on completion order
+    time.sleep(0.05 / (1 + int(sentences[0].split()[-1])))
+    return np.array([[float(sentence.split()[-1])] for sentence in sentences], dtype=np.float32)
+
+
+class WorkerProbe:
+    """Stands in for the sentence transformer in the worker processes and reports where it ran."""
+    def encode(self, sentences):
+        return np.array([[float(sentence.split()[-1]), float(os.environ['OMP_NUM_THREADS']), float(os.getpid())]
+                         for sentence in sentences], dtype=np.float32)
+
+
+def init_probe_worker(model_name, device, torch_threads):
+    # runs in the spawned worker: register the probe, then the real initializer finds it in the registry
+    ModelRegistry._models[ModelRegistry._key(model_name, device)] = WorkerProbe()
+    parallel_encoder._init_worker(model_name, device, torch_threads)
+
+
+class TestParallelEncoder(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the parallel encoder...")
+
+    @patch('src.models.parallel_encoder._worker_model')
+    def test_chunks_are_reassembled_in_input_order(self, worker_model):
+        worker_model.encode.side_effect = slow_first_chunks
+        sentences = [f"bike {i}" for i in range(10)]
+
+        with ParallelEncoder(workers=4, chunk_size=3, executor=ThreadPoolExecutor(4)) as encoder:
+            vectors = encoder.encode(sentences)
+
+        self.logger.info("Ten sentences in chunks of three: four encode calls, rows in input order")
+        self.assertEqual([len(call.args[0]) for call in worker_model.encode.call_args_list], [3, 3, 3, 1])
+        np.testing.assert_array_equal(vectors[:, 0], np.arange(10, dtype=np.float32))
+
+    @patch('src.models.parallel_encoder._worker_model')
+    def test_small_inputs_are_spread_over_every_worker(self, worker_model):
+        worker_model.encode.side_effect = lambda sentences: np.zeros((len(sentences), 2), dtype=np.float32)
+
+        with ParallelEncoder(workers=4, chunk_size=64, executor=ThreadPoolExecutor(4)) as encoder:
+            self.assertEqual(encoder.encode([f"bike {i}" for i in range(8)]).shape, (8, 2))
+
+        self.assertEqual(worker_model.encode.call_count, 4)
+
+    @patch('src.models.parallel_encoder._init_worker', init_probe_worker)
+    def test_spawned_workers_load_their_model_once_and_encode(self):
+        sentences = [f"bike {i}" for i in range(12)]
+
+        with ParallelEncoder(workers=2, chunk_size=3, torch_threads=1, model_name='probe', device='cpu') as encoder:
+            vectors = encoder.encode(sentences)
+
+        self.logger.info("Rows come back in input order from other processes, with the thread cap applied")
+        np.testing.assert_array_equal(vectors[:, 0], np.arange(12, dtype=np.float32))
+        self.assertTrue(np.all(vectors[:, 1] == 1))
+        self.assertNotIn(float(os.getpid()), set(vectors[:, 2]))
+
+
+if __name__ == '__main__':
+    unittest.main()
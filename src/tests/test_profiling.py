@@ -0,0 +1,89 @@
+# Unit tests for the opt-in request profiling and the slow-query log
+import os
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+os.environ.setdefault('PROJECT_NAME', 'Semantic Search API')
+os.environ.setdefault('VERSION', '0.1.0')
+
+from src.app.main import app as main_app
+from src.app.profiling import ProfilingMiddleware, router as profiling_router
+from src.app.routes import get_search_app, router
+from src.utils.metrics import stage
+from src.utils.profiling import SLOW_QUERIES, annotate
+from src.utils.config import get_config
+from src.utils.logger import get_logger
+
+
+class TestProfiling(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the request profiling...")
+
+    def setUp(self):
+        self.logger.info("Search app whose search runs two timed stages, behind the profiling middleware")
+        app = FastAPI()
+        app.include_router(router, prefix="/vss")
+        app.include_router(profiling_router)
+
+        async def search_async(queries, k, extra_params, filters=None):
+            annotate(queries=queries, k=k, filters=filters)
+            with stage('encode'):
+                time.sleep(0.05)
+            with stage('search'):
+                pass
+            return []
+
+        search_app = MagicMock()
+        search_app.search_async = search_async
+        app.dependency_overrides[get_search_app] = lambda: search_app
+        SLOW_QUERIES.clear()
+        self.addCleanup(SLOW_QUERIES.clear)
+        patcher = patch.object(get_config(), 'PROFILE_TOKEN', 's3cret')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = TestClient(ProfilingMiddleware(app))
+        self.admin = {'X-Profile': 's3cret'}
+
+    def test_requests_are_only_profiled_with_the_token(self):
+        with patch.object(get_config(), 'SLOW_QUERY_MS', 0):
+            plain = self.client.post("/vss/search/", params={'query': 'Vintage bike'})
+            forged = self.client.post("/vss/search/", params={'query': 'Vintage bike'}, headers={'X-Profile': '1'})
+
+        self.assertNotIn('server-timing', plain.headers)
+        self.assertNotIn('server-timing', forged.headers)
+        self.assertEqual(self.client.get("/admin/slow-queries", headers=self.admin).json()['entries'], [])
+
+        self.logger.info("The slow-query log is closed to clients without the token, and not mounted unless enabled")
+        self.assertEqual(self.client.get("/admin/slow-queries").status_code, 403)
+        self.assertEqual(self.client.delete("/admin/slow-queries", headers={'X-Profile': '1'}).status_code, 403)
+        self.assertEqual(TestClient(main_app).get("/admin/slow-queries", headers=self.admin).status_code, 404)
+
+        self.logger.info("A token outside latin-1 is compared as UTF-8 bytes instead of failing the request")
+        with patch.object(get_config(), 'PROFILE_TOKEN', 'sécret-ключ'):
+            self.assertEqual(self.client.get("/admin/slow-queries", headers=self.admin).status_code, 403)
+            response = self.client.get("/admin/slow-queries", headers={'X-Profile': 'sécret-ключ'.encode('utf-8')})
+            self.assertEqual(response.status_code, 200)
+
+    def test_slow_profiled_request_is_logged_with_its_stages(self):
+        with patch.object(get_config(), 'SLOW_QUERY_MS', 30), patch.object(get_config(), 'PROFILE_STACKS', True), \
+                patch.object(get_config(), 'PROFILE_STACK_INTERVAL_MS', 1):
+            response = self.client.post("/vss/search/", params={'query': 'Vintage bike', 'k': 5}, headers=self.admin)
+
+        self.logger.info("The stage breakdown comes back as Server-Timing and the slow request is logged")
+        self.assertRegex(response.headers['server-timing'], r'^encode;dur=\d+\.\d+, search;dur=\d+\.\d+, total;dur=')
+        [entry] = self.client.get("/admin/slow-queries", headers=self.admin).json()['entries']
+        self.assertEqual((entry['path'], entry['status'], entry['queries'], entry['k']), ('/vss/search/', 200, ['Vintage bike'], 5))
+        self.assertEqual([row['stage'] for row in entry['stages']], ['encode', 'search'])
+        self.assertGreaterEqual(entry['stages'][0]['ms'], 50)
+        self.assertGreater(entry['profile']['samples'], 0)
+
+        self.assertEqual(self.client.delete("/admin/slow-queries", headers=self.admin).status_code, 204)
+        self.assertEqual(self.client.get("/admin/slow-queries", headers=self.admin).json()['entries'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
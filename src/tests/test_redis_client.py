@@ -0,0 +1,55 @@
+# Unit tests for the pooled Redis client
+import asyncio
+import time
+import unittest
+from unittest.mock import MagicMock
+from redis.exceptions import LockNotOwnedError
+from src.utils.redis_client import LockKeeper, RedisClient
+from src.utils.config import get_config
+from src.utils.logger import get_logger
+
+
+class TestRedisClient(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the Redis client...")
+
+    def tearDown(self):
+        RedisClient.close()
+        asyncio.run(RedisClient.aclose())
+
+    def test_clients_share_one_bounded_pool(self):
+        self.logger.info("Every connect() call reuses the same connection pool")
+        first = RedisClient().connect()
+        second = RedisClient().connect()
+
+        self.assertIs(first.connection_pool, second.connection_pool)
+        self.assertEqual(first.connection_pool.max_connections, get_config().REDIS_MAX_CONNECTIONS)
+        self.assertEqual(first.connection_pool.connection_kwargs['retry']._retries, get_config().REDIS_RETRY_ATTEMPTS)
+
+    def test_async_clients_share_one_pool(self):
+        first = RedisClient().connect_async()
+        second = RedisClient().connect_async()
+
+        self.assertIs(first.connection_pool, second.connection_pool)
+        self.assertIsNot(first.connection_pool, RedisClient().pool())
+
+
+    def test_lock_keeper_renews_until_the_lock_is_lost(self):
+        lock = MagicMock()
+        lock.reacquire.side_effect = [None, LockNotOwnedError("Cannot reacquire a lock that's no longer owned")]
+        lock.release.side_effect = LockNotOwnedError("Cannot release a lock that's no longer owned")
+
+        with LockKeeper(lock, interval=0.01) as keeper:
+            for _ in range(100):
+                if keeper.lost:
+                    break
+                time.sleep(0.01)
+
+        self.logger.info("The keeper stops renewing once the lock is lost; releasing it is logged, not raised")
+        self.assertTrue(keeper.lost)
+        self.assertEqual(lock.reacquire.call_count, 2)
+        lock.release.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+# Unit tests for the shared sentence transformer model registry
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+from src.models.similarity_model import ModelRegistry, SimilarityModel
+from src.utils.logger import get_logger
+
+
+class TestModelRegistry(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the model registry...")
+
+    def setUp(self):
+        self.logger.info("Replace the sentence_transformers module with a mock")
+        self.sentence_transformers = MagicMock()
+        self.sentence_transformers.SentenceTransformer.return_value.get_sentence_embedding_dimension.return_value = 768
+        self.modules = patch.dict(sys.modules, {'sentence_transformers': self.sentence_transformers})
+        self.modules.start()
+        ModelRegistry.release()
+
+    def tearDown(self):
+        ModelRegistry.release()
+        self.modules.stop()
+
+    def test_model_is_loaded_once_per_name_and_device(self):
+        self.logger.info("Several components asking for the same model share one instance")
+        first = SimilarityModel('msmarco-distilbert-base-v4', 'cpu').load_model()
+        second = SimilarityModel('msmarco-distilbert-base-v4', 'cpu').load_model()
+
+        self.assertIs(first, second)
+        self.sentence_transformers.SentenceTransformer.assert_called_once_with('msmarco-distilbert-base-v4', device='cpu')
+        self.assertEqual(ModelRegistry.loaded(), [('msmarco-distilbert-base-v4', 'cpu')])
+
+    def test_release_drops_the_cached_model(self):
+        model = SimilarityModel('msmarco-distilbert-base-v4', 'cpu')
+        model.load_model()
+
+        self.assertEqual(model.release(), 1)
+        self.assertEqual(ModelRegistry.loaded(), [])
+
+    def test_vector_dimension_comes_from_model_metadata(self):
+        model = SimilarityModel('msmarco-distilbert-base-v4', 'cpu')
+
+        self.assertEqual(model.vector_dimension(), 768)
+        self.sentence_transformers.SentenceTransformer.return_value.encode.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1 +1,213 @@
 # Unit tests for Redis vector store interactions
+import fnmatch
+import tempfile
+import unittest
+import numpy as np
+from unittest.mock import MagicMock, patch
+from src.data.vector_store import RedisVectorOperations
+from src.models.core import SearchFilters
+from src.pipelines.backends import KnnQuery, NumpyBackend
+from src.utils.config import get_config
+from src.utils.logger import get_logger
+
+
+class FakeRedis:
+    """Just enough of a HASH-only Redis for the ingestion sync: SCAN, pipelined HMGET/HSET, UNLINK."""
+    def __init__(self):
+        self.hashes = {}
+        self.round_trips = 0
+
+    def scan_iter(self, match=None, count=None):
+        return [key for key in list(self.hashes) if fnmatch.fnmatch(key, match)]
+
+    def pipeline(self, transaction=True):
+        fake, commands = self, []
+        pipeline = MagicMock()
+        pipeline.hmget.side_effect = lambda key, *fields: commands.append(
+            lambda: [fake.hashes.get(key, {}).get(field) for field in fields])
+        pipeline.hset.side_effect = lambda key, mapping: commands.append(
+            lambda: fake.hashes.setdefault(key, {}).update(mapping))
+
+        def execute():
+            fake.round_trips += 1
+            return [command() for command in commands]
+
+        pipeline.execute.side_effect = execute
+        return pipeline
+
+    def unlink(self, *keys):
+        self.round_trips += 1
+        for key in keys:
+            self.hashes.pop(key, None)
+
+    def incr(self, key):
+        return 1
+
+
+class TestRedisVectorOperations(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the Redis vector store...")
+
+    def setUp(self):
+        self.redis = FakeRedis()
+        patchers = [
+            patch('src.data.vector_store.RedisClient'),
+            patch.object(get_config(), 'VECTOR_STORAGE', 'HASH'),
+            patch.object(get_config(), 'DOC_PREFIX', 'bikes'),
+            patch.object(get_config(), 'CLIENT_KEYS', 'bikes:*'),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patchers[0].target.RedisClient.return_value.connect.return_value = self.redis
+
+        self.embedder = MagicMock()
+        self.embedder.encode.side_effect = lambda texts: np.ones((len(texts), 4), dtype=np.float32)
+        self.bikes = [
+            {'brand': 'Velorim', 'model': 'Jigger', 'price': 270, 'description': 'Small and sturdy'},
+            {'brand': 'Bicyk', 'model': 'Hillcraft', 'price': 1200, 'description': 'Kids mountain bike'},
+        ]
+
+    def sync(self, bikes):
+        store = RedisVectorOperations(bikes)
+        store._embedder = self.embedder
+        return store.sync()
+
+    def test_only_new_or_changed_documents_are_written(self):
+        self.assertEqual(self.sync(self.bikes), {'documents': 2, 'written': 2, 'encoded': 2, 'from_store': 0, 'deleted': 0})
+
+        self.logger.info("An unchanged corpus costs one batched hash read and no encoding")
+        self.redis.round_trips = 0
+        self.assertEqual(self.sync(self.bikes), {'documents': 2, 'written': 0, 'encoded': 0, 'from_store': 0, 'deleted': 0})
+        self.assertEqual(self.redis.round_trips, 1)
+        self.assertEqual(self.embedder.encode.call_count, 1)
+
+        self.logger.info("A price change rewrites the document without re-encoding it")
+        repriced = [self.bikes[0] | {'price': 250}, self.bikes[1]]
+        self.assertEqual(self.sync(repriced), {'documents': 2, 'written': 1, 'encoded': 0, 'from_store': 0, 'deleted': 0})
+
+        self.logger.info("A new description is encoded, a dropped bike is deleted")
+        rewritten = [self.bikes[0] | {'price': 250, 'description': 'Light commuter'}]
+        self.assertEqual(self.sync(rewritten), {'documents': 1, 'written': 1, 'encoded': 1, 'from_store': 0, 'deleted': 1})
+        self.embedder.encode.assert_called_with(['Light commuter'])
+        self.assertEqual(len(self.redis.hashes), 1)
+
+    def test_repeated_brand_and_model_do_not_overwrite_each_other(self):
+        twins = [self.bikes[0], self.bikes[0] | {'price': 300}, self.bikes[0] | {'price': 320}]
+        duplicate_ids = [{'id': 7, **self.bikes[0]}, {'id': 7, **self.bikes[1]}]
+
+        with patch.object(get_config(), 'INGEST_BATCH_SIZE', 2):
+            self.assertEqual(self.sync(twins)['written'], 3)
+
+        self.logger.info("Id-less twins get their occurrence appended, in source order and across batches")
+        prices = sorted((key, fields['price']) for key, fields in self.redis.hashes.items())
+        self.assertEqual([key.rsplit('-', 1)[-1] if '-' in key else '' for key, _ in prices], ['', '2', '3'])
+        self.assertEqual([price for _, price in prices], [270, 300, 320])
+        self.assertEqual(self.sync(twins)['written'], 0)
+
+        self.logger.info("A repeated id keeps its first row")
+        with self.assertLogs("Handling Redis Vector Operations...", level='WARNING'):
+            self.assertEqual(self.sync(duplicate_ids)['documents'], 1)
+
+    def test_source_is_streamed_in_fixed_size_batches(self):
+        bikes = ({'id': i, 'brand': 'Velorim', 'model': f'Jigger {i}', 'description': f'Bike {i}'} for i in range(7))
+
+        with patch.object(get_config(), 'INGEST_BATCH_SIZE', 3):
+            summary = self.sync(bikes)
+
+        self.logger.info("Seven documents in batches of three: three encodes, vectors joined by key")
+        self.assertEqual(summary['written'], 7)
+        self.assertEqual([len(call.args[0]) for call in self.embedder.encode.call_args_list], [3, 3, 1])
+        self.assertIn('description_embeddings', self.redis.hashes['bikes:6'])
+
+    def test_rebuild_after_a_flush_reads_the_embedding_store(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+
+        with patch.object(get_config(), 'EMBEDDING_STORE_DIR', directory.name), \
+                patch.object(get_config(), 'PRETRAINED_TRANSFORMER_MODEL', 'test-model'):
+            self.sync(self.bikes)
+            self.redis.hashes.clear()
+            summary = self.sync(self.bikes)
+
+        self.logger.info("The flushed corpus is rewritten without touching the transformer")
+        self.assertEqual((summary['written'], summary['encoded'], summary['from_store']), (2, 0, 2))
+        self.assertEqual(self.embedder.encode.call_count, 1)
+
+
+class TestNumpyBackend(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for the NumPy vector backend...")
+
+    def setUp(self):
+        patcher = patch('src.data.vector_store.RedisClient')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.rng = np.random.default_rng(7)
+        self.vectors = self.rng.normal(size=(200, 16)).astype(np.float32)
+        self.bikes = [{'id': i, 'brand': ['Velorim', 'Noka Bikes', 'Nord'][i % 3], 'model': f'Model {i}',
+                       'price': 100 * (i % 20), 'type': ['Kids bikes', 'Road Bikes'][i % 2], 'description': f'bike {i}'}
+                      for i in range(200)]
+        embedder = MagicMock()
+        embedder.encode.side_effect = lambda texts: self.vectors[[int(text.split()[1]) for text in texts]]
+
+        self.backend = NumpyBackend()
+        with patch.object(get_config(), 'DOC_PREFIX', 'bikes'):
+            store = RedisVectorOperations(self.bikes, backend=self.backend)
+            store._embedder = embedder
+            store.sync()
+
+    def test_exact_top_k_matches_brute_force(self):
+        queries = self.rng.normal(size=(5, 16)).astype(np.float32)
+
+        hits = self.backend.search(KnnQuery(k=10, offset=0, limit=10), queries, {})
+
+        self.logger.info("A batch of queries is ranked exactly like a brute-force cosine sort")
+        normalized = self.vectors / np.linalg.norm(self.vectors, axis=1, keepdims=True)
+        for query, query_hits in zip(queries, hits):
+            expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:10]
+            self.assertEqual([doc.id for doc in query_hits.docs], [f'bikes:{i}' for i in expected])
+            self.assertEqual(query_hits.total, 10)
+
+        self.logger.info("Paging returns a slice of the same ranking")
+        page = self.backend.search(KnnQuery(k=10, offset=4, limit=3), queries[:1], {})[0]
+        self.assertEqual([doc.id for doc in page.docs], [doc.id for doc in hits[0].docs[4:7]])
+
+    def test_filters_and_snapshots(self):
+        filters = SearchFilters(min_price=500, max_price=900, types=['road bikes'], brand='noka bikes')
+        query = KnnQuery(k=50, offset=0, limit=50, filters=filters)
+
+        hits = self.backend.search(query, self.vectors[:1], {})[0]
+
+        matching = [bike for bike in self.bikes if 500 <= bike['price'] <= 900 and bike['type'] == 'Road Bikes'
+                    and bike['brand'] == 'Noka Bikes']
+        self.assertEqual(sorted(doc.id for doc in hits.docs), sorted(f"bikes:{bike['id']}" for bike in matching))
+
+        self.logger.info("A memory-mapped snapshot answers the same and accepts deletes")
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.backend.save(directory.name)
+        loaded = NumpyBackend.load(directory.name)
+        self.assertEqual(loaded.search(query, self.vectors[:1], {})[0], hits)
+        loaded.delete([hits.docs[0].id])
+        self.assertNotIn(hits.docs[0].id, [doc.id for doc in loaded.search(query, self.vectors[:1], {})[0].docs])
+        self.assertEqual(len(loaded), 199)
+
+    def test_searches_read_a_snapshot_that_writers_leave_alone(self):
+        matrix, prices, keys, documents = self.backend._snapshot()
+        before = matrix.copy()
+
+        self.backend.delete(['bikes:0'])
+        self.backend.write([('bikes:5', dict(self.bikes[5], price=1), (None, None), None, False)])
+
+        self.logger.info("The search outside the lock still sees the rows it started with")
+        np.testing.assert_array_equal(matrix, before)
+        self.assertEqual((keys[0], len(keys), documents[5]['price'], prices[5]), ('bikes:0', 200, 500, 500))
+        self.assertNotIn('bikes:0', [doc.id for doc in self.backend.search(KnnQuery(k=200, offset=0, limit=200),
+                                                                         self.vectors[:1], {})[0].docs])
+
+
+if __name__ == '__main__':
+    unittest.main()
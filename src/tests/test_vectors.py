@@ -0,0 +1,45 @@
+# Unit tests for binary vector packing and the matching index schema
+import unittest
+import numpy as np
+from unittest.mock import patch
+from redis.commands.search.field import VectorField
+from src.pipelines.training_pipeline import RedisSearchIndex
+from src.utils.vectors import to_bytes, from_bytes
+from src.utils.config import get_config
+from src.utils.logger import get_logger
+
+
+class TestVectors(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.logger = get_logger("Unit testing for binary vector storage...")
+
+    def test_round_trip_per_vector_type(self):
+        vector = np.random.default_rng(0).standard_normal(384).astype(np.float32)
+
+        for vector_type, size, tolerance in [('FLOAT32', 4, 0), ('FLOAT16', 2, 1e-2), ('BFLOAT16', 2, 2e-2)]:
+            self.logger.info(f"{vector_type} packs {size} bytes per dimension")
+            blob = to_bytes(vector, vector_type)
+            self.assertEqual(len(blob), 384 * size)
+            np.testing.assert_allclose(from_bytes(blob, vector_type), vector, rtol=tolerance, atol=tolerance)
+
+        with self.assertRaises(ValueError):
+            to_bytes(vector, 'INT8')
+
+    @patch('src.pipelines.training_pipeline.RedisClient')
+    @patch('src.pipelines.training_pipeline.SimilarityModel')
+    def test_hash_schema_matches_the_storage(self, similarity_model, _):
+        similarity_model.return_value.vector_dimension.return_value = 384
+
+        with patch.object(get_config(), 'VECTOR_STORAGE', 'HASH'), patch.object(get_config(), 'VECTOR_TYPE', 'FLOAT16'):
+            index = RedisSearchIndex()
+            schema = index.schema()
+
+        vector = next(field for field in schema if isinstance(field, VectorField))
+        self.assertEqual([field.name for field in schema][-1], 'description_embeddings')
+        self.assertIn('FLOAT16', vector.args)
+        self.assertIn(384, vector.args)
+
+
+if __name__ == '__main__':
+    unittest.main()
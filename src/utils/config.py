@@ -12,6 +12,8 @@ class Config:
     INDEX_NAME = os.getenv('INDEX_NAME')
     DOC_PREFIX = os.getenv('DOC_PREFIX')
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_LEVELS = os.getenv('LOG_LEVELS', '')  # per-module or per-logger overrides, e.g. "src.pipelines=DEBUG"
+    PROGRESS_LOG_INTERVAL = float(os.getenv('PROGRESS_LOG_INTERVAL', 10))  # seconds between progress records of long loops
 
     @classmethod
     def init_app(cls, app):
@@ -30,9 +32,83 @@ class DevelopmentConfig(Config):
     REDIS_HOST = os.getenv('REDIS_HOST')
     REDIS_PORT = int(os.getenv('REDIS_PORT', 17971))
     REDIS_PASSWORD = os.getenv('REDIS_PASSWORD')
+    REDIS_SSL = os.getenv('REDIS_SSL', 'false').lower() == 'true'
+
+    # shared Redis connection pool
+    REDIS_MAX_CONNECTIONS = int(os.getenv('REDIS_MAX_CONNECTIONS', 32))
+    REDIS_POOL_TIMEOUT = float(os.getenv('REDIS_POOL_TIMEOUT', 5))  # seconds to wait for a free connection
+    REDIS_SOCKET_TIMEOUT = float(os.getenv('REDIS_SOCKET_TIMEOUT', 5))
+    REDIS_SOCKET_CONNECT_TIMEOUT = float(os.getenv('REDIS_SOCKET_CONNECT_TIMEOUT', 5))
+    REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv('REDIS_HEALTH_CHECK_INTERVAL', 30))
+    REDIS_RETRY_ATTEMPTS = int(os.getenv('REDIS_RETRY_ATTEMPTS', 3))
+    REDIS_RETRY_BACKOFF_BASE = float(os.getenv('REDIS_RETRY_BACKOFF_BASE', 0.05))
+    REDIS_RETRY_BACKOFF_CAP = float(os.getenv('REDIS_RETRY_BACKOFF_CAP', 1))
 
     # pre-trained sentence transformer model
     PRETRAINED_TRANSFORMER_MODEL = os.getenv('PRETRAINED_TRANSFORMER_MODEL')
+    MODEL_DEVICE = os.getenv('MODEL_DEVICE')  # e.g. 'cpu', 'cuda'; None lets sentence-transformers pick
+    INFERENCE_WORKERS = int(os.getenv('INFERENCE_WORKERS', 0))  # 0 sizes the executor to the CPU quota
+
+    # micro-batching of concurrent query embeddings
+    BATCH_ENABLED = os.getenv('BATCH_ENABLED', 'true').lower() == 'true'
+    BATCH_MAX_SIZE = int(os.getenv('BATCH_MAX_SIZE', 32))
+    BATCH_MAX_WAIT_MS = float(os.getenv('BATCH_MAX_WAIT_MS', 5))
+
+    # query embedding cache (in-process LRU, optionally backed by a shared Redis tier)
+    EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'true').lower() == 'true'
+    EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', 10000))
+    EMBEDDING_CACHE_TTL = float(os.getenv('EMBEDDING_CACHE_TTL', 3600))  # seconds
+    EMBEDDING_CACHE_REDIS = os.getenv('EMBEDDING_CACHE_REDIS', 'false').lower() == 'true'
+    EMBEDDING_CACHE_REDIS_TTL = int(os.getenv('EMBEDDING_CACHE_REDIS_TTL', 86400))  # seconds
+    EMBEDDING_CACHE_PREFIX = os.getenv('EMBEDDING_CACHE_PREFIX', 'embedding-cache')
+
+    # documents read, encoded and written per pipelined batch during ingestion
+    INGEST_BATCH_SIZE = int(os.getenv('INGEST_BATCH_SIZE', 500))
+    INGEST_MAX_PENDING_BATCHES = int(os.getenv('INGEST_MAX_PENDING_BATCHES', 2))  # writer queue bound (backpressure)
+
+    # local on-disk embedding store reused by ingestion across restarts; unset disables it
+    EMBEDDING_STORE_DIR = os.getenv('EMBEDDING_STORE_DIR')
+
+    # multi-process encoding for ingestion; 0 workers encodes in-process
+    ENCODE_WORKERS = int(os.getenv('ENCODE_WORKERS', 0))
+    ENCODE_CHUNK_SIZE = int(os.getenv('ENCODE_CHUNK_SIZE', 64))
+    ENCODE_TORCH_THREADS = int(os.getenv('ENCODE_TORCH_THREADS', 1))  # intra-op threads per worker process
+
+    # search backend: REDIS (Redis Stack search index) or NUMPY (in-process exact search over a saved snapshot)
+    VECTOR_BACKEND = os.getenv('VECTOR_BACKEND', 'REDIS').upper()
+    NUMPY_INDEX_DIR = os.getenv('NUMPY_INDEX_DIR')  # snapshot written by `vector_store --numpy-dir`, memory-mapped
+
+    # document layout: JSON documents with float lists, or HASH documents with packed binary vectors
+    VECTOR_STORAGE = os.getenv('VECTOR_STORAGE', 'JSON').upper()
+    VECTOR_TYPE = os.getenv('VECTOR_TYPE', 'FLOAT32').upper()  # FLOAT32, FLOAT16 or BFLOAT16
+
+    # vector index algorithm: FLAT (exact, brute force) or HNSW (approximate graph)
+    VECTOR_ALGORITHM = os.getenv('VECTOR_ALGORITHM', 'FLAT').upper()
+    VECTOR_INITIAL_CAP = int(os.getenv('VECTOR_INITIAL_CAP', 0))  # 0 keeps the Redis default
+    HNSW_M = int(os.getenv('HNSW_M', 16))
+    HNSW_EF_CONSTRUCTION = int(os.getenv('HNSW_EF_CONSTRUCTION', 200))
+    HNSW_EF_RUNTIME = int(os.getenv('HNSW_EF_RUNTIME', 10))
+    HNSW_EPSILON = float(os.getenv('HNSW_EPSILON', 0.01))
+
+    # KNN size and pagination bounds
+    KNN_DEFAULT_K = int(os.getenv('KNN_DEFAULT_K', 3))
+    MAX_K = int(os.getenv('MAX_K', 100))
+    MAX_PAGE_SIZE = int(os.getenv('MAX_PAGE_SIZE', 50))
+
+    # optional cross-encoder re-ranking of the top-N KNN candidates
+    RERANK_ENABLED = os.getenv('RERANK_ENABLED', 'false').lower() == 'true'
+    RERANK_MODEL = os.getenv('RERANK_MODEL', 'cross-encoder/stsb-distilroberta-base')
+    RERANK_TOP_N = int(os.getenv('RERANK_TOP_N', 50))  # KNN candidates scored per query, capped at MAX_K
+    RERANK_BATCH_SIZE = int(os.getenv('RERANK_BATCH_SIZE', 32))
+    RERANK_BUDGET_MS = float(os.getenv('RERANK_BUDGET_MS', 200))  # beyond this the bi-encoder order is returned
+    RERANK_WORKERS = int(os.getenv('RERANK_WORKERS', 1))  # re-ranks running at once; more requests skip re-ranking
+
+    # largest number of queries accepted by /vss/batch-search/
+    MAX_BATCH_QUERIES = int(os.getenv('MAX_BATCH_QUERIES', 100))
+
+    # final KNN result cache, tagged with the index generation
+    RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+    RESULT_CACHE_TTL = int(os.getenv('RESULT_CACHE_TTL', 600))  # seconds
 
     PROJECT_NAME = os.getenv("PROJECT_NAME")
     VERSION = os.getenv("VERSION")
@@ -43,6 +119,25 @@ class DevelopmentConfig(Config):
     FASTAPI_WORKERS = int(os.getenv('FASTAPI_WORKERS', 2))
     FASTAPI_APP = os.getenv("FASTAPI_APP")
 
+    # startup bootstrap (ingestion + index setup, guarded by a Redis lock across replicas)
+    BOOTSTRAP_ON_STARTUP = os.getenv('BOOTSTRAP_ON_STARTUP', 'true').lower() == 'true'
+    BOOTSTRAP_LOCK_TIMEOUT = int(os.getenv('BOOTSTRAP_LOCK_TIMEOUT', 900))  # seconds
+    BOOTSTRAP_POLL_INTERVAL = float(os.getenv('BOOTSTRAP_POLL_INTERVAL', 2))  # seconds
+
+    # opt-in request profiling: requests carrying PROFILE_HEADER: PROFILE_TOKEN, or a PROFILE_SAMPLE_RATE share of them,
+    # get a stage breakdown (Server-Timing header) and land in the slow-query log when slower than SLOW_QUERY_MS
+    PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'false').lower() == 'true'
+    PROFILE_HEADER = os.getenv('PROFILE_HEADER', 'X-Profile')
+    PROFILE_TOKEN = os.getenv('PROFILE_TOKEN')  # PROFILE_HEADER value that profiles a request and opens /admin/slow-queries
+    PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', 0))
+    PROFILE_STACKS = os.getenv('PROFILE_STACKS', 'false').lower() == 'true'  # also sample the stacks of profiled requests
+    PROFILE_STACK_INTERVAL_MS = float(os.getenv('PROFILE_STACK_INTERVAL_MS', 5))
+    SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 500))
+    SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', 100))
+
+    # blue/green index rebuilds (lock timeout and the longest wait for a new generation to be indexed)
+    INDEX_REBUILD_TIMEOUT = int(os.getenv('INDEX_REBUILD_TIMEOUT', 3600))  # seconds
+
 
 class TestingConfig(Config):
     """Testing-specific configuration."""
@@ -0,0 +1,73 @@
+# Bounded executor for model inference, kept off the event loop and off the request threadpool
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from src.utils.logger import get_logger
+from src.utils.config import get_config
+
+logger = get_logger("Model Inference Executor")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_rerank_executor: Optional[ThreadPoolExecutor] = None
+_lock = threading.Lock()
+
+
+def cpu_quota() -> int:
+    """Number of CPUs this process may use, honouring the cgroup (container) quota when there is one."""
+    try:
+        # cgroup v2: "<quota> <period>" or "max <period>"
+        with open('/sys/fs/cgroup/cpu.max') as f:
+            quota, period = f.read().split()
+        if quota != 'max':
+            return max(1, int(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    try:
+        # cgroup v1
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_quota_us') as f:
+            quota = int(f.read())
+        with open('/sys/fs/cgroup/cpu/cpu.cfs_period_us') as f:
+            period = int(f.read())
+        if quota > 0:
+            return max(1, quota // period)
+    except (OSError, ValueError):
+        pass
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def get_inference_executor() -> ThreadPoolExecutor:
+    """Process-wide executor for `encode()` calls, sized to the CPU quota unless INFERENCE_WORKERS is set."""
+    global _executor
+    with _lock:
+        if _executor is None:
+            workers = get_config().INFERENCE_WORKERS or cpu_quota()
+            logger.info(f"Creating the inference executor with {workers} workers")
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vss-inference")
+    return _executor
+
+
+def get_rerank_executor() -> ThreadPoolExecutor:
+    """
+    Executor of the cross-encoder re-ranking, RERANK_WORKERS threads apart from the inference executor:
+    a re-rank past its budget keeps running (its future cannot stop it) and must not hold up `encode()` calls.
+    """
+    global _rerank_executor
+    with _lock:
+        if _rerank_executor is None:
+            workers = get_config().RERANK_WORKERS
+            logger.info(f"Creating the re-rank executor with {workers} workers")
+            _rerank_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="vss-rerank")
+    return _rerank_executor
+
+
+def shutdown_inference_executor() -> None:
+    global _executor, _rerank_executor
+    with _lock:
+        executors = (_executor, _rerank_executor)
+        _executor = _rerank_executor = None
+    for executor in executors:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
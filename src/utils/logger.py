@@ -1,39 +1,183 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import sys
+import threading
+import time
 from datetime import datetime
+from typing import Dict, List, Optional, Set
+from src.utils.config import get_config
+
+DEFAULT_LOG_FILE = "similarity_search.log"
+
+# logging format
+FORMATTER = logging.Formatter(
+    '%(asctime)s | %(name)s | %(levelname)s | %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+_lock = threading.Lock()
+# per log file: the handlers its loggers currently hold, the listener draining their queue (if any)
+# and the names of the loggers writing to it
+_handlers: Dict[str, List[logging.Handler]] = {}
+_listeners: Dict[str, logging.handlers.QueueListener] = {}
+_loggers: Dict[str, Set[str]] = {}
+
+
+def _queued(log_file: str, targets: List[logging.Handler]) -> List[logging.Handler]:
+    """A queue handler whose records a new background listener thread writes to `targets`."""
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *targets)
+    listener.start()
+    _listeners[log_file] = listener
+    return [logging.handlers.QueueHandler(log_queue)]
+
+
+def _swap(log_file: str, handlers: List[logging.Handler]) -> None:
+    """Makes `handlers` the handlers of `log_file` on every logger writing to it."""
+    previous = _handlers.get(log_file, [])
+    for name in _loggers.get(log_file, ()):
+        logger = logging.getLogger(name)
+        for handler in previous:
+            logger.removeHandler(handler)
+        for handler in handlers:
+            logger.addHandler(handler)
+    _handlers[log_file] = handlers
+
+
+def _file_handlers(log_file: str) -> List[logging.Handler]:
+    """
+    The handlers of `log_file`, created once however many loggers use them. Loggers only get a queue
+    handler; a background listener thread does the file and console writes, so callers never block on I/O.
+    """
+    handlers = _handlers.get(log_file)
+    if handlers is None:
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(FORMATTER)
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(FORMATTER)
+        handlers = _handlers[log_file] = _queued(log_file, [file_handler, stream_handler])
+    return handlers
+
+
+def flush_logs(log_file: Optional[str] = None) -> None:
+    """
+    Writes out everything queued so far and stops the listener threads, of `log_file` or of every log file
+    (at interpreter exit). Loggers then write to the file and console directly, so late records are not lost.
+    """
+    with _lock:
+        for log_file in list(_listeners) if log_file is None else [log_file]:
+            # a log file never used, or flushed already, has no listener left to stop
+            listener = _listeners.pop(log_file, None)
+            if listener is None:
+                continue
+            listener.stop()
+            _swap(log_file, list(listener.handlers))
+
+
+def _restart_listeners() -> None:
+    # a forked child inherits the queues but not the listener threads: give it queues and listeners of its own
+    global _lock
+    _lock = threading.Lock()
+    for log_file, listener in list(_listeners.items()):
+        _swap(log_file, _queued(log_file, list(listener.handlers)))
+
+
+atexit.register(flush_logs)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_restart_listeners)
+
+
+def _parse_levels(spec: str) -> Dict[str, str]:
+    levels = {}
+    for entry in filter(None, (part.strip() for part in (spec or '').split(','))):
+        target, _, level = entry.rpartition('=')
+        levels[target.strip()] = level.strip().upper()
+    return levels
+
+
+def configured_level(name: str, module: str = '') -> int:
+    """
+    Level for a logger, from LOG_LEVELS (e.g. `src.pipelines=DEBUG,Redis Database Client=WARNING`):
+    an entry for the logger name wins, then the longest entry matching the calling module or one of
+    its parent packages, then LOG_LEVEL.
+    """
+    config = get_config()
+    levels = _parse_levels(config.LOG_LEVELS)
+    level = levels.get(name)
+    if level is None:
+        parts = module.split('.')
+        for end in range(len(parts), 0, -1):
+            level = levels.get('.'.join(parts[:end]))
+            if level is not None:
+                break
+    value = logging.getLevelName(level or config.LOG_LEVEL.upper())
+    return value if isinstance(value, int) else logging.INFO
 
 
 # Create a logger
-def get_logger(name: str, log_file: str = "similarity_search.log", level: int = logging.INFO) -> logging.Logger:
+def get_logger(name: str, log_file: str = DEFAULT_LOG_FILE, level: Optional[int] = None) -> logging.Logger:
     """Initializes and returns a
     logger for reproducibility and traceability.
+    Safe to call repeatedly: the logger gets the shared handler of `log_file` only once.
+    Without an explicit `level`, LOG_LEVELS and LOG_LEVEL decide (see `configured_level`).
     """
 
     logger = logging.getLogger(name)
+    if level is None:
+        level = configured_level(name, sys._getframe(1).f_globals.get('__name__', ''))
     logger.setLevel(level)
 
     # Prevent logger from propagating to the root logger
     logger.propagate = False
 
-    # logging format
-    formatter = logging.Formatter(
-        '%(asctime)s | %(name)s | %(levelname)s | %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+    with _lock:
+        _loggers.setdefault(log_file, set()).add(name)
+        for handler in _file_handlers(log_file):
+            if handler not in logger.handlers:
+                logger.addHandler(handler)
 
-    # file handler to log to a file
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(formatter)
+    return logger
 
-    # stream handler to log to the console
-    stream_handler = logging.StreamHandler()
-    stream_handler.setFormatter(formatter)
 
-    # Add the handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(stream_handler)
+class ProgressLogger:
+    """
+    Progress of a long loop (e.g. ingesting millions of documents) as one INFO record every `interval` seconds
+    plus a final one, instead of a record per document or batch. Between reports, `update()` only adds to a
+    counter and reads the clock.
+    """
+    def __init__(self, logger: logging.Logger, label: str, unit: str = 'items', total: Optional[int] = None,
+                 interval: Optional[float] = None):
+        self.logger = logger
+        self.label = label
+        self.unit = unit
+        self.total = total
+        self.interval = get_config().PROGRESS_LOG_INTERVAL if interval is None else interval
+        self.count = 0
+        self.fields: Dict[str, object] = {}
+        self.started = self._reported = time.perf_counter()
 
-    return logger
+    def update(self, count: int = 1, **fields) -> None:
+        """Adds `count` processed items; `fields` are running totals shown next to the count."""
+        self.count += count
+        self.fields.update(fields)
+        now = time.perf_counter()
+        if now - self._reported >= self.interval:
+            self._reported = now
+            self._report(now)
+
+    def done(self) -> None:
+        self._report(time.perf_counter(), finished=True)
+
+    def _report(self, now: float, finished: bool = False) -> None:
+        elapsed = now - self.started
+        count = f"{self.count}/{self.total}" if self.total else str(self.count)
+        fields = ''.join(f", {value} {name.replace('_', ' ')}" for name, value in self.fields.items())
+        rate = self.count / elapsed if elapsed > 0 else 0.0
+        self.logger.info(f"{self.label}{' finished' if finished else ''}: {count} {self.unit}{fields} "
+                         f"in {elapsed:.1f}s, {rate:.0f} {self.unit}/s")
 
 
 # Function to generate a unique log file name based on date and time
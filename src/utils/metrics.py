@@ -0,0 +1,194 @@
+# Prometheus metrics: a small in-process registry rendered in the text exposition format (version 0.0.4)
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Sequence, Tuple
+from src.utils.profiling import PROFILE
+from src.utils.logger import get_logger
+
+logger = get_logger("Prometheus Metrics")
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# seconds; spans a cached lookup (sub-millisecond) up to a cold model forward pass
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Metric:
+    """
+    One metric family. Series are keyed by their label values, given as keyword arguments
+    matching `labelnames`; updates take a per-family lock and cost a dict lookup.
+    """
+    kind = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: Tuple[str, ...], extra: str = '') -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, key)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = dict(self._series)
+        return [f"{self.name}{self._labels(key)} {_format_value(value)}" for key, value in sorted(series.items())]
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._series.get(self._key(labels), 0)
+
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._series[self._key(labels)] = value
+
+    def value(self, **labels) -> float:
+        return self._series.get(self._key(labels), 0)
+
+
+class Histogram(Metric):
+    """Cumulative `le` buckets plus `_sum` and `_count`, as Prometheus expects."""
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # per-bucket counts (the last one is +Inf), sum
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][slot] += 1
+            series[1] += value
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series is not None else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            series = {key: (list(counts), total) for key, (counts, total) in self._series.items()}
+        lines = []
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = 'le="' + _format_value(bound) + '"'
+                lines.append(f"{self.name}_bucket{self._labels(key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{self._labels(key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{self._labels(key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Metric families of the process, plus collectors that refresh gauges right before each scrape."""
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        for collector in self._collectors:
+            try:
+                collector()
+            except Exception as e:
+                logger.error(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+        lines = []
+        for metric in self._metrics.values():
+            lines += metric.render()
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    'vss_stage_seconds', "Time spent in each search stage (cache lookups, encode, search, format, rerank)", ['stage']))
+STAGE_ERRORS = REGISTRY.register(Counter(
+    'vss_stage_errors_total', "Search stages that raised an error", ['stage']))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'vss_request_seconds', "End-to-end HTTP request time by route handler", ['handler']))
+REQUESTS = REGISTRY.register(Counter(
+    'vss_requests_total', "HTTP requests by route handler and status code", ['handler', 'status']))
+SEARCH_BATCH_SIZE = REGISTRY.register(Histogram(
+    'vss_search_batch_size', "Distinct uncached queries sent to the vector backend in one call", buckets=SIZE_BUCKETS))
+ENCODE_BATCH_SIZE = REGISTRY.register(Histogram(
+    'vss_encode_batch_size', "Queries embedded by one micro-batched encode call", buckets=SIZE_BUCKETS))
+CACHE_LOOKUPS = REGISTRY.register(Counter(
+    'vss_cache_lookups_total', "Embedding and result cache lookups by outcome", ['cache', 'result']))
+INDEX_UP = REGISTRY.register(Gauge(
+    'vss_index_up', "1 when FT.INFO on the search index succeeded at the last scrape"))
+INDEX_DOCS = REGISTRY.register(Gauge(
+    'vss_index_num_docs', "Documents in the search index (FT.INFO num_docs)"))
+INDEX_FAILURES = REGISTRY.register(Gauge(
+    'vss_index_indexing_failures', "Documents the search index failed to index (FT.INFO hash_indexing_failures)"))
+INDEX_PERCENT = REGISTRY.register(Gauge(
+    'vss_index_percent_indexed', "Share of the documents indexed so far, 0 to 1 (FT.INFO percent_indexed)"))
+
+
+@contextmanager
+def stage(name: str):
+    """
+    Times the enclosed block into `vss_stage_seconds`; an exception is counted in `vss_stage_errors_total` instead.
+    The timing is also added to the request profile when the request is being profiled.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.inc(stage=name)
+        profile = PROFILE.get()
+        if profile is not None:
+            profile.record(name, time.perf_counter() - started, failed=True)
+        raise
+    elapsed = time.perf_counter() - started
+    STAGE_SECONDS.observe(elapsed, stage=name)
+    profile = PROFILE.get()
+    if profile is not None:
+        profile.record(name, elapsed)
@@ -0,0 +1,124 @@
+# Opt-in per-request profiles: stage timings, a sampled stack profile and the bounded slow-query log
+import collections
+import contextvars
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+from src.utils.config import get_config
+
+# the profile of the request being served, None unless it was selected for profiling
+PROFILE: contextvars.ContextVar[Optional['RequestProfile']] = contextvars.ContextVar('vss_profile', default=None)
+
+
+class StackSampler:
+    """
+    Samples the stacks of the given threads (and of the inference executor, where encoding runs) every
+    `interval_ms` while a request is served, counting identical stacks in the folded format of flame graphs.
+    The event loop is shared, so stacks of concurrent requests may appear in the same profile.
+    """
+    def __init__(self, thread_ids: Iterable[int], interval_ms: float, max_depth: int = 40):
+        self.thread_ids = set(thread_ids)
+        self.interval = interval_ms / 1000
+        self.max_depth = max_depth
+        self.samples = 0
+        self.stacks: collections.Counter = collections.Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="vss-profile-sampler", daemon=True)
+
+    def start(self) -> 'StackSampler':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _targets(self) -> set:
+        inference = {thread.ident for thread in threading.enumerate() if thread.name.startswith('vss-inference')}
+        return self.thread_ids | inference
+
+    def _fold(self, frame) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}")
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            targets = self._targets()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id in targets:
+                    self.stacks[self._fold(frame)] += 1
+            self.samples += 1
+
+    def top(self, n: int = 25) -> List[dict]:
+        return [{'stack': stack, 'samples': count} for stack, count in self.stacks.most_common(n)]
+
+
+class RequestProfile:
+    """Stage timings and search details of one profiled request, filled in by `stage()` and `annotate()`."""
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.stages: List[tuple] = []
+        self.details: Dict = {}
+        self.sampler: Optional[StackSampler] = None
+
+    def record(self, name: str, seconds: float, failed: bool = False) -> None:
+        self.stages.append((name, seconds, failed))
+
+    def server_timing(self, total: float) -> str:
+        """`Server-Timing` header value, one entry per stage (repeated stages are summed) plus the total."""
+        durations = collections.defaultdict(float)
+        for name, seconds, _ in self.stages:
+            durations[name] += seconds
+        entries = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in durations.items()]
+        return ', '.join(entries + [f"total;dur={total * 1000:.2f}"])
+
+    def to_dict(self, status: int, total: float) -> dict:
+        return {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'method': self.method,
+            'path': self.path,
+            'status': status,
+            'duration_ms': round(total * 1000, 2),
+            'stages': [{'stage': name, 'ms': round(seconds * 1000, 3), 'failed': failed}
+                       for name, seconds, failed in self.stages],
+            **self.details,
+            'profile': {'samples': self.sampler.samples, 'stacks': self.sampler.top()} if self.sampler else None,
+        }
+
+
+def annotate(**details) -> None:
+    """Attaches search details (queries, k, filters) to the current request profile, if there is one."""
+    profile = PROFILE.get()
+    if profile is not None:
+        profile.details.update(details)
+
+
+class SlowQueryLog:
+    """The most recent SLOW_QUERY_LOG_SIZE profiled requests slower than SLOW_QUERY_MS, newest first."""
+    def __init__(self, max_entries: Optional[int] = None):
+        self.config = get_config()
+        self._entries = collections.deque(maxlen=max_entries or self.config.SLOW_QUERY_LOG_SIZE)
+        self._lock = threading.Lock()
+
+    def add(self, entry: dict) -> None:
+        with self._lock:
+            self._entries.appendleft(entry)
+
+    def entries(self, limit: Optional[int] = None) -> List[dict]:
+        with self._lock:
+            return list(self._entries)[:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+SLOW_QUERIES = SlowQueryLog()
@@ -1,21 +1,139 @@
+import threading
 import redis
+import redis.asyncio
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, LockError, TimeoutError
+from redis.retry import Retry
+from redis.asyncio.retry import Retry as AsyncRetry
 from src.utils.logger import get_logger
 from src.utils.config import get_config
 
 class RedisClient:
+    """
+    Hands out Redis clients backed by process-wide connection pools (one sync, one asyncio),
+    so every component shares a bounded set of connections instead of opening its own.
+    """
+    _pool = None
+    _async_pool = None
+    _lock = threading.Lock()
+
     def __init__(self):
         self.config = get_config()
         self.logger = get_logger("Redis Database Client")
         self.client = None
 
+    def _pool_kwargs(self) -> dict:
+        return dict(
+            host=self.config.REDIS_HOST,
+            port=self.config.REDIS_PORT,
+            password=self.config.REDIS_PASSWORD,
+            max_connections=self.config.REDIS_MAX_CONNECTIONS,
+            timeout=self.config.REDIS_POOL_TIMEOUT,
+            socket_timeout=self.config.REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=self.config.REDIS_SOCKET_CONNECT_TIMEOUT,
+            health_check_interval=self.config.REDIS_HEALTH_CHECK_INTERVAL,
+            retry_on_error=[ConnectionError, TimeoutError],
+        )
+
+    def _backoff(self) -> ExponentialBackoff:
+        return ExponentialBackoff(cap=self.config.REDIS_RETRY_BACKOFF_CAP, base=self.config.REDIS_RETRY_BACKOFF_BASE)
+
+    def pool(self) -> redis.BlockingConnectionPool:
+        with RedisClient._lock:
+            if RedisClient._pool is None:
+                self.logger.info(f"Creating the shared Redis connection pool (max {self.config.REDIS_MAX_CONNECTIONS} connections)")
+                connection_class = redis.SSLConnection if self.config.REDIS_SSL else redis.Connection
+                RedisClient._pool = redis.BlockingConnectionPool(
+                    connection_class=connection_class,
+                    retry=Retry(self._backoff(), self.config.REDIS_RETRY_ATTEMPTS),
+                    **self._pool_kwargs()
+                )
+        return RedisClient._pool
+
+    def async_pool(self) -> redis.asyncio.BlockingConnectionPool:
+        with RedisClient._lock:
+            if RedisClient._async_pool is None:
+                self.logger.info(f"Creating the shared asyncio Redis connection pool (max {self.config.REDIS_MAX_CONNECTIONS} connections)")
+                connection_class = redis.asyncio.SSLConnection if self.config.REDIS_SSL else redis.asyncio.Connection
+                RedisClient._async_pool = redis.asyncio.BlockingConnectionPool(
+                    connection_class=connection_class,
+                    retry=AsyncRetry(self._backoff(), self.config.REDIS_RETRY_ATTEMPTS),
+                    **self._pool_kwargs()
+                )
+        return RedisClient._async_pool
+
     def connect(self) -> redis.Redis:
         try:
-            self.client = redis.Redis(
-                host=self.config.REDIS_HOST,
-                port=self.config.REDIS_PORT,
-                password=self.config.REDIS_PASSWORD
-            )
-            self.logger.info("Connection to the Redis database client successful.")
+            self.client = redis.Redis(connection_pool=self.pool())
+            self.logger.debug("Connection to the Redis database client successful.")
             return self.client
         except Exception as e:
             self.logger.error(f"Error connecting to the Redis database client: {e}")
+
+    def connect_async(self) -> redis.asyncio.Redis:
+        try:
+            self.client = redis.asyncio.Redis(connection_pool=self.async_pool())
+            self.logger.debug("Connection to the asyncio Redis database client successful.")
+            return self.client
+        except Exception as e:
+            self.logger.error(f"Error connecting to the asyncio Redis database client: {e}")
+
+    @classmethod
+    def close(cls) -> None:
+        """Disconnect the shared sync pool (the asyncio pool is closed with `aclose`)."""
+        with cls._lock:
+            if cls._pool is not None:
+                cls._pool.disconnect()
+                cls._pool = None
+
+    @classmethod
+    async def aclose(cls) -> None:
+        with cls._lock:
+            pool, cls._async_pool = cls._async_pool, None
+        if pool is not None:
+            await pool.disconnect()
+
+
+class LockKeeper:
+    """
+    Holds a Redis lock for a job that may outlast its timeout: a background thread reacquires it (resets
+    the TTL) every `interval` seconds, and leaving the block releases it. The lock must be created with
+    `thread_local=False` so the keeper thread can use its token. `lost` turns true once the lock expired
+    or was taken over; the job should check it before doing anything that needs exclusivity.
+    A lost lock on release is logged, not raised, so it never hides the job's own result.
+    """
+    def __init__(self, lock, interval: float):
+        self.lock = lock
+        self.interval = interval
+        self.lost = False
+        self.logger = get_logger("Redis Lock Keeper")
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="vss-lock-keeper", daemon=True)
+
+    def __enter__(self) -> 'LockKeeper':
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.release()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.lock.reacquire()
+            except LockError as e:
+                self.lost = True
+                self.logger.error(f"Lost the lock {self.lock.name}: {e}")
+                return
+            except Exception as e:
+                # Redis unreachable for a moment; the TTL still has two intervals to run
+                self.logger.error(f"Could not extend the lock {self.lock.name}: {e}")
+
+    def release(self) -> None:
+        try:
+            self.lock.release()
+        except LockError as e:
+            self.lost = True
+            self.logger.error(f"The lock {self.lock.name} expired before it was released: {e}")
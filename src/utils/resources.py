@@ -0,0 +1,14 @@
+# Process resource usage, portable across Linux, macOS and Windows
+import sys
+from typing import Optional
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MiB, or None where `resource` is unavailable (Windows)."""
+    try:
+        import resource  # POSIX only
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB on Linux
+    return round(peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10, 1)
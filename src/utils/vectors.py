@@ -0,0 +1,39 @@
+# Packing of embeddings into the binary layouts understood by Redis vector fields
+import numpy as np
+
+VECTOR_TYPES = ('FLOAT32', 'FLOAT16', 'BFLOAT16')
+
+
+def _check(vector_type: str) -> str:
+    vector_type = vector_type.upper()
+    if vector_type not in VECTOR_TYPES:
+        raise ValueError(f"Unsupported vector type {vector_type}, expected one of {', '.join(VECTOR_TYPES)}")
+    return vector_type
+
+
+def _to_bfloat16(vectors: np.ndarray) -> np.ndarray:
+    # bfloat16 is the upper half of a float32; round to nearest even before truncating
+    bits = np.ascontiguousarray(vectors, dtype=np.float32).view(np.uint32)
+    rounding = ((bits >> 16) & 1) + np.uint32(0x7FFF)
+    return ((bits + rounding) >> 16).astype(np.uint16)
+
+
+def to_bytes(vector, vector_type: str = 'FLOAT32') -> bytes:
+    """Packs one embedding as the little-endian blob a Redis vector field of `vector_type` expects."""
+    vector_type = _check(vector_type)
+    vector = np.asarray(vector, dtype=np.float32)
+    if vector_type == 'FLOAT16':
+        return vector.astype('<f2').tobytes()
+    if vector_type == 'BFLOAT16':
+        return _to_bfloat16(vector).astype('<u2').tobytes()
+    return vector.astype('<f4').tobytes()
+
+
+def from_bytes(blob: bytes, vector_type: str = 'FLOAT32') -> np.ndarray:
+    """Unpacks a blob written by `to_bytes` back into a float32 vector."""
+    vector_type = _check(vector_type)
+    if vector_type == 'FLOAT16':
+        return np.frombuffer(blob, dtype='<f2').astype(np.float32)
+    if vector_type == 'BFLOAT16':
+        return (np.frombuffer(blob, dtype='<u2').astype(np.uint32) << 16).view(np.float32)
+    return np.frombuffer(blob, dtype='<f4').astype(np.float32)